@@ -10,12 +10,12 @@ from datetime import datetime
 import sys
 import os
 import numpy as np
-import joblib
 from functools import lru_cache
 import traceback
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from prediction_engine import PredictionEngine
+from model_registry import ModelRegistry
 
 # ==================== PAGE CONFIG ====================
 
@@ -451,9 +451,9 @@ MODELS_CONFIG = {
 # ==================== CACHE & UTILITIES ====================
 
 @st.cache_resource
-def load_engine():
-    """Load prediction engine once"""
-    return PredictionEngine()
+def load_engine(feature_columns=None):
+    """Load prediction engine once per model feature list"""
+    return PredictionEngine(list(feature_columns) if feature_columns else None)
 
 @lru_cache(maxsize=1)
 def get_time():
@@ -463,77 +463,43 @@ def get_time():
     ist_now = utc_now.astimezone(ist)
     return utc_now, ist_now
 
-def load_models_and_meta():
-    """Load trained models and metadata"""
-    base = 'data/models'
+def load_models_and_meta(pair='EURUSD'):
+    """Load the pair's trained models and metadata
+    
+    Models come from the pair's namespace in data/models (manifest.json),
+    or from the older flat EURUSD_*.pkl style files when it has none. A
+    manifest entry takes precedence: the pair's flat files are then ignored
+    (ModelRegistry logs a warning).
+    """
     models = {}
     meta = {}
     try:
         model_files = {
-            'rf': 'EURUSD_random_forest.pkl',
-            'gb': 'EURUSD_gradient_boosting.pkl',
-            'lr': 'EURUSD_logistic_regression.pkl'
+            'rf': 'random_forest',
+            'gb': 'gradient_boosting',
+            'lr': 'logistic_regression'
         }
         
-        for key, filename in model_files.items():
-            path = os.path.join(base, filename)
-            if os.path.exists(path):
-                models[key] = joblib.load(path)
-        
-        scaler_path = os.path.join(base, 'scaler.pkl')
-        feat_path = os.path.join(base, 'feature_columns.pkl')
-        
-        if os.path.exists(scaler_path):
-            meta['scaler'] = joblib.load(scaler_path)
-        if os.path.exists(feat_path):
-            meta['feature_columns'] = joblib.load(feat_path)
+        loaded, meta = ModelRegistry('data/models').load(pair)
+        for key, name in model_files.items():
+            if name in loaded:
+                models[key] = loaded[name]
             
     except Exception as e:
         st.warning(f"Error loading models: {str(e)}")
     
     return models, meta
 
-def build_feature_vector(feature_columns, inds):
-    """Build feature vector from indicators"""
-    row = []
-    lower_inds = {k.lower(): v for k, v in inds.items()}
-    
-    for feat in feature_columns:
-        key = feat.lower()
-        val = 0.0
-        
-        if key in lower_inds:
-            try:
-                val = float(lower_inds[key])
-            except:
-                val = 0.0
-        else:
-            # Handle special cases
-            if 'sma' in key:
-                for alt in ['sma_50', 'sma_20', 'sma_10', 'sma_5']:
-                    if alt in lower_inds:
-                        try:
-                            val = float(lower_inds[alt])
-                        except:
-                            pass
-                        break
-            elif 'bb_width' in key:
-                try:
-                    up = float(lower_inds.get('bb_upper', 0))
-                    lo = float(lower_inds.get('bb_lower', 0))
-                    mid = float(lower_inds.get('bb_middle', 1))
-                    val = ((up - lo) / mid) * 100 if mid != 0 else 0.0
-                except:
-                    val = 0.0
-        
-        try:
-            row.append(float(val))
-        except:
-            row.append(0.0)
+def build_feature_vector(feature_columns, features):
+    """Build feature vector from the engine's model features
     
+    The engine computes exactly the saved feature columns with the same
+    kernels as FeatureEngineer.
+    """
+    row = [float(features.get(feat, 0.0)) for feat in feature_columns]
     return np.array(row).reshape(1, -1)
 
-def get_model_decisions(models, meta, inds):
+def get_model_decisions(models, meta, features):
     """Get BUY/SELL decisions from individual models"""
     decisions = {'rf': 'N/A', 'gb': 'N/A', 'lr': 'N/A'}
     
@@ -541,7 +507,7 @@ def get_model_decisions(models, meta, inds):
         return decisions
     
     try:
-        X_row = build_feature_vector(meta['feature_columns'], inds)
+        X_row = build_feature_vector(meta['feature_columns'], features)
         X_scaled = meta['scaler'].transform(X_row)
         
         for key in decisions:
@@ -763,8 +729,8 @@ elif st.session_state.show_about:
 else:
     # ==================== MAIN DASHBOARD ====================
     
-    engine = load_engine()
-    models, meta = load_models_and_meta()
+    models, meta = load_models_and_meta(PAIR_MAP[pair_name].split('=')[0])
+    engine = load_engine(tuple(meta.get('feature_columns', ())))
     
     with st.spinner("📡 Loading live market data..."):
         result = engine.get_prediction(PAIR_MAP[pair_name])
@@ -779,7 +745,7 @@ else:
     utc_time, ist_time = get_time()
     
     # Get model decisions
-    model_decisions = get_model_decisions(models, meta, inds)
+    model_decisions = get_model_decisions(models, meta, result['features'])
     
     # Render sections
     render_ticker(pair_name, price, ist_time, utc_time)
@@ -816,7 +782,7 @@ else:
         st.markdown("#### Technical Details")
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("ATR (14)", f"{inds['atr']:.6f}")
+            st.metric("ATR (20)", f"{inds['atr']:.6f}")
             st.metric("BB Upper", f"${inds['bb_upper']:.5f}")
             st.metric("Daily Return", f"{inds['daily_return']:.4f}%")
         with col2:
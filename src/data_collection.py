@@ -1,9 +1,12 @@
 import pandas as pd
 import yfinance as yf
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import os
 import logging
 
+from storage import get_storage
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(message)s'
@@ -14,7 +17,7 @@ logger = logging.getLogger(__name__)
 class ForexDataCollector:
     """Downloads historical forex data"""
     
-    def __init__(self):
+    def __init__(self, downloader=None, storage=None):
         self.currency_pairs = {
             'EURUSD': 'EURUSD=X',
             'GBPUSD': 'GBPUSD=X',
@@ -22,20 +25,42 @@ class ForexDataCollector:
             'USDCAD': 'USDCAD=X',
             'AUDUSD': 'AUDUSD=X'
         }
+        # Any callable with the yf.download signature (e.g. a local fake in tests)
+        self.downloader = downloader or yf.download
+        self.storage = get_storage(storage)
         os.makedirs('data/historical', exist_ok=True)
         logger.info("[OK] ForexDataCollector ready")
     
-    def download_data(self, pair_name, pair_code, years=5):
-        """Download historical data for a currency pair"""
+    def last_timestamp(self, pair_name):
+        """Return the last stored timestamp for a pair, or None"""
+        return self.storage.last_index('data/historical', f"{pair_name}_historical")
+    
+    def download_data(self, pair_name, pair_code, years=5, incremental=False):
+        """Download historical data for a currency pair
         
-        logger.info(f"[DOWNLOADING] {pair_name} ({years} years)...")
+        In incremental mode the download starts at the last stored bar
+        (the overlap is dropped again in save_data).
+        """
         
         end_date = datetime.now()
         start_date = end_date - timedelta(days=years * 365)
         
+        last = self.last_timestamp(pair_name) if incremental else None
+        if last is not None:
+            start_date = last
+            logger.info(f"[DOWNLOADING] {pair_name} (since {str(last)[:10]})...")
+        else:
+            logger.info(f"[DOWNLOADING] {pair_name} ({years} years)...")
+        
+        columns_to_keep = ['Open', 'High', 'Low', 'Close']
+        
+        if start_date.strftime('%Y-%m-%d') >= end_date.strftime('%Y-%m-%d'):
+            logger.info(f"[UP TO DATE] {pair_name}")
+            return pd.DataFrame(columns=columns_to_keep)
+        
         try:
             # Download data
-            data = yf.download(
+            data = self.downloader(
                 pair_code,
                 start=start_date.strftime('%Y-%m-%d'),
                 end=end_date.strftime('%Y-%m-%d'),
@@ -48,8 +73,11 @@ class ForexDataCollector:
             if data.index.tz is not None:
                 data.index = data.index.tz_localize(None)
             
+            # Flatten yfinance's (Price, Ticker) columns so appended rows line up
+            if isinstance(data.columns, pd.MultiIndex):
+                data.columns = data.columns.get_level_values(0)
+            
             # Keep only needed columns
-            columns_to_keep = ['Open', 'High', 'Low', 'Close']
             data = data[columns_to_keep]
             
             logger.info(f"[SUCCESS] Downloaded {len(data)} records for {pair_name}")
@@ -59,36 +87,84 @@ class ForexDataCollector:
             logger.error(f"[ERROR] Error downloading {pair_name}: {str(e)}")
             return None
     
-    def save_data(self, data, pair_name):
-        """Save data to CSV"""
-        filename = f"data/historical/{pair_name}_historical.csv"
-        data.to_csv(filename)
-        logger.info(f"[SAVED] {filename}")
+    def save_data(self, data, pair_name, incremental=False):
+        """Save data to the historical store
+        
+        In incremental mode only bars newer than the stored history are
+        appended; the overlapping bar and any repeated timestamps are dropped.
+        """
+        name = f"{pair_name}_historical"
+        last = self.last_timestamp(pair_name) if incremental else None
+        
+        if last is None:
+            self.storage.save(data, 'data/historical', name)
+            return
+        
+        new_rows = data[data.index > last]
+        new_rows = new_rows[~new_rows.index.duplicated(keep='last')].sort_index()
+        self.storage.append(new_rows, 'data/historical', name)
+    
+    def _download_pair(self, item, years, incremental=False):
+        """Download one (pair_name, pair_code) item"""
+        pair_name, pair_code = item
+        return pair_name, self.download_data(pair_name, pair_code, years, incremental)
     
-    def download_all(self, years=5):
-        """Download all currency pairs"""
+    def download_all(self, years=5, max_workers=1, incremental=False):
+        """Download all currency pairs
+        
+        With max_workers > 1 the downloads run in a bounded thread pool;
+        results are still saved and reported in pair order. With
+        incremental=True only bars missing from data/historical are fetched.
+        """
         
         print("\n" + "="*70)
         print("FOREX DATA COLLECTION")
         print("="*70 + "\n")
         
-        successful = 0
+        results = {}
+        items = list(self.currency_pairs.items())
+        fetch = lambda item: self._download_pair(item, years, incremental)
         
-        for pair_name, pair_code in self.currency_pairs.items():
-            data = self.download_data(pair_name, pair_code, years)
-            
-            if data is not None and len(data) > 0:
-                self.save_data(data, pair_name)
-                successful += 1
+        if max_workers > 1:
+            logger.info(f"[CONCURRENT] {len(items)} pairs, {max_workers} workers")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                downloads = list(executor.map(fetch, items))
+        else:
+            downloads = map(fetch, items)
+        
+        for pair_name, data in downloads:
+            # An up-to-date store legitimately yields no new rows; without
+            # stored history an empty frame is a failed download
+            up_to_date = incremental and self.last_timestamp(pair_name) is not None
+            if data is not None and (len(data) > 0 or up_to_date):
+                self.save_data(data, pair_name, incremental)
+                results[pair_name] = True
+            else:
+                results[pair_name] = False
             
             print()
         
+        successful = sum(results.values())
+        failed = [pair for pair, ok in results.items() if not ok]
+        
         print("="*70)
         print(f"[COMPLETE] Downloaded {successful}/{len(self.currency_pairs)} pairs")
+        if failed:
+            print(f"[FAILED] {', '.join(failed)}")
         print("="*70)
-
+        
+        return results
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Download historical forex data")
+    parser.add_argument('--incremental', action='store_true', help="Fetch only bars after the stored history")
+    parser.add_argument('--workers', type=int, default=1, help="Concurrent downloads")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
     collector = ForexDataCollector()
-    collector.download_all(years=5)
+    collector.download_all(years=5, max_workers=args.workers, incremental=args.incremental)
     print("\nPhase 1 Complete! Data ready for processing.\n")
\ No newline at end of file
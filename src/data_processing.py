@@ -2,17 +2,26 @@
 import pandas as pd
 import numpy as np
 import logging
-import os
+
+from storage import get_storage
+from price_store import PriceStore
+from parallel import run_pairs
+from data_validation import DataValidator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DataProcessor:
-    """Cleans and validates forex data"""
+    """Cleans and validates forex data
     
-    def __init__(self, data):
-        self.raw_data = data.copy()
+    With copy=False the processor takes ownership of the caller's frame and
+    cleans it in place instead of working on private copies.
+    """
+    
+    def __init__(self, data, copy=True):
+        self.copy = copy
+        self.raw_data = data.copy() if copy else data
         self.processed_data = None
         logger.info("[OK] DataProcessor initialized")
     
@@ -21,7 +30,12 @@ class DataProcessor:
         logger.info("[PROCESSING] Removing missing values...")
         
         missing_before = self.raw_data.isnull().sum().sum()
-        self.processed_data = self.raw_data.ffill().bfill()
+        if self.copy:
+            self.processed_data = self.raw_data.ffill().bfill()
+        else:
+            self.raw_data.ffill(inplace=True)
+            self.raw_data.bfill(inplace=True)
+            self.processed_data = self.raw_data
         missing_after = self.processed_data.isnull().sum().sum()
         
         logger.info(f"[OK] Missing values: {missing_before} -> {missing_after}")
@@ -31,8 +45,10 @@ class DataProcessor:
         """Remove duplicate rows"""
         logger.info("[PROCESSING] Removing duplicates...")
         
-        duplicates = self.processed_data.duplicated().sum()
-        self.processed_data = self.processed_data[~self.processed_data.duplicated()]
+        duplicated = self.processed_data.duplicated()
+        duplicates = duplicated.sum()
+        if duplicates:
+            self.processed_data = self.processed_data[~duplicated]
         
         logger.info(f"[OK] Duplicates removed: {duplicates}")
         return self
@@ -42,7 +58,8 @@ class DataProcessor:
         logger.info("[PROCESSING] Ensuring correct data types...")
         
         for col in ['Open', 'High', 'Low', 'Close']:
-            if col in self.processed_data.columns:
+            # Numeric columns are left alone rather than rebuilt
+            if col in self.processed_data.columns and not pd.api.types.is_numeric_dtype(self.processed_data[col]):
                 self.processed_data[col] = pd.to_numeric(self.processed_data[col], errors='coerce')
         
         logger.info("[OK] Data types corrected")
@@ -61,6 +78,20 @@ class DataProcessor:
         logger.info(f"[OK] Sorted: {start_date} to {end_date}")
         return self
     
+    def validate(self, fill_gaps=False, **options):
+        """Check OHLC consistency and calendar gaps (see data_validation)"""
+        logger.info("[PROCESSING] Validating OHLC bars...")
+        
+        validator = DataValidator(self.processed_data, **options)
+        self.violations = validator.check()
+        self.gaps = validator.gaps()
+        if fill_gaps and len(self.gaps):
+            self.processed_data = validator.fill_gaps()
+        
+        logger.info(f"[OK] Violations: {len(self.violations)}, missing sessions: {len(self.gaps)}"
+                    f"{' (filled)' if fill_gaps and len(self.gaps) else ''}")
+        return self
+    
     def display_report(self):
         """Display data quality report"""
         print("\n" + "="*70)
@@ -79,12 +110,14 @@ class DataProcessor:
         print("="*70)
         return self
     
-    def save(self, filename):
-        """Save processed data"""
-        os.makedirs('data/processed', exist_ok=True)
-        filepath = f"data/processed/{filename}"
-        self.processed_data.to_csv(filepath)
-        logger.info(f"[SAVED] {filepath}")
+    def save(self, filename, storage=None):
+        """Save processed data (format from storage, CSV by default)"""
+        get_storage(storage).save(self.processed_data, 'data/processed', filename)
+        return self
+    
+    def to_store(self, pair, store=None):
+        """Write processed OHLC bars into the memory-mapped price store"""
+        (store or PriceStore()).write(pair, self.processed_data)
         return self
     
     def get_data(self):
@@ -92,40 +125,397 @@ class DataProcessor:
         return self.processed_data
 
 
+class PanelDataProcessor:
+    """Cleans many pairs at once from one (pair, timestamp) frame
+    
+    Every step is a single vectorized pass over the whole panel; results
+    match running DataProcessor on each pair separately.
+    """
+    
+    def __init__(self, data):
+        self.raw_data = data.copy()
+        self.processed_data = None
+        self.duplicates = None
+        logger.info(f"[OK] PanelDataProcessor initialized ({self.raw_data.index.get_level_values(0).nunique()} pairs)")
+    
+    @classmethod
+    def from_frames(cls, frames):
+        """Build from {pair: DataFrame}"""
+        return cls(pd.concat(frames, names=['Pair']))
+    
+    @classmethod
+    def from_array(cls, values, pairs, timestamps, columns=('Open', 'High', 'Low', 'Close')):
+        """Build from a [pairs, time, columns] array on a shared timestamp axis"""
+        values = np.asarray(values)
+        index = pd.MultiIndex.from_product([list(pairs), pd.DatetimeIndex(timestamps)], names=['Pair', 'Date'])
+        return cls(pd.DataFrame(values.reshape(-1, values.shape[-1]), index=index, columns=list(columns)))
+    
+    def remove_missing_values(self):
+        """Forward/backward fill within each pair"""
+        logger.info("[PROCESSING] Removing missing values...")
+        
+        missing_before = self.raw_data.isnull().sum().sum()
+        filled = self.raw_data.groupby(level=0, sort=False).ffill()
+        self.processed_data = filled.groupby(level=0, sort=False).bfill()
+        missing_after = self.processed_data.isnull().sum().sum()
+        
+        logger.info(f"[OK] Missing values: {missing_before} -> {missing_after}")
+        return self
+    
+    def remove_duplicates(self):
+        """Remove rows repeating an earlier row of the same pair"""
+        logger.info("[PROCESSING] Removing duplicates...")
+        
+        # The pair becomes a column so duplicates never match across pairs
+        duplicated = self.processed_data.reset_index(level=0).duplicated().to_numpy()
+        self.duplicates = pd.Series(duplicated, index=self.processed_data.index.get_level_values(0)).groupby(level=0, sort=False).sum()
+        self.processed_data = self.processed_data[~duplicated]
+        
+        logger.info(f"[OK] Duplicates removed: {int(duplicated.sum())}")
+        return self
+    
+    def ensure_data_types(self):
+        """Ensure correct data types"""
+        logger.info("[PROCESSING] Ensuring correct data types...")
+        
+        for col in ['Open', 'High', 'Low', 'Close']:
+            if col in self.processed_data.columns:
+                self.processed_data[col] = pd.to_numeric(self.processed_data[col], errors='coerce')
+        
+        logger.info("[OK] Data types corrected")
+        return self
+    
+    def sort_by_date(self):
+        """Sort each pair chronologically, keeping the pair order"""
+        logger.info("[PROCESSING] Sorting by date...")
+        
+        codes, _ = pd.factorize(self.processed_data.index.get_level_values(0))
+        timestamps = self.processed_data.index.get_level_values(1)
+        order = np.lexsort((timestamps, codes))
+        self.processed_data = self.processed_data.iloc[order]
+        
+        logger.info(f"[OK] Sorted {len(self.processed_data)} rows")
+        return self
+    
+    def validate(self, fill_gaps=False, **options):
+        """Check OHLC consistency and calendar gaps for every pair at once"""
+        logger.info("[PROCESSING] Validating OHLC bars...")
+        
+        validator = DataValidator(self.processed_data, **options)
+        self.violations = validator.check()
+        self.gaps = validator.gaps()
+        if fill_gaps and len(self.gaps):
+            self.processed_data = validator.fill_gaps()
+        
+        logger.info(f"[OK] Violations: {len(self.violations)}, missing sessions: {len(self.gaps)}")
+        return self
+    
+    def display_report(self):
+        """Display a per-pair data quality report"""
+        grouped = self.processed_data.groupby(level=0, sort=False)
+        dates = self.processed_data.index.get_level_values(1).to_series(index=self.processed_data.index)
+        dates = dates.groupby(level=0, sort=False)
+        
+        report = pd.DataFrame({
+            'Records': grouped.size(),
+            'Start': dates.min().astype(str).str[:10],
+            'End': dates.max().astype(str).str[:10],
+            'Missing': grouped.count().rsub(grouped.size(), axis=0).sum(axis=1),
+            'Duplicates': self.duplicates if self.duplicates is not None else 0,
+            'Close Mean': grouped['Close'].mean(),
+            'Close Std': grouped['Close'].std(),
+            'Close Min': grouped['Close'].min(),
+            'Close Max': grouped['Close'].max()
+        })
+        
+        print("\n" + "="*70)
+        print("DATA QUALITY REPORT (PANEL)")
+        print("="*70)
+        print(report.to_string())
+        print("="*70)
+        return self
+    
+    def split(self):
+        """Return {pair: DataFrame} in the single-pair layout"""
+        return {pair: frame.droplevel(0)
+                for pair, frame in self.processed_data.groupby(level=0, sort=False)}
+    
+    def save(self, suffix='_processed', storage=None):
+        """Save one processed file per pair"""
+        storage = get_storage(storage)
+        for pair, frame in self.split().items():
+            storage.save(frame, 'data/processed', f'{pair}{suffix}')
+        return self
+    
+    def get_data(self):
+        """Return the processed panel"""
+        return self.processed_data
+
+
+class StreamingDataProcessor:
+    """Cleans a raw CSV larger than memory in fixed-size chunks
+    
+    State carried between chunks, all bounded by chunksize / key_window:
+    - the last valid value per column (forward fill across chunk boundaries)
+    - rows before the first valid value of every column (backward fill),
+      held for at most chunksize rows; past that they are written without
+      back-fill and the still-empty columns are logged
+    - the most recent key_window timestamps (duplicate detection)
+    - the last timestamp (incremental sort-order check)
+    - count / mean / M2 / min / max of Close (Welford, merged per chunk)
+    
+    Differences from DataProcessor, which sees the whole frame:
+    - duplicates are repeated timestamps within key_window rows, whereas
+      DataProcessor.remove_duplicates drops any row whose values repeat an
+      earlier row's, at any date (that would need every past row kept)
+    - out-of-order rows are counted and reported but not re-sorted
+    On sorted input without value-identical bars on different dates, and
+    with a value in every column within the first chunksize rows, the
+    output is the same. Input and output are CSV, since only CSV appends
+    without rewriting the file.
+    """
+    
+    columns = ['Open', 'High', 'Low', 'Close']
+    
+    def __init__(self, chunksize=100_000, key_window=10_000):
+        self.chunksize = chunksize
+        self.key_window = key_window
+        self.report = None
+        logger.info("[OK] StreamingDataProcessor initialized")
+    
+    def _reset(self):
+        self.last_valid = pd.Series(np.nan, index=self.columns)
+        self.head = []
+        self.held = 0
+        self.recent_keys = np.empty(0, dtype=np.int64)
+        self.last_timestamp = None
+        self.stats = {'records': 0, 'missing': 0, 'duplicates': 0, 'unsorted': 0,
+                      'start': None, 'end': None,
+                      'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': np.inf, 'max': -np.inf}
+    
+    def _read_chunks(self, input_path):
+        """Yield numeric chunks with a parsed DatetimeIndex"""
+        for chunk in pd.read_csv(input_path, index_col=0, chunksize=self.chunksize):
+            index = pd.to_datetime(chunk.index, errors='coerce', format='ISO8601')
+            # Older yfinance exports carry extra Ticker/Date header rows
+            valid = ~index.isna()
+            chunk = chunk[valid].apply(pd.to_numeric, errors='coerce')
+            chunk.index = index[valid].rename('Date')
+            yield chunk[self.columns]
+    
+    def _drop_duplicates(self, chunk):
+        """Drop rows whose timestamp repeats one in the rolling key window"""
+        keys = chunk.index.as_unit('ns').asi8
+        duplicated = pd.Index(keys).duplicated() | np.isin(keys, self.recent_keys)
+        self.stats['duplicates'] += int(duplicated.sum())
+        self.recent_keys = np.concatenate((self.recent_keys, keys[~duplicated]))[-self.key_window:]
+        return chunk[~duplicated] if duplicated.any() else chunk
+    
+    def _fill(self, chunk):
+        """Forward fill with the carried row; hold rows until bfill is possible"""
+        chunk = chunk.ffill().fillna(self.last_valid)
+        self.last_valid = chunk.iloc[-1].combine_first(self.last_valid) if len(chunk) else self.last_valid
+        
+        if self.head is not None:
+            self.head.append(chunk)
+            self.held += len(chunk)
+            if self.last_valid.isna().any():
+                if self.held <= self.chunksize:
+                    return chunk.iloc[:0]
+                # Bounded memory: stop waiting for the empty columns
+                empty = list(self.last_valid.index[self.last_valid.isna()])
+                logger.warning(f"[WARNING] No values in {empty} within the first {self.held} rows, "
+                               f"writing them without back-fill")
+            # Every column has seen a value (or the hold is full): back-fill the held rows once
+            chunk = pd.concat(self.head).bfill()
+            self.head = None
+        return chunk
+    
+    def _emit(self, chunk, storage, output_name, first):
+        """Update the streaming report and write the cleaned rows"""
+        if len(chunk) == 0:
+            return first
+        
+        timestamps = chunk.index.as_unit('ns').asi8
+        floor = timestamps[0] if self.last_timestamp is None else self.last_timestamp
+        running = np.maximum.accumulate(np.concatenate(([floor], timestamps)))
+        self.stats['unsorted'] += int((timestamps < running[:-1]).sum())
+        self.last_timestamp = int(running[-1])
+        start = int(timestamps.min())
+        self.stats['start'] = start if self.stats['start'] is None else min(self.stats['start'], start)
+        self.stats['end'] = self.last_timestamp
+        self.stats['records'] += len(chunk)
+        
+        close = chunk['Close'].dropna().to_numpy()
+        if len(close):
+            n_a, n_b = self.stats['count'], len(close)
+            mean_b = close.mean()
+            m2_b = ((close - mean_b) ** 2).sum()
+            delta = mean_b - self.stats['mean']
+            n = n_a + n_b
+            self.stats['mean'] += delta * n_b / n
+            self.stats['m2'] += m2_b + delta ** 2 * n_a * n_b / n
+            self.stats['count'] = n
+            self.stats['min'] = min(self.stats['min'], close.min())
+            self.stats['max'] = max(self.stats['max'], close.max())
+        
+        if first:
+            storage.save(chunk, 'data/processed', output_name)
+        else:
+            storage.append(chunk, 'data/processed', output_name)
+        return False
+    
+    def process(self, input_path, output_name):
+        """Stream input_path into data/processed/{output_name}.csv"""
+        logger.info(f"[STREAMING] {input_path} in chunks of {self.chunksize}...")
+        
+        self._reset()
+        storage = get_storage('csv')
+        first = True
+        
+        for chunk in self._read_chunks(input_path):
+            self.stats['missing'] += int(chunk.isnull().sum().sum())
+            chunk = self._drop_duplicates(chunk)
+            first = self._emit(self._fill(chunk), storage, output_name, first)
+        
+        # Columns that never had a value: flush what is held
+        if self.head:
+            first = self._emit(pd.concat(self.head), storage, output_name, first)
+            self.head = None
+        
+        count = self.stats['count']
+        self.report = {
+            'Records': self.stats['records'],
+            'Start': pd.Timestamp(self.stats['start']) if self.stats['start'] is not None else None,
+            'End': pd.Timestamp(self.stats['end']) if self.stats['end'] is not None else None,
+            'Missing (raw)': self.stats['missing'],
+            'Duplicates': self.stats['duplicates'],
+            'Out of order': self.stats['unsorted'],
+            'Close count': count,
+            'Close mean': self.stats['mean'] if count else np.nan,
+            'Close std': np.sqrt(self.stats['m2'] / (count - 1)) if count > 1 else np.nan,
+            'Close min': self.stats['min'] if count else np.nan,
+            'Close max': self.stats['max'] if count else np.nan
+        }
+        
+        if self.stats['unsorted']:
+            logger.warning(f"[WARNING] {self.stats['unsorted']} out-of-order rows were kept as-is")
+        logger.info(f"[OK] Streamed {self.stats['records']} records")
+        return self
+    
+    def display_report(self):
+        """Display data quality report from the streaming aggregates"""
+        print("\n" + "="*70)
+        print("DATA QUALITY REPORT (STREAMING)")
+        print("="*70)
+        print(f"Records: {self.report['Records']}")
+        print(f"Date Range: {str(self.report['Start'])[:10]} to {str(self.report['End'])[:10]}")
+        print(f"Missing Values (before fill): {self.report['Missing (raw)']}")
+        print(f"Duplicates: {self.report['Duplicates']}")
+        print(f"Out-of-order rows: {self.report['Out of order']}")
+        print("\nPrice Statistics (Close):")
+        for key in ['count', 'mean', 'std', 'min', 'max']:
+            print(f"{key:8} {self.report[f'Close {key}']:.6f}")
+        print("="*70)
+        return self
+    
+    def get_report(self):
+        """Return the streaming quality report"""
+        return self.report
+
+
+def process_pair(pair, storage=None):
+    """Clean and save one pair (the unit of work for --jobs)"""
+    print(f"[PROCESSING] {pair}")
+    print("-" * 70)
+    
+    storage = get_storage(storage)
+    raw_data = storage.load('data/historical', f'{pair}_historical')
+    
+    processor = DataProcessor(raw_data)
+    
+    processed = (processor
+                .remove_missing_values()
+                .remove_duplicates()
+                .ensure_data_types()
+                .sort_by_date()
+                .validate()
+                .display_report()
+                .save(f'{pair}_processed', storage)
+                .get_data())
+    
+    print(f"[OK] {pair} processing complete!\n")
+    return len(processed)
+
+
+def stream_pair(pair, chunksize=100_000, storage=None):
+    """Clean one pair out-of-core (the unit of work for --stream)
+    
+    Streaming reads and appends CSV only; another storage format is refused
+    rather than leaving a stale {pair}_processed file in that format to be
+    read by the next stage.
+    """
+    storage = get_storage(storage)
+    if storage.format_name != 'csv':
+        raise ValueError(f"--stream reads and writes CSV, not {storage.format_name} (set FOREX_STORAGE_FORMAT=csv)")
+    
+    print(f"[PROCESSING] {pair}")
+    print("-" * 70)
+    
+    report = (StreamingDataProcessor(chunksize)
+              .process(f'data/historical/{pair}_historical.csv', f'{pair}_processed')
+              .display_report()
+              .get_report())
+    
+    print(f"[OK] {pair} processing complete!\n")
+    return report['Records']
+
+
 if __name__ == "__main__":
+    import argparse
+    from functools import partial
+    
+    parser = argparse.ArgumentParser(description="Clean historical forex data")
+    parser.add_argument('--panel', action='store_true', help="Clean all pairs in one vectorized pass")
+    parser.add_argument('--stream', action='store_true', help="Clean CSVs in chunks with bounded memory")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes (0 = all cores)")
+    args = parser.parse_args()
     
     print("\n" + "="*70)
     print("DATA PROCESSING & CLEANING")
     print("="*70 + "\n")
     
     pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']
+    storage = get_storage()
     
-    for pair in pairs:
-        print(f"[PROCESSING] {pair}")
-        print("-" * 70)
+    if args.panel:
+        frames = {}
+        for pair in pairs:
+            try:
+                frames[pair] = storage.load('data/historical', f'{pair}_historical')
+            except Exception as e:
+                print(f"[ERROR] Failed to load {pair}: {str(e)}\n")
         
-        try:
-            raw_data = pd.read_csv(
-                f'data/historical/{pair}_historical.csv',
-                index_col=0,
-                parse_dates=True
-            )
-            
-            processor = DataProcessor(raw_data)
-            
-            processed = (processor
-                        .remove_missing_values()
-                        .remove_duplicates()
-                        .ensure_data_types()
-                        .sort_by_date()
-                        .display_report()
-                        .save(f'{pair}_processed.csv')
-                        .get_data())
-            
-            print(f"[OK] {pair} processing complete!\n")
+        if not frames:
+            print("[ERROR] No pairs loaded, panel processing skipped\n")
+        else:
+            (PanelDataProcessor.from_frames(frames)
+                .remove_missing_values()
+                .remove_duplicates()
+                .ensure_data_types()
+                .sort_by_date()
+                .validate()
+                .display_report()
+                .save('_processed', storage))
             
-        except Exception as e:
-            print(f"[ERROR] Failed to process {pair}: {str(e)}\n")
+            print(f"[OK] {len(frames)} pairs processed in panel mode\n")
+    elif args.stream:
+        if storage.format_name != 'csv':
+            parser.error(f"--stream reads and writes CSV, not {storage.format_name} (set FOREX_STORAGE_FORMAT=csv)")
+        run_pairs(partial(stream_pair, chunksize=args.chunksize, storage=storage), pairs, args.jobs)
+    else:
+        run_pairs(partial(process_pair, storage=storage), pairs, args.jobs)
     
     print("="*70)
     print("Phase 2 Complete! Data cleaned and ready.")
@@ -0,0 +1,221 @@
+"""
+OHLC DATA VALIDATION
+
+Checks one pair's frame or a (pair, timestamp) panel with vectorized masks:
+1. missing_value         - NaN in any price column
+2. non_positive          - any price <= 0
+3. high_below_open_close - High < max(Open, Close)
+4. low_above_open_close  - Low > min(Open, Close)
+5. high_below_low        - High < Low
+6. duplicate_timestamp   - timestamp repeated within a pair
+7. spike                 - |log return| far outside the pair's robust spread
+8. off_calendar          - bar on a day the forex calendar has no session
+
+Missing sessions are found by comparing each pair's index with the forex
+trading calendar (Monday-Friday, minus optional holidays) and can be
+filled with flat bars at the previous close.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DAY_NS = 86_400 * 1_000_000_000
+
+RULES = [
+    'missing_value', 'non_positive', 'high_below_open_close', 'low_above_open_close',
+    'high_below_low', 'duplicate_timestamp', 'spike', 'off_calendar'
+]
+
+
+def forex_calendar(start, end, holidays=()):
+    """Daily forex sessions between start and end (inclusive)
+
+    Forex trades 24/5, so every weekday is a session. holidays may hold
+    dates or (month, day) tuples for recurring closures.
+    """
+    sessions = pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+    return sessions[~is_holiday(sessions, holidays)]
+
+
+def is_holiday(dates, holidays=()):
+    """Boolean mask of dates that fall on a holiday"""
+    mask = np.zeros(len(dates), dtype=bool)
+    for holiday in holidays:
+        if isinstance(holiday, tuple):
+            mask |= (dates.month == holiday[0]) & (dates.day == holiday[1])
+        else:
+            mask |= dates.normalize() == pd.Timestamp(holiday)
+    return mask
+
+
+class DataValidator:
+    """Vectorized OHLC validation over a single pair or a panel of pairs"""
+
+    def __init__(self, data, pair='PAIR', spike_z=10.0, holidays=()):
+        if isinstance(data.index, pd.MultiIndex):
+            self.data = data.copy(deep=False)
+            self.data.index = self.data.index.remove_unused_levels()
+            self.single = None
+        else:
+            self.data = pd.concat({pair: data}, names=['Pair'])
+            self.single = pair
+        self.spike_z = spike_z
+        self.holidays = holidays
+        self.violations = None
+
+    def _pairs(self):
+        return self.data.index.get_level_values(0)
+
+    def _dates(self):
+        return pd.DatetimeIndex(self.data.index.get_level_values(1))
+
+    def masks(self):
+        """(rows x rules) boolean matrix and matching value matrix"""
+        o, h, l, c = (self.data[col].to_numpy(dtype=np.float64) for col in ['Open', 'High', 'Low', 'Close'])
+        prices = np.column_stack((o, h, l, c))
+        # Integer pair codes keep every grouping step free of string hashing
+        pairs = np.asarray(self.data.index.codes[0], dtype=np.int64)
+        dates = self._dates()
+        stamps = dates.as_unit('ns').asi8
+
+        upper = np.fmax(o, c)
+        lower = np.fmin(o, c)
+
+        log_close = pd.Series(np.log(np.where(c > 0, c, np.nan)))
+        returns = log_close.groupby(pairs, sort=False).diff()
+        centre = returns.groupby(pairs, sort=False).transform('median')
+        deviation = (returns - centre).abs()
+        spread = 1.4826 * deviation.groupby(pairs, sort=False).transform('median')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (deviation / spread).to_numpy()
+
+        order = np.lexsort((stamps, pairs))
+        repeated = (pairs[order][1:] == pairs[order][:-1]) & (stamps[order][1:] == stamps[order][:-1])
+        duplicate = np.zeros(len(order), dtype=bool)
+        duplicate[order[1:][repeated]] = True
+        off_calendar = (dates.dayofweek >= 5) | is_holiday(dates, self.holidays)
+
+        masks = np.column_stack([
+            np.isnan(prices).any(axis=1),
+            (prices <= 0).any(axis=1),
+            h < upper,
+            l > lower,
+            h < l,
+            duplicate,
+            np.nan_to_num(z, nan=0.0) > self.spike_z,
+            off_calendar
+        ])
+        values = np.column_stack([
+            np.isnan(prices).sum(axis=1),
+            np.nanmin(np.where(np.isnan(prices), np.inf, prices), axis=1),
+            h - upper,
+            l - lower,
+            h - l,
+            c,
+            returns.to_numpy(),
+            dates.dayofweek
+        ])
+        return masks, values
+
+    def check(self):
+        """Compact table with one row per violation: Pair, Date, Rule, Value"""
+        masks, values = self.masks()
+        rows, rules = np.nonzero(masks)
+
+        self.violations = pd.DataFrame({
+            'Pair': self._pairs()[rows],
+            'Date': self._dates()[rows],
+            'Rule': np.asarray(RULES)[rules],
+            'Value': values[rows, rules]
+        })
+
+        logger.info(f"[VALIDATED] {len(self.data)} rows, {len(self.violations)} violations")
+        return self.violations
+
+    def gaps(self):
+        """Calendar sessions missing from each pair's date range"""
+        codes = np.asarray(self.data.index.codes[0], dtype=np.int64)
+        names = self.data.index.levels[0]
+        days = self._dates().normalize().as_unit('ns').asi8 // DAY_NS
+
+        first = np.full(len(names), np.iinfo(np.int64).max)
+        last = np.full(len(names), np.iinfo(np.int64).min)
+        np.minimum.at(first, codes, days)
+        np.maximum.at(last, codes, days)
+
+        calendar = forex_calendar(pd.Timestamp(first.min() * DAY_NS), pd.Timestamp(last.max() * DAY_NS), self.holidays)
+        calendar_days = calendar.as_unit('ns').asi8 // DAY_NS
+
+        # Every (pair, session) inside the pair's own range, as one int64 key
+        grid_codes = np.repeat(np.arange(len(names)), len(calendar_days))
+        grid_days = np.tile(calendar_days, len(names))
+        in_range = (grid_days >= first[grid_codes]) & (grid_days <= last[grid_codes])
+        grid_codes, grid_days = grid_codes[in_range], grid_days[in_range]
+
+        span = int(last.max() - first.min()) + 1
+        present = codes * span + (days - first.min())
+        missing = ~np.isin(grid_codes * span + (grid_days - first.min()), present)
+
+        return pd.DataFrame({
+            'Pair': names[grid_codes[missing]],
+            'Date': pd.DatetimeIndex((grid_days[missing] * DAY_NS).astype('datetime64[ns]'))
+        })
+
+    def fill_gaps(self):
+        """Insert flat bars at the previous close for every missing session"""
+        gaps = self.gaps()
+        if len(gaps) == 0:
+            return self.data if self.single is None else self.data.xs(self.single, level=0)
+
+        filler = pd.DataFrame(np.nan, index=pd.MultiIndex.from_frame(gaps), columns=self.data.columns)
+        filler.index = filler.index.set_names(self.data.index.names)
+        filled = pd.concat([self.data, filler])
+        inserted = np.concatenate((np.zeros(len(self.data), dtype=bool), np.ones(len(filler), dtype=bool)))
+
+        codes, _ = pd.factorize(filled.index.get_level_values(0))
+        order = np.lexsort((filled.index.get_level_values(1), codes))
+        filled, inserted = filled.iloc[order], inserted[order]
+
+        close = filled['Close'].groupby(level=0, sort=False).ffill().to_numpy()
+        for col in ['Open', 'High', 'Low', 'Close']:
+            values = filled[col].to_numpy(dtype=np.float64, copy=True)
+            values[inserted] = close[inserted]
+            filled[col] = values
+
+        logger.info(f"[FILLED] {len(gaps)} missing sessions")
+        return filled if self.single is None else filled.xs(self.single, level=0)
+
+    def summary(self):
+        """Violation counts per pair and rule"""
+        if self.violations is None:
+            self.check()
+        return self.violations.groupby(['Pair', 'Rule']).size().unstack(fill_value=0)
+
+
+if __name__ == "__main__":
+    from storage import get_storage
+
+    print("\n" + "="*70)
+    print("DATA VALIDATION")
+    print("="*70 + "\n")
+
+    storage = get_storage()
+    frames = {}
+    for pair in ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']:
+        try:
+            frames[pair] = storage.load('data/processed', f'{pair}_processed')
+        except Exception as e:
+            print(f"[ERROR] Failed to load {pair}: {str(e)}")
+
+    validator = DataValidator(pd.concat(frames, names=['Pair']))
+    violations = validator.check()
+    gaps = validator.gaps()
+
+    print(validator.summary().to_string() if len(violations) else "No rule violations")
+    print(f"\nMissing sessions: {len(gaps)}")
+    print(gaps.groupby('Pair').size().to_string() if len(gaps) else "")
+    print("="*70)
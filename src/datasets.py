@@ -0,0 +1,214 @@
+"""
+TRAINING DATASETS
+
+Binary train/test artifacts, one namespace per pair plus a pooled set:
+
+    data/datasets/{pair}/X_train.npy    scaled features (float, C order)
+    data/datasets/{pair}/X_test.npy
+    data/datasets/{pair}/y_train.npy    int8 targets
+    data/datasets/{pair}/y_test.npy
+    data/datasets/{pair}/scaler.pkl     the pair's fitted scaler
+    data/datasets/{pair}/feature_columns.pkl
+    data/datasets/{pair}/meta.json      rows, columns, dtype, created
+
+    data/datasets/pooled/...            every pair's rows stacked, with a
+                                        pair_id column (index into
+                                        meta.json 'pairs') after the features
+
+.npy files are memory-mapped on load, so training reads only the pages
+it touches and several processes share them through the OS page cache.
+"""
+
+import pandas as pd
+import numpy as np
+import joblib
+import json
+import logging
+import os
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+POOLED = 'pooled'
+ARRAYS = ['X_train', 'X_test', 'y_train', 'y_test']
+
+
+def _save_array(path, values):
+    """np.save through a temporary file so readers never see a partial array"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+class DatasetStore:
+    """Directory of per-pair and pooled training datasets"""
+
+    def __init__(self, root='data/datasets'):
+        self.root = root
+
+    def path(self, name, filename=''):
+        return os.path.join(self.root, name, filename)
+
+    def exists(self, name):
+        return os.path.exists(self.path(name, 'meta.json'))
+
+    def names(self):
+        """Stored dataset names (pairs, and 'pooled' when written)"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.exists(name))
+
+    def write(self, name, X_train, X_test, y_train, y_test, feature_columns, scaler=None, **meta):
+        """Write one dataset's arrays, scaler and metadata"""
+        os.makedirs(self.path(name), exist_ok=True)
+        arrays = {
+            'X_train': np.ascontiguousarray(X_train),
+            'X_test': np.ascontiguousarray(X_test),
+            'y_train': np.asarray(y_train, dtype=np.int8),
+            'y_test': np.asarray(y_test, dtype=np.int8)
+        }
+        for key, values in arrays.items():
+            _save_array(self.path(name, f'{key}.npy'), values)
+
+        if scaler is not None:
+            joblib.dump(scaler, self.path(name, 'scaler.pkl'))
+        joblib.dump(list(feature_columns), self.path(name, 'feature_columns.pkl'))
+        self._write_meta(name, {
+            'name': name,
+            'feature_columns': list(feature_columns),
+            'train_rows': len(arrays['X_train']),
+            'test_rows': len(arrays['X_test']),
+            'dtype': arrays['X_train'].dtype.name,
+            'created': time.time(),
+            **meta
+        })
+        logger.info(f"[SAVED] {self.path(name)} (train {len(arrays['X_train'])}, test {len(arrays['X_test'])})")
+        return self.path(name)
+
+    def write_pair(self, pair, prep):
+        """Write a prepared MLDataPreparation under the pair's namespace"""
+        return self.write(pair, prep.X_train, prep.X_test, prep.y_train, prep.y_test,
+                          prep.feature_columns, prep.scaler, pair=pair)
+
+    def create(self, name, train_rows, test_rows, columns, dtype=np.float64):
+        """Empty memory-mapped arrays to fill in place, published by finish()"""
+        os.makedirs(self.path(name), exist_ok=True)
+        shapes = {'X_train': ((train_rows, columns), dtype), 'X_test': ((test_rows, columns), dtype),
+                  'y_train': ((train_rows,), np.int8), 'y_test': ((test_rows,), np.int8)}
+        return {key: np.lib.format.open_memmap(self.path(name, f'{key}.npy.{os.getpid()}.tmp'),
+                                               mode='w+', dtype=dtype_, shape=shape)
+                for key, (shape, dtype_) in shapes.items()}
+
+    def discard(self, arrays):
+        """Delete the temporary files of arrays from create() (after a failed fill)
+
+        Dropping the dict's references closes the maps before the files
+        are removed; the caller must not hold other references to them.
+        """
+        tmps = [values.filename for values in arrays.values()]
+        arrays.clear()
+        for tmp in tmps:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def finish(self, name, arrays, feature_columns, scaler=None, **meta):
+        """Flush arrays from create() into place and write the metadata
+
+        The maps are closed (the dict's references dropped) before any file
+        is renamed: Windows refuses to rename a file that is still mapped.
+        """
+        tmps = {key: values.filename for key, values in arrays.items()}
+        for key in tmps:
+            arrays[key].flush()
+        arrays.clear()
+        for key, tmp in tmps.items():
+            os.replace(tmp, self.path(name, f'{key}.npy'))
+
+        if scaler is not None:
+            joblib.dump(scaler, self.path(name, 'scaler.pkl'))
+        joblib.dump(list(feature_columns), self.path(name, 'feature_columns.pkl'))
+        self._write_meta(name, {'name': name, 'feature_columns': list(feature_columns),
+                                'created': time.time(), **meta})
+        logger.info(f"[SAVED] {self.path(name)} (train {meta.get('train_rows')}, test {meta.get('test_rows')})")
+        return self.path(name)
+
+    def write_pooled(self, pairs, name=POOLED):
+        """Stack every pair's dataset into one, with a pair_id column
+
+        Rows are copied pair by pair into memory-mapped output files, so
+        the pooled set is never held in memory as a whole.
+        """
+        pairs = list(pairs)
+        metas = [self.meta(pair) for pair in pairs]
+        columns = metas[0]['feature_columns']
+        for pair, meta in zip(pairs, metas):
+            if meta['feature_columns'] != columns:
+                raise ValueError(f"{pair} has different feature columns than {pairs[0]}")
+        dtype = np.result_type(*(meta['dtype'] for meta in metas))
+
+        train_rows = sum(meta['train_rows'] for meta in metas)
+        test_rows = sum(meta['test_rows'] for meta in metas)
+        arrays = self.create(name, train_rows, test_rows, len(columns) + 1, dtype)
+        try:
+            # Index arrays directly (no local names) so finish/discard can close the maps
+            for split in ['train', 'test']:
+                start = 0
+                for pair_id, pair in enumerate(pairs):
+                    part = self.load(pair, [f'X_{split}', f'y_{split}'])
+                    stop = start + len(part[f'X_{split}'])
+                    arrays[f'X_{split}'][start:stop, :-1] = part[f'X_{split}']
+                    arrays[f'X_{split}'][start:stop, -1] = pair_id
+                    arrays[f'y_{split}'][start:stop] = part[f'y_{split}']
+                    start = stop
+        except BaseException:
+            self.discard(arrays)
+            raise
+
+        return self.finish(name, arrays, columns + ['pair_id'], pairs=pairs, train_rows=train_rows,
+                           test_rows=test_rows, dtype=np.dtype(dtype).name)
+
+    def _write_meta(self, name, meta):
+        path = self.path(name, 'meta.json')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, path)
+
+    def meta(self, name):
+        with open(self.path(name, 'meta.json')) as f:
+            return json.load(f)
+
+    def load(self, name, arrays=ARRAYS, mmap=True):
+        """{array name: array}, memory-mapped read-only unless mmap=False"""
+        if not self.exists(name):
+            raise FileNotFoundError(f"No dataset '{name}' in {self.root}")
+        return {key: np.load(self.path(name, f'{key}.npy'), mmap_mode='r' if mmap else None)
+                for key in arrays}
+
+    def scaler(self, name):
+        return joblib.load(self.path(name, 'scaler.pkl'))
+
+    def summary(self):
+        """One row per stored dataset"""
+        rows = []
+        for name in self.names():
+            meta = self.meta(name)
+            rows.append({
+                'dataset': name,
+                'train_rows': meta['train_rows'],
+                'test_rows': meta['test_rows'],
+                'features': len(meta['feature_columns']),
+                'dtype': meta['dtype'],
+                'MB': sum(os.path.getsize(self.path(name, f'{key}.npy')) for key in ARRAYS) / 1e6
+            })
+        return pd.DataFrame(rows, columns=['dataset', 'train_rows', 'test_rows', 'features', 'dtype', 'MB'])
+
+
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("TRAINING DATASETS")
+    print("="*70)
+    print(DatasetStore().summary().to_string(index=False))
+    print("="*70)
@@ -1,27 +1,86 @@
-import pandas as pd
-import numpy as np
 import logging
 import os
 
+from storage import get_storage
+from feature_graph import CLOSE, FEATURES, FeaturePlan, Indicators
+from feature_store import FeatureStore, frame_fingerprint
+from parameter_sweep import ParameterSweep
+from precision import DTYPES, downcast, get_dtype
+from price_store import PriceStore
+from parallel import run_pairs
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class FeatureEngineer:
-    """Creates technical indicators for ML models"""
+    """Creates technical indicators for ML models
+    
+    Indicators come from the shared feature graph (feature_graph.py), the
+    same code the live PredictionEngine uses. With copy=False indicator
+    columns are added to the caller's frame instead of a private copy.
+    Indicator columns are stored in dtype
+    (precision.py policy); kernels always compute in float64.
+    """
     
-    def __init__(self, data):
-        self.data = data.copy()
+    def __init__(self, data, copy=True, dtype=None):
+        self.copy = copy
+        self.data = data.copy() if copy else data
+        self.dtype = get_dtype(dtype)
+        self._indicators = None
         logger.info("[OK] FeatureEngineer initialized")
     
-    def moving_averages(self):
-        """Create moving averages"""
+    @classmethod
+    def from_store(cls, pair, start=None, end=None, store=None):
+        """Build from a window of the memory-mapped price store
+        
+        Include enough warm-up bars before the window of interest:
+        FeaturePlan(columns).lookback bars for the requested columns.
+        """
+        # The window is freshly materialized, so there is nothing to protect
+        return cls((store or PriceStore()).load(pair, start, end), copy=False)
+    
+    def kernels(self):
+        """Shared indicator kernels over the current prices (built once)"""
+        if self._indicators is None:
+            self._indicators = Indicators.from_frame(self.data)
+        return self._indicators
+    
+    def _add(self, name, values):
+        """Store one indicator column in the policy dtype"""
+        self.data[name] = downcast(values, self.dtype)
+    
+    def build(self, feature_columns=FEATURES, store=None, pair=None):
+        """Add only the requested feature columns in one planned pass
+        
+        feature_columns may be a list or a feature_columns.pkl path; shared
+        intermediates are computed once across all of them. With a
+        FeatureStore, cached columns are loaded and only the rest computed.
+        """
+        plan = FeaturePlan.from_file(feature_columns) if isinstance(feature_columns, str) else FeaturePlan(feature_columns)
+        logger.info(f"[CREATING] {len(plan.outputs)} planned features (warm-up {plan.lookback} bars)...")
+        
+        if store is not None:
+            features = store.get(self.data, list(plan.outputs), pair)
+        else:
+            features = plan.evaluate(self.data, self.kernels())
+        for name, values in features.items():
+            self._add(name, values)
+        
+        logger.info("[OK] Planned features created")
+        return self
+    
+    def moving_averages(self, windows=(10, 20, 50, 200)):
+        """Create moving averages
+        
+        All windows come from one prefix-sum pass, which also yields the
+        rolling stds that bollinger_bands reuses.
+        """
         logger.info("[CREATING] Moving averages...")
         
-        self.data['SMA_10'] = self.data['Close'].rolling(10).mean()
-        self.data['SMA_20'] = self.data['Close'].rolling(20).mean()
-        self.data['SMA_50'] = self.data['Close'].rolling(50).mean()
-        self.data['SMA_200'] = self.data['Close'].rolling(200).mean()
+        kernels = self.kernels().rolling(CLOSE, windows)
+        for window in windows:
+            self._add(f'SMA_{window}', kernels.sma(window))
         
         logger.info("[OK] Moving averages created")
         return self
@@ -30,11 +89,7 @@ class FeatureEngineer:
         """Calculate RSI (Relative Strength Index)"""
         logger.info("[CREATING] RSI...")
         
-        delta = self.data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        self.data['RSI'] = 100 - (100 / (1 + rs))
+        self._add('RSI', self.kernels().rsi(period))
         
         logger.info("[OK] RSI created")
         return self
@@ -43,11 +98,10 @@ class FeatureEngineer:
         """Calculate MACD"""
         logger.info("[CREATING] MACD...")
         
-        ema_fast = self.data['Close'].ewm(span=fast, adjust=False).mean()
-        ema_slow = self.data['Close'].ewm(span=slow, adjust=False).mean()
-        self.data['MACD'] = ema_fast - ema_slow
-        self.data['MACD_Signal'] = self.data['MACD'].ewm(span=signal, adjust=False).mean()
-        self.data['MACD_Hist'] = self.data['MACD'] - self.data['MACD_Signal']
+        line, signal_line, hist = self.kernels().macd(fast, slow, signal)
+        self._add('MACD', line)
+        self._add('MACD_Signal', signal_line)
+        self._add('MACD_Hist', hist)
         
         logger.info("[OK] MACD created")
         return self
@@ -56,12 +110,11 @@ class FeatureEngineer:
         """Calculate Bollinger Bands"""
         logger.info("[CREATING] Bollinger Bands...")
         
-        middle = self.data['Close'].rolling(period).mean()
-        std = self.data['Close'].rolling(period).std()
-        self.data['BB_Upper'] = middle + (std * 2)
-        self.data['BB_Lower'] = middle - (std * 2)
-        self.data['BB_Middle'] = middle
-        self.data['BB_Width'] = (self.data['BB_Upper'] - self.data['BB_Lower']) / middle * 100
+        upper, lower, middle, width = self.kernels().rolling(CLOSE, [period]).bollinger_bands(period)
+        self._add('BB_Upper', upper)
+        self._add('BB_Lower', lower)
+        self._add('BB_Middle', middle)
+        self._add('BB_Width', width)
         
         logger.info("[OK] Bollinger Bands created")
         return self
@@ -70,25 +123,20 @@ class FeatureEngineer:
         """Create price-based features"""
         logger.info("[CREATING] Price features...")
         
-        self.data['Daily_Return'] = self.data['Close'].pct_change() * 100
-        self.data['Intraday_Range'] = ((self.data['High'] - self.data['Low']) / self.data['Close']) * 100
-        self.data['Gap'] = ((self.data['Open'] - self.data['Close'].shift(1)) / self.data['Close'].shift(1)) * 100
+        kernels = self.kernels()
+        self._add('Daily_Return', kernels.daily_return())
+        self._add('Intraday_Range', kernels.intraday_range())
+        self._add('Gap', kernels.gap())
         
         logger.info("[OK] Price features created")
         return self
     
     def volatility(self, period=20):
-        """Calculate volatility"""
+        """Calculate volatility and Average True Range"""
         logger.info("[CREATING] Volatility...")
         
-        self.data['Volatility'] = self.data['Daily_Return'].rolling(period).std()
-        
-        # Average True Range
-        high_low = self.data['High'] - self.data['Low']
-        high_close = abs(self.data['High'] - self.data['Close'].shift())
-        low_close = abs(self.data['Low'] - self.data['Close'].shift())
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        self.data['ATR'] = true_range.rolling(period).mean()
+        self._add('Volatility', self.kernels().volatility(period))
+        self._add('ATR', self.kernels().atr(period))
         
         logger.info("[OK] Volatility created")
         return self
@@ -97,28 +145,38 @@ class FeatureEngineer:
         """Calculate momentum indicators"""
         logger.info("[CREATING] Momentum...")
         
-        self.data['ROC_5'] = ((self.data['Close'] - self.data['Close'].shift(5)) / self.data['Close'].shift(5)) * 100
-        self.data['ROC_10'] = ((self.data['Close'] - self.data['Close'].shift(10)) / self.data['Close'].shift(10)) * 100
+        self._add('ROC_5', self.kernels().roc(5))
+        self._add('ROC_10', self.kernels().roc(10))
         
         logger.info("[OK] Momentum created")
         return self
     
+    def sweep(self, grids):
+        """{indicator: SweepResult} for parameter grids, e.g. {'rsi': {'period': range(5, 51)}}
+        
+        Shares the indicator cache with the other methods, so intermediates
+        already built for the features are not recomputed.
+        """
+        return ParameterSweep(self.kernels(), self.data.index).run(grids)
+    
     def remove_nan(self):
         """Remove rows with NaN values"""
         logger.info("[PROCESSING] Removing NaN rows...")
         
         before = len(self.data)
-        self.data = self.data.dropna()
+        if self.copy:
+            self.data = self.data.dropna()
+        else:
+            self.data.dropna(inplace=True)
+        self._indicators = None
         removed = before - len(self.data)
         
         logger.info(f"[OK] Rows removed: {removed}")
         return self
     
-    def save(self, filename):
-        """Save features"""
-        os.makedirs('data/processed', exist_ok=True)
-        self.data.to_csv(f"data/processed/{filename}")
-        logger.info(f"[SAVED] data/processed/{filename}")
+    def save(self, filename, storage=None):
+        """Save features (format from storage, CSV by default)"""
+        get_storage(storage).save(self.data, 'data/processed', filename)
         return self
     
     def get_data(self):
@@ -126,40 +184,73 @@ class FeatureEngineer:
         return self.data
 
 
+def engineer_pair(pair, storage=None, store=None, dtype=None):
+    """Build and save one pair's features (the unit of work for --jobs)
+    
+    With a FeatureStore, unchanged columns come from the cache and the
+    features file is not rewritten when nothing it depends on has changed.
+    """
+    dtype = get_dtype(dtype)
+    print(f"[PROCESSING] {pair}")
+    print("-" * 70)
+    
+    storage = get_storage(storage)
+    data = storage.load('data/processed', f'{pair}_processed')
+    
+    if store is None:
+        features = (FeatureEngineer(data, dtype=dtype)
+                   .moving_averages()
+                   .rsi()
+                   .macd()
+                   .bollinger_bands()
+                   .price_features()
+                   .volatility()
+                   .momentum()
+                   .remove_nan()
+                   .save(f'{pair}_features', storage)
+                   .get_data())
+        print(f"[OK] {pair}: {len(features.columns)} features, {len(features)} records\n")
+        return features.shape
+    
+    name = f'{pair}_features'
+    token = store.token(store.keys(data, FEATURES), storage.format_name, dtype.__name__,
+                        frame_fingerprint(data))
+    record = store.output_record(f'{name}{storage.extension}')
+    if record and record['token'] == token and os.path.exists(storage.path('data/processed', name)):
+        print(f"[CACHED] {pair}: features up to date\n")
+        return tuple(record['shape'])
+    
+    features = (FeatureEngineer(data, dtype=dtype)
+               .build(FEATURES, store, pair)
+               .remove_nan()
+               .save(name, storage)
+               .get_data())
+    store.record_output(f'{name}{storage.extension}', token, features.shape)
+    
+    print(f"[OK] {pair}: {len(features.columns)} features, {len(features)} records\n")
+    return features.shape
+
+
 if __name__ == "__main__":
+    import argparse
+    from functools import partial
+    
+    parser = argparse.ArgumentParser(description="Engineer features for every pair")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes (0 = all cores)")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute everything without the feature store")
+    parser.add_argument('--dtype', choices=list(DTYPES), default=None, help="Feature dtype (default: FOREX_FEATURE_DTYPE or float64)")
+    args = parser.parse_args()
     
     print("\n" + "="*70)
     print("PHASE 3: FEATURE ENGINEERING")
     print("="*70 + "\n")
     
     pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']
+    storage = get_storage()
+    
+    store = None if args.no_cache else FeatureStore()
     
-    for pair in pairs:
-        print(f"[PROCESSING] {pair}")
-        print("-" * 70)
-        
-        try:
-            data = pd.read_csv(f'data/processed/{pair}_processed.csv',
-                              index_col=0, parse_dates=True)
-            
-            engineer = FeatureEngineer(data)
-            
-            features = (engineer
-                       .moving_averages()
-                       .rsi()
-                       .macd()
-                       .bollinger_bands()
-                       .price_features()
-                       .volatility()
-                       .momentum()
-                       .remove_nan()
-                       .save(f'{pair}_features.csv')
-                       .get_data())
-            
-            print(f"[OK] {pair}: {len(features.columns)} features, {len(features)} records\n")
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to process {pair}: {str(e)}\n")
+    run_pairs(partial(engineer_pair, storage=storage, store=store, dtype=args.dtype), pairs, args.jobs)
     
     print("="*70)
     print("Phase 3 Complete! All features engineered.")
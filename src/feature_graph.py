@@ -0,0 +1,375 @@
+"""
+FEATURE GRAPH
+
+Declarative definitions of every feature as a graph of kernel calls from
+indicators.py. Each node names its operation, inputs and parameters, so
+identical intermediates are the same node wherever they appear:
+
+    SMA_20 and BB_Middle       -> one rolling_mean(Close, 20)
+    Gap, ATR, RSI, Daily_Return -> one shift(Close, 1)
+
+FeaturePlan takes a list of feature columns (e.g. feature_columns.pkl),
+keeps only the nodes those features need, and reports the warm-up
+lookback: how many leading bars are NaN before every feature is valid.
+
+    plan = FeaturePlan.from_file('data/models/feature_columns.pkl')
+    features = plan.evaluate(prices)
+"""
+
+import numpy as np
+import joblib
+import re
+import time
+
+from indicators import (FEATURES, shift, rolling_mean, rolling_std, rolling_stats, ema,
+                        gains, losses, rsi_from_averages, true_range)
+
+
+def _same(lookbacks, *params):
+    return max(lookbacks, default=0)
+
+
+def _window(lookbacks, window):
+    return lookbacks[0] + window - 1
+
+
+# op -> (kernel, lookback rule). A lookback rule maps the input lookbacks
+# (and the node parameters) to the number of leading NaN bars of the output.
+OPS = {
+    'shift': (shift, lambda lookbacks, periods: lookbacks[0] + periods),
+    'rolling_mean': (rolling_mean, _window),
+    'rolling_std': (rolling_std, _window),
+    'ema': (ema, _same),
+    'sub': (np.subtract, _same),
+    'gains': (gains, lambda lookbacks: 0),
+    'losses': (losses, lambda lookbacks: 0),
+    'rsi': (rsi_from_averages, _same),
+    'band': (lambda middle, std, width: middle + std * width, _same),
+    'width': (lambda upper, lower, middle: (upper - lower) / middle * 100, _same),
+    'return': (lambda x, previous: (x / previous - 1) * 100, _same),
+    'change': (lambda x, base: (x - base) / base * 100, _same),
+    'range': (lambda high, low, close: (high - low) / close * 100, _same),
+    # The NaN previous close on the first bar is skipped, so it adds no lookback
+    'true_range': (true_range, lambda lookbacks: max(lookbacks[:2]))
+}
+
+
+class Node:
+    """One kernel call; nodes with equal (op, inputs, params) are the same node"""
+
+    __slots__ = ('op', 'inputs', 'params', 'key', 'lookback')
+
+    def __init__(self, op, inputs=(), params=()):
+        self.op = op
+        self.inputs = tuple(inputs)
+        self.params = tuple(params)
+        self.key = (op, tuple(node.key for node in self.inputs), self.params)
+        if op == 'column':
+            self.lookback = 0
+        else:
+            self.lookback = OPS[op][1]([node.lookback for node in self.inputs], *self.params)
+
+    def sources(self):
+        """Price columns this node reads, directly or through its inputs"""
+        if self.op == 'column':
+            return {self.params[0]}
+        return set().union(*(node.sources() for node in self.inputs))
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.key == other.key
+
+    def __repr__(self):
+        args = [repr(node) for node in self.inputs] + [repr(p) for p in self.params]
+        return f"{self.op}({', '.join(args)})"
+
+
+OPEN, HIGH, LOW, CLOSE = (Node('column', params=(col,)) for col in ['Open', 'High', 'Low', 'Close'])
+PREVIOUS_CLOSE = Node('shift', (CLOSE,), (1,))
+
+
+# ==================== DEFINITIONS ====================
+
+def sma(window):
+    return Node('rolling_mean', (CLOSE,), (window,))
+
+
+def rsi(period=14):
+    delta = Node('sub', (CLOSE, PREVIOUS_CLOSE))
+    return Node('rsi', (Node('rolling_mean', (Node('gains', (delta,)),), (period,)),
+                        Node('rolling_mean', (Node('losses', (delta,)),), (period,))))
+
+
+def macd(fast=12, slow=26, signal=9):
+    """(MACD, signal line, histogram)"""
+    line = Node('sub', (Node('ema', (CLOSE,), (fast,)), Node('ema', (CLOSE,), (slow,))))
+    signal_line = Node('ema', (line,), (signal,))
+    return line, signal_line, Node('sub', (line, signal_line))
+
+
+def bollinger_bands(period=20, width=2.0):
+    """(upper, lower, middle, width %)"""
+    middle = sma(period)
+    std = Node('rolling_std', (CLOSE,), (period,))
+    upper = Node('band', (middle, std), (width,))
+    lower = Node('band', (middle, std), (-width,))
+    return upper, lower, middle, Node('width', (upper, lower, middle))
+
+
+def daily_return():
+    return Node('return', (CLOSE, PREVIOUS_CLOSE))
+
+
+def intraday_range():
+    return Node('range', (HIGH, LOW, CLOSE))
+
+
+def gap():
+    return Node('change', (OPEN, PREVIOUS_CLOSE))
+
+
+def volatility(period=20):
+    return Node('rolling_std', (daily_return(),), (period,))
+
+
+def atr(period=20):
+    return Node('rolling_mean', (Node('true_range', (HIGH, LOW, PREVIOUS_CLOSE)),), (period,))
+
+
+def roc(period):
+    return Node('change', (CLOSE, Node('shift', (CLOSE,), (period,))))
+
+
+NAMED = {
+    'RSI': lambda: rsi(),
+    'MACD': lambda: macd()[0],
+    'MACD_Signal': lambda: macd()[1],
+    'MACD_Hist': lambda: macd()[2],
+    'BB_Upper': lambda: bollinger_bands()[0],
+    'BB_Lower': lambda: bollinger_bands()[1],
+    'BB_Middle': lambda: bollinger_bands()[2],
+    'BB_Width': lambda: bollinger_bands()[3],
+    'Daily_Return': daily_return,
+    'Intraday_Range': intraday_range,
+    'Gap': gap,
+    'Volatility': lambda: volatility(),
+    'ATR': lambda: atr()
+}
+
+
+def feature_node(name):
+    """Graph node for a feature column name (SMA_<n> and ROC_<n> take any window)"""
+    match = re.fullmatch(r'(SMA|ROC)_(\d+)', name)
+    if match:
+        window = int(match.group(2))
+        return sma(window) if match.group(1) == 'SMA' else roc(window)
+    if name not in NAMED:
+        raise KeyError(f"Unknown feature '{name}'")
+    return NAMED[name]()
+
+
+def load_feature_columns(path='data/models/feature_columns.pkl'):
+    """Feature column list saved by MLDataPreparation"""
+    return list(joblib.load(path))
+
+
+# ==================== EVALUATION ====================
+
+class Indicators:
+    """Evaluates graph nodes over one OHLC series or a [pairs, time] panel, each node at most once"""
+
+    def __init__(self, open_, high, low, close):
+        self.columns = {
+            'Open': np.asarray(open_, dtype=np.float64),
+            'High': np.asarray(high, dtype=np.float64),
+            'Low': np.asarray(low, dtype=np.float64),
+            'Close': np.asarray(close, dtype=np.float64)
+        }
+        self._cache = {}
+
+    @classmethod
+    def from_frame(cls, data):
+        return cls(*(data[col].to_numpy(dtype=np.float64) for col in ['Open', 'High', 'Low', 'Close']))
+
+    def evaluate(self, node):
+        """Array for a node; shared inputs come from the cache"""
+        if node.key not in self._cache:
+            if node.op == 'column':
+                self._cache[node.key] = self.columns[node.params[0]]
+            else:
+                args = [self.evaluate(child) for child in node.inputs]
+                self._cache[node.key] = OPS[node.op][0](*args, *node.params)
+        return self._cache[node.key]
+
+    def rolling(self, node, windows, std=True):
+        """Rolling means (and stds) of node for many windows in one prefix-sum pass"""
+        means = {w: Node('rolling_mean', (node,), (w,)) for w in windows}
+        stds = {w: Node('rolling_std', (node,), (w,)) for w in windows} if std else {}
+        pending = sorted({w for w in windows
+                          if means[w].key not in self._cache or (std and stds[w].key not in self._cache)})
+        if pending:
+            mean_rows, std_rows = rolling_stats(self.evaluate(node), pending, std=std)
+            for i, window in enumerate(pending):
+                self._cache.setdefault(means[window].key, mean_rows[i])
+                if std:
+                    self._cache.setdefault(stds[window].key, std_rows[i])
+        return self
+
+    def feature(self, name):
+        return self.evaluate(feature_node(name))
+
+    def sma(self, window):
+        return self.evaluate(sma(window))
+
+    def rsi(self, period=14):
+        return self.evaluate(rsi(period))
+
+    def macd(self, fast=12, slow=26, signal=9):
+        return tuple(self.evaluate(node) for node in macd(fast, slow, signal))
+
+    def bollinger_bands(self, period=20, width=2.0):
+        return tuple(self.evaluate(node) for node in bollinger_bands(period, width))
+
+    def daily_return(self):
+        return self.evaluate(daily_return())
+
+    def intraday_range(self):
+        return self.evaluate(intraday_range())
+
+    def gap(self):
+        return self.evaluate(gap())
+
+    def volatility(self, period=20):
+        return self.evaluate(volatility(period))
+
+    def atr(self, period=20):
+        return self.evaluate(atr(period))
+
+    def roc(self, period):
+        return self.evaluate(roc(period))
+
+
+class FeaturePlan:
+    """The de-duplicated set of nodes needed for a list of feature columns
+
+    feature_columns may also be a {name: node} dict of custom definitions.
+    """
+
+    def __init__(self, feature_columns=FEATURES):
+        if isinstance(feature_columns, dict):
+            self.outputs = dict(feature_columns)
+        else:
+            self.outputs = {name: feature_node(name) for name in feature_columns}
+
+        # Depth-first topological order, each distinct node once
+        self.nodes = []
+        seen = set()
+
+        def visit(node):
+            if node.key in seen:
+                return
+            for child in node.inputs:
+                visit(child)
+            seen.add(node.key)
+            self.nodes.append(node)
+
+        for node in self.outputs.values():
+            visit(node)
+
+        self.lookback = max((node.lookback for node in self.outputs.values()), default=0)
+
+    @classmethod
+    def from_file(cls, path='data/models/feature_columns.pkl'):
+        return cls(load_feature_columns(path))
+
+    def rolling_groups(self):
+        """(input node, windows, needs std) for every input with rolling nodes
+
+        All windows over one input are evaluated together from shared
+        prefix sums instead of one rolling pass per window.
+        """
+        groups = {}
+        for node in self.nodes:
+            if node.op in ('rolling_mean', 'rolling_std'):
+                source, windows, std = groups.get(node.inputs[0].key, (node.inputs[0], set(), False))
+                windows.add(node.params[0])
+                groups[source.key] = (source, windows, std or node.op == 'rolling_std')
+        return [(source, sorted(windows), std) for source, windows, std in groups.values()]
+
+    def source_columns(self):
+        """Price columns the plan reads"""
+        return [node.params[0] for node in self.nodes if node.op == 'column']
+
+    def evaluate(self, data, indicators=None):
+        """{feature: array} for an OHLC frame (or an existing Indicators cache)"""
+        indicators = indicators or Indicators.from_frame(data)
+        for source, windows, std in self.rolling_groups():
+            indicators.rolling(source, windows, std)
+        return {name: indicators.evaluate(node) for name, node in self.outputs.items()}
+
+    def describe(self):
+        """Node counts with and without sharing"""
+        def operations(node):
+            return (node.op != 'column') + sum(operations(child) for child in node.inputs)
+
+        return {
+            'features': len(self.outputs),
+            'nodes': sum(1 for node in self.nodes if node.op != 'column'),
+            'unshared_nodes': sum(operations(node) for node in self.outputs.values()),
+            'lookback': self.lookback
+        }
+
+
+def compute_features(data, names=FEATURES):
+    """Requested feature arrays for an OHLC frame"""
+    return FeaturePlan(names).evaluate(data)
+
+
+def add_features(data, names=FEATURES):
+    """Add the requested feature columns to an OHLC frame in place"""
+    for name, values in compute_features(data, names).items():
+        data[name] = values
+    return data
+
+
+def benchmark(sizes=(90, 100_000), repeat=20, seed=0):
+    """Per-call latency of computing all FEATURES on random-walk bars"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    for size in sizes:
+        close = 1.1 + np.cumsum(rng.normal(0, 0.004, size))
+        data = pd.DataFrame({'Open': close, 'High': close + 0.002, 'Low': close - 0.002, 'Close': close})
+
+        compute_features(data)  # warm-up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compute_features(data)
+        results[size] = (time.perf_counter() - start) / repeat
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feature graph plan and kernel benchmark")
+    parser.add_argument('--features', default=None, help="feature_columns.pkl to plan for (default: all)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[90, 100_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    plan = FeaturePlan.from_file(args.features) if args.features else FeaturePlan()
+    stats = plan.describe()
+
+    print("\n" + "="*70)
+    print("FEATURE GRAPH")
+    print("="*70)
+    print(f"Features: {stats['features']} | Nodes: {stats['nodes']} "
+          f"(unshared: {stats['unshared_nodes']}) | Warm-up: {stats['lookback']} bars")
+    print("-"*70)
+    for size, seconds in benchmark(args.sizes, args.repeat).items():
+        print(f"{size:>9} rows  {seconds*1000:9.3f} ms/call  {len(FEATURES)} features")
+    print("="*70)
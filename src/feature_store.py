@@ -0,0 +1,247 @@
+"""
+CONTENT-ADDRESSED FEATURE STORE
+
+Caches computed feature columns on disk, one file per column:
+
+    data/features/{key[:2]}/{key}.npy    float64 values
+    data/features/{key[:2]}/{key}.json   pair, column, definition, rows, created
+
+The key is a hash of everything that determines the values:
+1. input fingerprint - hash of the price columns the feature reads
+2. definition        - the feature's graph node, parameters included
+3. code version      - hash of the kernel sources (indicators.py, ...)
+
+Changing a window, a kernel or one pair's prices therefore misses only the
+affected columns; everything else is served from disk. There is no shared
+index file (entries carry their own metadata and file mtime is the last
+use), so --jobs workers can share one store. The store is kept under
+max_bytes by evicting the least recently used entries.
+
+    python src/feature_store.py list
+    python src/feature_store.py gc --max-mb 256
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import logging
+import os
+import time
+
+from feature_graph import FEATURES, FeaturePlan
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+KERNEL_MODULES = ['indicators.py', 'recursive_kernels.py', 'feature_graph.py']
+
+_code_version = None
+
+
+def code_version():
+    """Hash of the kernel sources: editing any of them invalidates the store"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(f"feature-store-{STORE_VERSION}".encode())
+        here = os.path.dirname(os.path.abspath(__file__))
+        for module in KERNEL_MODULES:
+            with open(os.path.join(here, module), 'rb') as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def fingerprint(values):
+    """Content hash of one price column"""
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def frame_fingerprint(data):
+    """Content hash of a whole frame: index, column names and values"""
+    digest = hashlib.sha256(repr(list(data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Directory of cached feature columns addressed by content hash"""
+
+    def __init__(self, root='data/features', max_bytes=512 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key, extension):
+        return os.path.join(self.root, key[:2], key + extension)
+
+    def keys(self, data, feature_columns=FEATURES):
+        """{column: key} for the current prices and definitions"""
+        plan = FeaturePlan(feature_columns)
+        prints = {col: fingerprint(data[col].to_numpy(dtype=np.float64)) for col in plan.source_columns()}
+        version = code_version()
+
+        keys = {}
+        for name, node in plan.outputs.items():
+            digest = hashlib.sha256(version.encode())
+            digest.update(repr(node).encode())
+            for col in sorted(node.sources()):
+                digest.update(f"{col}:{prints[col]}".encode())
+            keys[name] = digest.hexdigest()
+        return keys
+
+    def load(self, key):
+        """Cached values for a key, or None (a hit refreshes its last-use time)"""
+        path = self._path(key, '.npy')
+        try:
+            values = np.load(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker since the read: the values are still good
+            pass
+        return values
+
+    def save(self, key, values, **meta):
+        os.makedirs(os.path.dirname(self._path(key, '.npy')), exist_ok=True)
+        for extension, write in [('.npy', lambda f: np.save(f, np.asarray(values, dtype=np.float64))),
+                                 ('.json', lambda f: f.write(json.dumps(
+                                     {**meta, 'rows': len(values), 'created': time.time()}).encode()))]:
+            # Write then rename so a concurrent reader never sees a partial file
+            path = self._path(key, extension)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, path)
+
+    def get(self, data, feature_columns=FEATURES, pair=None):
+        """{column: values}, computing and caching only the columns that miss"""
+        keys = self.keys(data, feature_columns)
+        values = {name: self.load(key) for name, key in keys.items()}
+        missing = [name for name, cached in values.items() if cached is None or len(cached) != len(data)]
+
+        if missing:
+            plan = FeaturePlan(missing)
+            for name, computed in plan.evaluate(data).items():
+                self.save(keys[name], computed, pair=pair, column=name, definition=repr(plan.outputs[name]))
+                values[name] = computed
+            self.evict()
+
+        logger.info(f"[FEATURE STORE] {pair or 'data'}: {len(keys) - len(missing)} cached, "
+                    f"{len(missing)} computed")
+        return values
+
+    def token(self, keys, *extra):
+        """One hash for a whole output (all its column keys plus e.g. the file format)"""
+        return hashlib.sha256(''.join([*keys.values(), *map(str, extra)]).encode()).hexdigest()
+
+    def output_record(self, name):
+        """What was last written for an output name ({'token', 'shape'}), or None"""
+        try:
+            with open(os.path.join(self.root, 'outputs', name + '.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def record_output(self, name, token, shape):
+        os.makedirs(os.path.join(self.root, 'outputs'), exist_ok=True)
+        path = os.path.join(self.root, 'outputs', name + '.json')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'token': token, 'shape': list(shape)}, f)
+        os.replace(tmp, path)
+
+    def entries(self):
+        """One row per cached column, most recently used first"""
+        rows = []
+        if os.path.isdir(self.root):
+            for shard in sorted(os.listdir(self.root)):
+                directory = os.path.join(self.root, shard)
+                if shard == 'outputs' or not os.path.isdir(directory):
+                    continue
+                for filename in os.listdir(directory):
+                    if not filename.endswith('.npy'):
+                        continue
+                    key = filename[:-4]
+                    try:
+                        stat = os.stat(os.path.join(directory, filename))
+                    except FileNotFoundError:
+                        # Evicted by another worker since listdir
+                        continue
+                    try:
+                        with open(self._path(key, '.json')) as f:
+                            meta = json.load(f)
+                    except (FileNotFoundError, ValueError):
+                        meta = {}
+                    rows.append({
+                        'key': key,
+                        'pair': meta.get('pair'),
+                        'column': meta.get('column'),
+                        'rows': meta.get('rows'),
+                        'bytes': stat.st_size,
+                        'last_used': pd.Timestamp(stat.st_mtime, unit='s')
+                    })
+        columns = ['key', 'pair', 'column', 'rows', 'bytes', 'last_used']
+        return pd.DataFrame(rows, columns=columns).sort_values('last_used', ascending=False, ignore_index=True)
+
+    def remove(self, key):
+        for extension in ['.npy', '.json']:
+            try:
+                os.remove(self._path(key, extension))
+            except FileNotFoundError:
+                pass
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used entries until the store fits max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        kept = entries['bytes'].cumsum() <= max_bytes
+        for key in entries.loc[~kept, 'key']:
+            self.remove(key)
+        if (~kept).any():
+            logger.info(f"[EVICTED] {int((~kept).sum())} entries, "
+                        f"{entries.loc[~kept, 'bytes'].sum()/1e6:.2f} MB")
+        return int((~kept).sum())
+
+    def clear(self):
+        """Remove every entry and output record"""
+        for key in self.entries()['key']:
+            self.remove(key)
+        outputs = os.path.join(self.root, 'outputs')
+        if os.path.isdir(outputs):
+            for filename in os.listdir(outputs):
+                os.remove(os.path.join(outputs, filename))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Feature store maintenance")
+    parser.add_argument('--root', default='data/features')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="List cached feature columns")
+    gc = sub.add_parser('gc', help="Evict least recently used entries")
+    gc.add_argument('--max-mb', type=float, default=512)
+    sub.add_parser('clear', help="Remove every entry")
+    args = parser.parse_args()
+
+    store = FeatureStore(args.root)
+
+    if args.command == 'list':
+        entries = store.entries()
+        print("\n" + "="*70)
+        print(f"FEATURE STORE - {args.root}")
+        print("="*70)
+        if len(entries):
+            summary = entries.groupby('pair', dropna=False).agg(columns=('column', 'count'), bytes=('bytes', 'sum'))
+            print(summary.assign(MB=summary['bytes'] / 1e6).drop(columns='bytes').round(2).to_string())
+        print(f"\nEntries: {len(entries)} | Size: {entries['bytes'].sum()/1e6:.2f} MB")
+        print("="*70)
+    elif args.command == 'gc':
+        removed = store.evict(int(args.max_mb * 2**20))
+        print(f"Removed {removed} entries")
+    else:
+        store.clear()
+        print("Feature store cleared")
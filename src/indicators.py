@@ -0,0 +1,160 @@
+"""
+INDICATOR KERNELS
+
+One NumPy implementation of every technical indicator, shared by training
+(FeatureEngineer) and live inference (PredictionEngine), so both paths
+produce the same features the models were trained on.
+
+These are the array-level kernels; feature_graph.py declares which kernel
+feeds which feature and evaluates each shared intermediate once. Every
+kernel takes one series or a [pairs, time] panel and works along time
+(the last axis), so a whole panel is one call.
+
+Conventions (identical to the original pandas code):
+- rolling windows are NaN until full and while they contain a NaN
+- EMAs are pandas ewm(span, adjust=False), seeded with the first value
+- RSI uses simple rolling means; a window with no losses is 100, a flat
+  window (no gains, no losses) is NaN
+- ATR is the simple mean of true range over 20 bars
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Recursive kernels (EMA) have their own compiled / NumPy backends
+from recursive_kernels import ema
+
+# Training feature columns, in FeatureEngineer order
+FEATURES = [
+    'SMA_10', 'SMA_20', 'SMA_50', 'SMA_200', 'RSI',
+    'MACD', 'MACD_Signal', 'MACD_Hist',
+    'BB_Upper', 'BB_Lower', 'BB_Middle', 'BB_Width',
+    'Daily_Return', 'Intraday_Range', 'Gap',
+    'Volatility', 'ATR', 'ROC_5', 'ROC_10'
+]
+
+
+def shift(x, periods=1):
+    """x shifted forward by periods along time (the last axis), NaN-padded (Series.shift)"""
+    out = np.full(np.shape(x), np.nan)
+    length = out.shape[-1]
+    if periods < length:
+        out[..., periods:] = x[..., :length - periods]
+    return out
+
+
+def rolling_stats(x, windows, std=True, block=4096):
+    """Trailing means and sample stds for many windows from shared prefix sums
+
+    x is one series or a [pairs, time] panel. Returns (means, stds), each
+    shaped (len(windows), *x.shape); stds is None when std=False. Row i
+    matches rolling(windows[i]).mean() / .std() along time: NaN until the
+    window is full and while it holds a NaN.
+
+    Cumulative sums lose precision as they grow, so they restart every
+    block rows (carrying max(windows) - 1 rows of overlap) around the
+    block's own mean. Windows whose variance is small next to the prefix-sum
+    error bound (flat or near-flat prices) are recomputed exactly with a
+    two-pass standard deviation.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    windows = list(windows)
+    if x.size == 0:
+        # reshape(-1, 0) is ambiguous: nothing to compute anyway
+        empty = np.full((len(windows),) + x.shape, np.nan)
+        return empty, empty.copy() if std else None
+    panel = x.reshape(-1, x.shape[-1]) if x.ndim else x.reshape(1, 1)
+    means = np.full((len(windows),) + panel.shape, np.nan)
+    stds = np.full((len(windows),) + panel.shape, np.nan) if std else None
+    overlap = max(windows, default=1) - 1
+    length = panel.shape[1]
+
+    for start in range(0, length, block):
+        end = min(start + block, length)
+        origin = max(start - overlap, 0)
+        _block_stats(panel[:, origin:end], windows, start - origin,
+                     means[..., start:end], stds[..., start:end] if std else None)
+    shape = (len(windows),) + x.shape
+    return means.reshape(shape), stds.reshape(shape) if std else None
+
+
+def _block_stats(segment, windows, offset, means, stds):
+    """Fill means/stds for segment[:, offset:] from prefix sums along each row"""
+    rows = segment.shape[0]
+    missing = np.isnan(segment)
+    values = np.where(missing, 0.0, segment)
+    zeros = np.zeros((rows, 1))
+    # Raw sums keep all-zero windows exactly zero (RSI gains/losses)
+    sums = np.concatenate((zeros, np.cumsum(values, axis=1)), axis=1)
+    nans = np.concatenate((zeros, np.cumsum(missing, axis=1)), axis=1)
+    if stds is not None:
+        # Variance comes from sums around each row's block mean to limit cancellation
+        observed = (~missing).sum(axis=1, keepdims=True)
+        centre = values.sum(axis=1, keepdims=True) / np.maximum(observed, 1)
+        y = np.where(missing, 0.0, segment - centre)
+        centred = np.concatenate((zeros, np.cumsum(y, axis=1)), axis=1)
+        squares = np.concatenate((zeros, np.cumsum(y * y, axis=1)), axis=1)
+        # Recompute where worst-case prefix-sum rounding could exceed 1e-5 of the variance
+        tolerance = 1e5 * np.finfo(np.float64).eps * segment.shape[1]
+
+    length = segment.shape[1]
+    for i, window in enumerate(windows):
+        first = max(offset, window - 1)
+        if first >= length:
+            continue
+        hi = slice(first + 1, length + 1)
+        lo = slice(first + 1 - window, length + 1 - window)
+        out = slice(first - offset, length - offset)
+
+        total = sums[:, hi] - sums[:, lo]
+        incomplete = (nans[:, hi] - nans[:, lo]) > 0
+        mean = total / window
+        mean[incomplete] = np.nan
+        means[i, :, out] = mean
+
+        if stds is None or window < 2:
+            continue
+        deviation = centred[:, hi] - centred[:, lo]
+        variance = (squares[:, hi] - squares[:, lo] - deviation * deviation / window) / (window - 1)
+        unstable = ~incomplete & (variance <= tolerance * (squares[:, hi] + squares[:, lo]) / (window - 1))
+        if unstable.any():
+            row, col = np.nonzero(unstable)
+            exact = sliding_window_view(segment, window, axis=1)[row, col + first - window + 1]
+            # A constant window is exactly 0, as in pandas
+            variance[unstable] = np.where(np.ptp(exact, axis=1) == 0, 0.0, exact.var(axis=1, ddof=1))
+        variance[incomplete] = np.nan
+        stds[i, :, out] = np.sqrt(np.maximum(variance, 0.0))
+
+
+def rolling_mean(x, window):
+    """Mean over the trailing window (rolling(window).mean())"""
+    return rolling_stats(x, [window], std=False)[0][0]
+
+
+def rolling_std(x, window):
+    """Sample standard deviation over the trailing window (rolling(window).std())"""
+    return rolling_stats(x, [window])[1][0]
+
+
+def gains(delta):
+    """Positive changes, 0 elsewhere (a NaN change counts as no gain)"""
+    return np.where(delta > 0, delta, 0.0)
+
+
+def losses(delta):
+    """Size of negative changes, 0 elsewhere"""
+    return np.where(delta < 0, -delta, 0.0)
+
+
+def rsi_from_averages(avg_gain, avg_loss):
+    """RSI from average gain and loss (no losses -> 100, flat -> NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def true_range(high, low, previous_close):
+    """Largest of high-low and the gaps to the previous close
+
+    fmax skips the NaN previous close on the first bar, like DataFrame.max.
+    """
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
@@ -0,0 +1,175 @@
+"""
+INTRADAY BAR INGESTION
+
+Reads minute bars from a CSV file in fixed-size chunks and resamples them
+to one or more timeframes (5m, 1h, 4h, 1d, ...) in a single streaming pass.
+Only the current chunk and one open bar per timeframe are held in memory;
+completed bars are appended to the per-pair PriceStore.
+
+Input layout: first column is the timestamp, then Open, High, Low, Close
+(extra columns are ignored). Rows must be in time order; repeated or
+late timestamps are dropped.
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+import re
+
+from price_store import PriceStore, to_nanoseconds
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def timeframe_nanoseconds(timeframe):
+    """Convert '5m', '1h', '4h', '1d' ... to a bucket width in nanoseconds"""
+    match = re.fullmatch(r'(\d+)([mhd])', timeframe)
+    if not match:
+        raise ValueError(f"Unsupported timeframe '{timeframe}', use e.g. 5m, 1h, 4h, 1d")
+    return int(match.group(1)) * UNIT_SECONDS[match.group(2)] * 1_000_000_000
+
+
+def store_key(pair, timeframe):
+    """PriceStore name: daily bars keep the plain pair name"""
+    return pair if timeframe == '1d' else f"{pair}_{timeframe}"
+
+
+class BarResampler:
+    """Streaming OHLC aggregation to one timeframe with one open bar of state"""
+
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self.width = timeframe_nanoseconds(timeframe)
+        self.pending = None  # [bucket, open, high, low, close] of the open bar
+
+    def update(self, timestamps, open_, high, low, close):
+        """Feed sorted int64 timestamps + OHLC arrays, return completed bars"""
+        if len(timestamps) == 0:
+            return self._empty()
+
+        buckets = (timestamps // self.width) * self.width
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(buckets)]))
+
+        bars = {
+            'bucket': buckets[starts],
+            'Open': open_[starts],
+            'High': np.maximum.reduceat(high, starts),
+            'Low': np.minimum.reduceat(low, starts),
+            'Close': close[ends - 1]
+        }
+
+        # Merge the bar carried over from the previous chunk
+        if self.pending is not None:
+            if self.pending[0] == bars['bucket'][0]:
+                bars['Open'][0] = self.pending[1]
+                bars['High'][0] = max(bars['High'][0], self.pending[2])
+                bars['Low'][0] = min(bars['Low'][0], self.pending[3])
+                carried = None
+            else:
+                carried = self.pending
+        else:
+            carried = None
+
+        # The last bar may continue in the next chunk
+        self.pending = [bars[k][-1] for k in ['bucket', 'Open', 'High', 'Low', 'Close']]
+        completed = {k: v[:-1] for k, v in bars.items()}
+
+        if carried is not None:
+            completed = {k: np.concatenate(([carried[i]], completed[k]))
+                         for i, k in enumerate(['bucket', 'Open', 'High', 'Low', 'Close'])}
+        return completed
+
+    def flush(self):
+        """Return the open bar (end of input)"""
+        if self.pending is None:
+            return self._empty()
+        bar = {k: np.array([self.pending[i]])
+               for i, k in enumerate(['bucket', 'Open', 'High', 'Low', 'Close'])}
+        self.pending = None
+        return bar
+
+    @staticmethod
+    def _empty():
+        return {'bucket': np.empty(0, dtype=np.int64),
+                **{k: np.empty(0) for k in ['Open', 'High', 'Low', 'Close']}}
+
+
+class IntradayCollector:
+    """Ingests minute-bar files into the price store at several timeframes"""
+
+    def __init__(self, store=None, chunksize=500_000):
+        self.store = store or PriceStore()
+        self.chunksize = chunksize
+        logger.info("[OK] IntradayCollector ready")
+
+    def read_chunks(self, filepath):
+        """Yield (timestamps_ns, open, high, low, close) arrays per chunk"""
+        last = np.iinfo(np.int64).min
+        reader = pd.read_csv(filepath, index_col=0, chunksize=self.chunksize)
+
+        for chunk in reader:
+            timestamps = to_nanoseconds(pd.to_datetime(chunk.index, format='ISO8601'))
+
+            # Drop repeated / late rows against everything seen so far
+            running = np.maximum.accumulate(np.concatenate(([last], timestamps)))
+            keep = timestamps > running[:-1]
+            last = int(running[-1])
+            if not keep.all():
+                logger.info(f"[SKIPPED] {int((~keep).sum())} duplicate/out-of-order rows")
+
+            yield (timestamps[keep],
+                   *(chunk[col].to_numpy(dtype=np.float64)[keep] for col in ['Open', 'High', 'Low', 'Close']))
+
+    def _store_bars(self, pair, timeframe, bars):
+        if len(bars['bucket']) == 0:
+            return 0
+        frame = pd.DataFrame(
+            {k: bars[k] for k in ['Open', 'High', 'Low', 'Close']},
+            index=pd.DatetimeIndex(bars['bucket'].view('datetime64[ns]'), name='Date')
+        )
+        self.store.append(store_key(pair, timeframe), frame)
+        return len(frame)
+
+    def ingest(self, filepath, pair, timeframes=('5m', '1h', '4h', '1d'), replace=True):
+        """Resample a minute-bar file into the store for every timeframe"""
+        logger.info(f"[INGESTING] {pair} from {filepath} -> {', '.join(timeframes)}")
+
+        resamplers = [BarResampler(tf) for tf in timeframes]
+        counts = {tf: 0 for tf in timeframes}
+        rows = 0
+
+        if replace:
+            for tf in timeframes:
+                self.store.write(store_key(pair, tf), pd.DataFrame(columns=['Open', 'High', 'Low', 'Close'],
+                                                                   index=pd.DatetimeIndex([])))
+
+        for timestamps, open_, high, low, close in self.read_chunks(filepath):
+            rows += len(timestamps)
+            for resampler in resamplers:
+                bars = resampler.update(timestamps, open_, high, low, close)
+                counts[resampler.timeframe] += self._store_bars(pair, resampler.timeframe, bars)
+
+        for resampler in resamplers:
+            counts[resampler.timeframe] += self._store_bars(pair, resampler.timeframe, resampler.flush())
+
+        logger.info(f"[OK] {pair}: {rows} minute bars -> " +
+                    ", ".join(f"{tf}={n}" for tf, n in counts.items()))
+        return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest minute bars into the price store")
+    parser.add_argument('filepath')
+    parser.add_argument('--pair', required=True)
+    parser.add_argument('--timeframes', nargs='+', default=['5m', '1h', '4h', '1d'])
+    parser.add_argument('--chunksize', type=int, default=500_000)
+    args = parser.parse_args()
+
+    collector = IntradayCollector(chunksize=args.chunksize)
+    collector.ingest(args.filepath, args.pair, args.timeframes)
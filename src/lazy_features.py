@@ -0,0 +1,108 @@
+"""
+LAZY FEATURE FRAME
+
+An OHLC frame whose feature columns are computed only when read. Columns
+are requested up front (typically the model's feature_columns.pkl) or on
+first access; the first read evaluates every pending request in one
+planned pass, so shared intermediates and rolling windows are still
+computed once, and nothing outside the requests is ever built.
+
+    frame = LazyFeatureFrame.from_file(prices)    # data/models/feature_columns.pkl
+    X = frame[frame.requested]                    # exactly the model's columns
+    rsi = frame['RSI']                            # computed now, reusing the cache
+"""
+
+import pandas as pd
+import numpy as np
+import os
+
+from feature_graph import FEATURES, FeaturePlan, Indicators, feature_node, load_feature_columns
+
+
+def model_feature_columns(path='data/models/feature_columns.pkl'):
+    """The saved model feature list, or all training features when none is saved"""
+    return load_feature_columns(path) if os.path.exists(path) else list(FEATURES)
+
+
+class LazyFeatureFrame:
+    """Prices plus requested feature columns, evaluated on first access"""
+
+    def __init__(self, data, feature_columns=()):
+        self.data = data
+        self._indicators = None
+        self.requested = []
+        self.computed = {}
+        self.request(feature_columns)
+
+    @classmethod
+    def from_file(cls, data, path='data/models/feature_columns.pkl'):
+        return cls(data, load_feature_columns(path))
+
+    @property
+    def indicators(self):
+        """Kernel cache over the prices (built on the first computed column)"""
+        if self._indicators is None:
+            self._indicators = Indicators.from_frame(self.data)
+        return self._indicators
+
+    @property
+    def index(self):
+        return self.data.index
+
+    @property
+    def columns(self):
+        return list(self.data.columns) + [name for name in self.requested if name not in self.data.columns]
+
+    @property
+    def lookback(self):
+        """Warm-up bars before every requested feature is valid"""
+        return FeaturePlan(self.requested).lookback
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def request(self, feature_columns):
+        """Record columns to compute on the next read (unknown names raise KeyError)"""
+        for name in feature_columns:
+            if name not in self.requested and name not in self.data.columns:
+                feature_node(name)
+                self.requested.append(name)
+        return self
+
+    def _evaluate(self):
+        """Compute every requested column not computed yet, in one plan"""
+        pending = [name for name in self.requested if name not in self.computed]
+        if pending:
+            self.computed.update(FeaturePlan(pending).evaluate(None, self.indicators))
+
+    def values(self, name):
+        """Array for one column"""
+        if name in self.data.columns:
+            return self.data[name].to_numpy()
+        self.request([name])
+        self._evaluate()
+        return self.computed[name]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return pd.Series(self.values(key), index=self.index, name=key)
+        self.request(key)
+        return pd.DataFrame({name: self.values(name) for name in key}, index=self.index, columns=list(key))
+
+    def latest(self, names):
+        """{column: last non-NaN value} (the forward-filled latest bar)"""
+        names = list(names)
+        self.request(names)
+        latest = {}
+        for name in names:
+            values = self.values(name)
+            valid = np.flatnonzero(~np.isnan(values))
+            latest[name] = float(values[valid[-1]]) if len(valid) else np.nan
+        return latest
+
+    def to_frame(self):
+        """Prices and every requested column as a DataFrame"""
+        return self[self.columns]
@@ -0,0 +1,97 @@
+"""
+MEMORY ACCOUNTING
+
+Wraps a pipeline object (DataProcessor, FeatureEngineer, MLDataPreparation,
+...) so that every chained method call records, via tracemalloc:
+
+    peak      - highest extra allocation while the call was running
+    retained  - allocation still held after the call returned
+
+NumPy (and therefore pandas) reports its buffers to tracemalloc, so the
+numbers cover the DataFrame blocks, not just Python objects.
+
+    tracker = MemoryTracker()
+    data = (tracker.track(DataProcessor(raw, copy=False))
+            .remove_missing_values()
+            .remove_duplicates()
+            .get_data())
+    tracker.report()
+"""
+
+import tracemalloc
+import time
+
+
+class TrackedCall:
+    """Proxy that measures each method call on the wrapped object"""
+
+    def __init__(self, target, tracker):
+        self._target = target
+        self._tracker = tracker
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def measured(*args, **kwargs):
+            result = self._tracker.measure(type(self._target).__name__, name, attribute, *args, **kwargs)
+            # Keep chaining through the proxy when the method returns self
+            return self if result is self._target else result
+
+        return measured
+
+
+class MemoryTracker:
+    """Collects per-call peak and retained memory"""
+
+    def __init__(self):
+        self.records = []
+        self.started = False
+
+    def track(self, target):
+        """Wrap a pipeline object so its method calls are measured
+
+        Tracing stays on until report()/stop(), so memory freed by a later
+        call is netted against what an earlier call allocated.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+        return TrackedCall(target, self)
+
+    def stop(self):
+        """Stop tracing if this tracker started it"""
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    def measure(self, owner, name, func, *args, **kwargs):
+        """Call func and record its memory use"""
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            self.records.append({
+                'stage': f"{owner}.{name}",
+                'peak_bytes': peak - before,
+                'retained_bytes': current - before,
+                'seconds': elapsed
+            })
+
+    def report(self):
+        """Stop tracing, print the per-call table and return the records"""
+        self.stop()
+        print("\n" + "="*70)
+        print("MEMORY BY STAGE")
+        print("="*70)
+        print(f"{'Stage':40} {'Peak MB':>9} {'Retained MB':>12} {'ms':>7}")
+        for record in self.records:
+            print(f"{record['stage']:40} {record['peak_bytes']/1e6:9.2f} "
+                  f"{record['retained_bytes']/1e6:12.2f} {record['seconds']*1000:7.1f}")
+        print("="*70)
+        return self.records
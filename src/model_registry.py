@@ -0,0 +1,155 @@
+"""
+MODEL REGISTRY
+
+Trained model sets, one namespace per pair, indexed by a manifest:
+
+    data/models/{pair}/random_forest.pkl
+    data/models/{pair}/gradient_boosting.pkl
+    data/models/{pair}/logistic_regression.pkl
+    data/models/{pair}/ensemble.pkl
+    data/models/{pair}/scaler.pkl            the scaler the pair's dataset used
+    data/models/{pair}/feature_columns.pkl
+    data/models/manifest.json               per pair: files, rows, metrics,
+                                            timings, core budget, trained time
+
+Serving loads each pair's own models and scaler through load(). Pairs
+missing from the manifest fall back to the older flat files
+(data/models/{pair}_*.pkl with the shared scaler.pkl / feature_columns.pkl).
+A pair in the manifest always loads from its namespace; flat files left
+beside it are ignored, with a warning.
+"""
+
+import pandas as pd
+import joblib
+import json
+import logging
+import os
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_FILES = ['random_forest', 'gradient_boosting', 'logistic_regression', 'ensemble']
+
+
+def _dump(value, path):
+    """joblib.dump through a temporary file so readers never see a partial pickle"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(value, tmp)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """Directory of per-pair model sets plus manifest.json"""
+
+    def __init__(self, root='data/models'):
+        self.root = root
+
+    def path(self, pair, filename=''):
+        return os.path.join(self.root, pair, filename)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.root, 'manifest.json')
+
+    def manifest(self):
+        """{pair: record} for every registered pair"""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)['pairs']
+
+    def pairs(self):
+        return sorted(self.manifest())
+
+    def save(self, pair, models, scaler, feature_columns, **record):
+        """Write one pair's models, scaler and feature list; returns its manifest record
+
+        The manifest itself is updated by register(), so pairs trained in
+        parallel never write it concurrently.
+        """
+        os.makedirs(self.path(pair), exist_ok=True)
+        files = {}
+        for name, model in models.items():
+            _dump(model, self.path(pair, f'{name}.pkl'))
+            files[name] = f'{name}.pkl'
+        _dump(scaler, self.path(pair, 'scaler.pkl'))
+        _dump(list(feature_columns), self.path(pair, 'feature_columns.pkl'))
+        logger.info(f"[SAVED] {len(files)} models for {pair} in {self.path(pair)}")
+        return {'pair': pair, 'models': files, 'scaler': 'scaler.pkl', 'feature_columns': 'feature_columns.pkl',
+                'trained': time.time(), **record}
+
+    def register(self, records):
+        """Merge {pair: record} into the manifest (other pairs are kept)"""
+        manifest = self.manifest()
+        manifest.update(records)
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'updated': time.time(), 'pairs': dict(sorted(manifest.items()))}, f, indent=2, default=float)
+        os.replace(tmp, self.manifest_path)
+        logger.info(f"[SAVED] {self.manifest_path} ({len(manifest)} pairs)")
+        return self.manifest_path
+
+    def load(self, pair):
+        """(models, meta) for a pair: {model name: model}, {'scaler', 'feature_columns'}
+
+        Names are the file stems (random_forest, ...). Missing files are
+        skipped, so a pair with nothing trained returns ({}, {}).
+        """
+        record = self.manifest().get(pair)
+        if record is None:
+            return self._load_flat(pair)
+
+        stale = self._flat_files(pair)
+        if stale:
+            logger.warning(f"[IGNORED] {pair} is in {self.manifest_path}: not loading flat files "
+                           f"{', '.join(os.path.basename(path) for path in stale.values())}")
+        models = {name: joblib.load(self.path(pair, filename))
+                  for name, filename in record['models'].items()
+                  if os.path.exists(self.path(pair, filename))}
+        meta = {'scaler': joblib.load(self.path(pair, record['scaler'])),
+                'feature_columns': joblib.load(self.path(pair, record['feature_columns']))}
+        return models, meta
+
+    def _flat_files(self, pair):
+        """{model name: path} of the pair's flat {pair}_{model}.pkl files on disk"""
+        paths = {name: os.path.join(self.root, f'{pair}_{name}.pkl') for name in MODEL_FILES}
+        return {name: path for name, path in paths.items() if os.path.exists(path)}
+
+    def _load_flat(self, pair):
+        """Models saved before the registry: {pair}_{model}.pkl with shared scaler files"""
+        models = {name: joblib.load(path) for name, path in self._flat_files(pair).items()}
+
+        meta = {}
+        if models:
+            logger.warning(f"[FALLBACK] {pair} is not in {self.manifest_path}, using flat model files")
+            for key in ['scaler', 'feature_columns']:
+                path = os.path.join(self.root, f'{key}.pkl')
+                if os.path.exists(path):
+                    meta[key] = joblib.load(path)
+        return models, meta
+
+    def summary(self):
+        """One row per registered pair"""
+        rows = []
+        for pair, record in self.manifest().items():
+            metrics = record.get('metrics', {}).get('Voting Ensemble', {})
+            rows.append({
+                'pair': pair,
+                'train_rows': record.get('train_rows'),
+                'test_rows': record.get('test_rows'),
+                'cores': record.get('cores'),
+                'wall_s': record.get('timings', {}).get('Total', {}).get('wall_s'),
+                'accuracy': metrics.get('Accuracy'),
+                'trained': pd.Timestamp(record['trained'], unit='s').floor('s')
+            })
+        return pd.DataFrame(rows, columns=['pair', 'train_rows', 'test_rows', 'cores', 'wall_s', 'accuracy', 'trained'])
+
+
+if __name__ == "__main__":
+    print("\n" + "="*70)
+    print("MODEL REGISTRY")
+    print("="*70)
+    print(ModelRegistry().summary().to_string(index=False))
+    print("="*70)
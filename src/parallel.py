@@ -0,0 +1,61 @@
+"""
+PARALLEL PAIR EXECUTION
+
+Runs one pipeline stage over many pairs, in a process pool when jobs > 1.
+Each pair's printed output is captured in the worker and replayed in pair
+order, so the console output and result order do not depend on which
+worker finishes first.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import os
+
+
+def resolve_jobs(jobs):
+    """--jobs value to a worker count (0 or negative = all cores)"""
+    if jobs is None or jobs == 1:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def _run_one(worker, pair):
+    """Run worker(pair), capturing stdout and any error"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            result = worker(pair)
+            return pair, True, result, output.getvalue()
+        except Exception as e:
+            return pair, False, str(e), output.getvalue()
+
+
+def run_pairs(worker, pairs, jobs=1, action='process'):
+    """Run worker(pair) for every pair and report per-pair success or failure
+
+    worker must be a module-level function (or functools.partial of one)
+    so it can be sent to worker processes. Returns {pair: result} for the
+    pairs that succeeded, in pair order.
+    """
+    jobs = resolve_jobs(jobs)
+    if not pairs:
+        return {}
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pairs))) as executor:
+            outcomes = list(executor.map(_run_one, [worker] * len(pairs), pairs))
+    else:
+        outcomes = map(_run_one, [worker] * len(pairs), pairs)
+
+    results = {}
+    for pair, ok, result, output in outcomes:
+        print(output, end='')
+        if ok:
+            results[pair] = result
+        else:
+            print(f"[ERROR] Failed to {action} {pair}: {result}\n")
+
+    return results
@@ -0,0 +1,198 @@
+"""
+INDICATOR PARAMETER SWEEPS
+
+Computes every parameter variant of an indicator in one pass instead of
+one pipeline run per setting:
+
+    sweeper = ParameterSweep.from_frame(prices)
+    rsi = sweeper.sweep('rsi', period=range(5, 51))
+    macd = sweeper.sweep('macd', fast=[8, 12], slow=[21, 26], signal=[9])
+
+Each variant is a node in the feature graph, so shared intermediates are
+evaluated once across the whole grid and across sweeps on one sweeper:
+the price delta behind every RSI, one set of prefix sums for all RSI /
+SMA / Bollinger windows over a series, and one EMA per distinct span
+(fast=12 and slow=12 in different MACD settings are the same EMA).
+
+A SweepResult holds values shaped [combinations, outputs, *price shape]
+with params[i] the settings of row i, ready for feature selection.
+"""
+
+import pandas as pd
+import numpy as np
+import itertools
+import time
+
+import feature_graph
+from feature_graph import FeaturePlan, Indicators
+
+# indicator -> (graph builder, parameter names in builder order, output names)
+SWEEPS = {
+    'sma': (feature_graph.sma, ['window'], ['SMA']),
+    'rsi': (feature_graph.rsi, ['period'], ['RSI']),
+    'macd': (feature_graph.macd, ['fast', 'slow', 'signal'], ['MACD', 'MACD_Signal', 'MACD_Hist']),
+    'bollinger_bands': (feature_graph.bollinger_bands, ['period', 'width'],
+                        ['BB_Upper', 'BB_Lower', 'BB_Middle', 'BB_Width']),
+    'volatility': (feature_graph.volatility, ['period'], ['Volatility']),
+    'atr': (feature_graph.atr, ['period'], ['ATR']),
+    'roc': (feature_graph.roc, ['period'], ['ROC'])
+}
+
+# Fixed defaults for parameters a grid leaves out
+DEFAULTS = {
+    'rsi': {'period': 14},
+    'macd': {'fast': 12, 'slow': 26, 'signal': 9},
+    'bollinger_bands': {'period': 20, 'width': 2.0},
+    'volatility': {'period': 20},
+    'atr': {'period': 20}
+}
+
+
+def combinations(indicator, grid):
+    """Every valid parameter tuple for a grid, in builder order"""
+    if indicator not in SWEEPS:
+        raise KeyError(f"Unknown indicator '{indicator}', use one of {list(SWEEPS)}")
+    _, names, _ = SWEEPS[indicator]
+    unknown = set(grid) - set(names)
+    if unknown:
+        raise KeyError(f"{indicator} has no parameters {sorted(unknown)}, use {names}")
+
+    defaults = DEFAULTS.get(indicator, {})
+    axes = []
+    for name in names:
+        if name in grid:
+            values = grid[name]
+            axes.append(list(values) if np.iterable(values) else [values])
+        elif name in defaults:
+            axes.append([defaults[name]])
+        else:
+            raise KeyError(f"{indicator} needs a grid for '{name}'")
+
+    combos = list(itertools.product(*axes))
+    if indicator == 'macd':
+        combos = [(fast, slow, signal) for fast, slow, signal in combos if fast < slow]
+    return combos
+
+
+class SweepResult:
+    """Values for every parameter combination of one indicator"""
+
+    def __init__(self, indicator, params, outputs, values):
+        self.indicator = indicator
+        self.param_names = SWEEPS[indicator][1]
+        self.params = params
+        self.outputs = outputs
+        self.values = values
+
+    def __len__(self):
+        return len(self.params)
+
+    def get(self, output=None, **params):
+        """Series (or panel) for one combination and output"""
+        row = self.params.index(tuple(params[name] for name in self.param_names))
+        return self.values[row, self.outputs.index(output or self.outputs[0])]
+
+    def param_frame(self):
+        """One row per combination, columns are the parameter names"""
+        return pd.DataFrame(self.params, columns=self.param_names)
+
+    def column_names(self):
+        """Flat feature names per (combination, output), e.g. MACD_Hist_12_26_9"""
+        return [f"{output}_{'_'.join(str(p) for p in combo)}"
+                for combo in self.params for output in self.outputs]
+
+    def to_frame(self, index=None):
+        """Wide frame with one column per (combination, output) for a single series"""
+        if self.values.ndim != 3:
+            raise ValueError("to_frame needs a single series; index the panel row first")
+        flat = self.values.reshape(-1, self.values.shape[-1]).T
+        return pd.DataFrame(flat, index=index, columns=self.column_names())
+
+
+class ParameterSweep:
+    """Runs parameter grids over one set of prices with a shared indicator cache"""
+
+    def __init__(self, indicators, index=None):
+        self.indicators = indicators
+        self.index = index
+
+    @classmethod
+    def from_frame(cls, data):
+        return cls(Indicators.from_frame(data), data.index)
+
+    def sweep(self, indicator, **grid):
+        """SweepResult for every combination of the grid
+
+        Parameters left out of the grid keep their defaults (e.g. signal=9).
+        """
+        builder, _, outputs = SWEEPS[indicator]
+        combos = combinations(indicator, grid)
+
+        nodes = {}
+        for combo in combos:
+            built = builder(*combo)
+            for output, node in zip(outputs, built if isinstance(built, tuple) else (built,)):
+                nodes[(combo, output)] = node
+
+        evaluated = FeaturePlan(nodes).evaluate(None, self.indicators)
+        shape = np.shape(self.indicators.columns['Close'])
+        values = np.empty((len(combos), len(outputs)) + shape)
+        for i, combo in enumerate(combos):
+            for j, output in enumerate(outputs):
+                values[i, j] = evaluated[(combo, output)]
+        return SweepResult(indicator, combos, outputs, values)
+
+    def run(self, grids):
+        """{indicator: SweepResult} for {indicator: {parameter: values}}"""
+        return {indicator: self.sweep(indicator, **grid) for indicator, grid in grids.items()}
+
+    def to_frame(self, grids):
+        """Every variant of every grid as one wide frame (single series only)"""
+        return pd.concat([result.to_frame(self.index) for result in self.run(grids).values()], axis=1)
+
+
+def benchmark(bars=5000, seed=0):
+    """One sweep vs a fresh indicator cache per setting (seconds)"""
+    grids = {
+        'rsi': {'period': range(5, 51)},
+        'macd': {'fast': range(6, 17, 2), 'slow': range(18, 35, 4), 'signal': [5, 9, 12]},
+        'bollinger_bands': {'period': range(10, 51, 5), 'width': [1.5, 2.0, 2.5]}
+    }
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.004, bars))
+    data = pd.DataFrame({'Open': close, 'High': close + 0.002, 'Low': close - 0.002, 'Close': close})
+
+    start = time.perf_counter()
+    results = ParameterSweep.from_frame(data).run(grids)
+    swept = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for indicator, grid in grids.items():
+        builder = SWEEPS[indicator][0]
+        for combo in combinations(indicator, grid):
+            indicators = Indicators.from_frame(data)
+            built = builder(*combo)
+            for node in built if isinstance(built, tuple) else (built,):
+                indicators.evaluate(node)
+    separate = time.perf_counter() - start
+    return swept, separate, {name: len(result) for name, result in results.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time a parameter sweep against per-setting runs")
+    parser.add_argument('--bars', type=int, default=5000)
+    args = parser.parse_args()
+
+    swept, separate, counts = benchmark(args.bars)
+
+    print("\n" + "="*70)
+    print(f"PARAMETER SWEEP - {args.bars} bars")
+    print("="*70)
+    for name, count in counts.items():
+        print(f"{name:18} {count:5d} combinations")
+    print("-"*70)
+    print(f"{'one sweep':18} {swept*1000:9.1f} ms")
+    print(f"{'per setting':18} {separate*1000:9.1f} ms")
+    print("="*70)
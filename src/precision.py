@@ -0,0 +1,130 @@
+"""
+FEATURE DTYPE POLICY
+
+Which float type feature columns and training matrices are stored in:
+
+1. float64 - full precision end to end (default)
+2. float32 - half the memory and file size for indicator values
+
+The dtype is chosen per call or through FOREX_FEATURE_DTYPE. It applies
+to outputs only: prices stay float64, and the kernels (prefix sums, EMAs)
+always run in float64, so float32 results are the float64 results rounded
+once. python src/precision.py prints the accuracy, memory and speed
+differences on the bundled pairs.
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import time
+
+DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32
+}
+
+
+def get_dtype(dtype=None):
+    """Resolve a dtype name or NumPy float type (None = FOREX_FEATURE_DTYPE, default float64)"""
+    if dtype is None:
+        dtype = os.environ.get('FOREX_FEATURE_DTYPE', 'float64')
+    name = np.dtype(dtype).name if not isinstance(dtype, str) else dtype
+    if name not in DTYPES:
+        raise ValueError(f"Unknown feature dtype '{name}', use one of {list(DTYPES)}")
+    return DTYPES[name]
+
+
+def downcast(values, dtype=None):
+    """values in the policy dtype (no copy when already there)"""
+    return np.asarray(values).astype(get_dtype(dtype), copy=False)
+
+
+def report(pairs=('EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD'), storage=None, repeat=5):
+    """float32 vs float64 on each pair's processed prices
+
+    Per pair: worst relative feature error, largest scaled-matrix error,
+    change in test accuracy of a logistic regression, feature memory, and
+    feature build / NPZ save+load / model fit time. Returns one row per pair.
+    """
+    import tempfile
+    from sklearn.linear_model import LogisticRegression
+    from feature_engineering import FeatureEngineer
+    from feature_graph import FEATURES
+    from prepare_ml_data import MLDataPreparation
+    from storage import get_storage
+
+    storage = get_storage(storage)
+    rows = []
+    for pair in pairs:
+        data = storage.load('data/processed', f'{pair}_processed')
+        runs = {}
+        for name in DTYPES:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                features = FeatureEngineer(data, dtype=name).build().remove_nan().get_data()
+            build = (time.perf_counter() - start) / repeat
+
+            with tempfile.TemporaryDirectory() as directory:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    get_storage('npz').save(features, directory, pair)
+                    get_storage('npz').load(directory, pair)
+                io = (time.perf_counter() - start) / repeat
+                size = os.path.getsize(get_storage('npz').path(directory, pair))
+
+            prep = (MLDataPreparation(features, dtype=name)
+                    .create_target().select_features().scale_features().split_data())
+            start = time.perf_counter()
+            model = LogisticRegression(max_iter=1000).fit(prep.X_train, prep.y_train)
+            fit = time.perf_counter() - start
+            runs[name] = {
+                'features': features[FEATURES].to_numpy(dtype=np.float64),
+                'scaled': np.asarray(prep.X_scaled, dtype=np.float64),
+                'accuracy': model.score(prep.X_test, prep.y_test),
+                'memory': features[FEATURES].memory_usage(index=False).sum() + prep.X_scaled.memory_usage(index=False).sum(),
+                'file': size,
+                'build': build,
+                'io': io,
+                'fit': fit
+            }
+
+        full, half = runs['float64'], runs['float32']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.abs(half['features'] - full['features']) / np.abs(full['features'])
+        relative = np.where(full['features'] == 0, np.abs(half['features']), relative)
+        worst = np.nanmax(relative, axis=0)
+        rows.append({
+            'pair': pair,
+            'rows': len(full['features']),
+            'max_rel_error': worst.max(),
+            'worst_feature': FEATURES[int(worst.argmax())],
+            'max_scaled_error': np.abs(half['scaled'] - full['scaled']).max(),
+            'accuracy_delta': half['accuracy'] - full['accuracy'],
+            'memory_saving': 1 - half['memory'] / full['memory'],
+            'file_saving': 1 - half['file'] / full['file'],
+            'build_ms_64': full['build'] * 1000,
+            'build_ms_32': half['build'] * 1000,
+            'io_ms_64': full['io'] * 1000,
+            'io_ms_32': half['io'] * 1000,
+            'fit_ms_64': full['fit'] * 1000,
+            'fit_ms_32': half['fit'] * 1000
+        })
+    return pd.DataFrame(rows).set_index('pair')
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.disable(logging.INFO)
+    results = report()
+
+    print("\n" + "="*70)
+    print("FLOAT32 VS FLOAT64 FEATURES")
+    print("="*70)
+    print(results[['rows', 'max_rel_error', 'worst_feature', 'max_scaled_error', 'accuracy_delta']].to_string(
+        float_format=lambda v: f"{v:.2e}"))
+    print("-"*70)
+    print(results[['memory_saving', 'file_saving', 'build_ms_64', 'build_ms_32', 'io_ms_64', 'io_ms_32',
+                   'fit_ms_64', 'fit_ms_32']].to_string(
+        float_format=lambda v: f"{v:.2f}"))
+    print("="*70)
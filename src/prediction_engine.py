@@ -7,23 +7,64 @@ import warnings
 import sys
 import os
 
+from feature_graph import FEATURES, FeaturePlan
+from lazy_features import LazyFeatureFrame, model_feature_columns
+
 # Fix Windows console
 if sys.platform == 'win32':
     os.system('chcp 65001 > nul')
 
 warnings.filterwarnings('ignore')
 
+# Dashboard indicator -> feature column (computed only when the dashboard reads them)
+DISPLAY_COLUMNS = {
+    'price': 'Close',
+    'sma_5': 'SMA_5',
+    'sma_10': 'SMA_10',
+    'sma_20': 'SMA_20',
+    'sma_50': 'SMA_50',
+    'sma_200': 'SMA_200',
+    'rsi': 'RSI',
+    'macd': 'MACD',
+    'macd_signal': 'MACD_Signal',
+    'macd_hist': 'MACD_Hist',
+    'bb_upper': 'BB_Upper',
+    'bb_lower': 'BB_Lower',
+    'bb_middle': 'BB_Middle',
+    'bb_width': 'BB_Width',
+    'atr': 'ATR',
+    'daily_return': 'Daily_Return',
+    'volatility': 'Volatility',
+    'intraday_range': 'Intraday_Range',
+    'gap': 'Gap',
+    'roc_5': 'ROC_5',
+    'roc_10': 'ROC_10'
+}
+
+LIVE_FEATURES = ['SMA_5'] + FEATURES
+
+# Bars before every live feature is valid (SMA_200 sets it), plus the latest bar
+MIN_BARS = FeaturePlan(LIVE_FEATURES).lookback + 1
+
 
 class PredictionEngine:
     """Production forex prediction engine"""
     
-    def __init__(self):
-        """Initialize engine"""
+    def __init__(self, feature_columns=None):
+        """Initialize engine
+        
+        Model inputs are exactly feature_columns (default: the saved
+        feature_columns.pkl); other indicators are computed only when read.
+        """
+        self.feature_columns = list(feature_columns) if feature_columns else model_feature_columns()
         print("[OK] Prediction Engine initialized")
         self.cache = {}
     
-    def get_forex_data(self, symbol, days=90):
-        """Get live forex data from yfinance"""
+    def get_forex_data(self, symbol, days=400):
+        """Get live forex data from yfinance
+        
+        400 calendar days give ~280 daily bars, enough warm-up for SMA_200.
+        """
         try:
             print(f"[->] Fetching live data for {symbol}...")
             
@@ -67,71 +108,25 @@ class PredictionEngine:
             return None
     
     def calculate_indicators(self, df):
-        """Calculate technical indicators"""
+        """Lazy indicator frame requesting exactly the model's feature columns"""
         try:
             print("[->] Calculating indicators...")
             
-            df = df.copy()
+            frame = LazyFeatureFrame(df, self.feature_columns)
             
-            if len(df) < 50:
-                print(f"[ERROR] Not enough data: {len(df)}")
+            needed = max(MIN_BARS, frame.lookback + 1)
+            if len(df) < needed:
+                print(f"[ERROR] Not enough data: {len(df)} (need {needed})")
                 return None
             
-            # === MOVING AVERAGES ===
-            df['SMA_5'] = df['Close'].rolling(window=5).mean()
-            df['SMA_10'] = df['Close'].rolling(window=10).mean()
-            df['SMA_20'] = df['Close'].rolling(window=20).mean()
-            df['SMA_50'] = df['Close'].rolling(window=50).mean()
-            
-            # === RSI ===
-            delta = df['Close'].diff()
-            gain = delta.clip(lower=0)
-            loss = -delta.clip(upper=0)
-            avg_gain = gain.rolling(window=14).mean()
-            avg_loss = loss.rolling(window=14).mean()
-            rs = np.where(avg_loss != 0, avg_gain / avg_loss, 0)
-            rsi = 100 - (100 / (1 + rs))
-            df['RSI'] = rsi
-            
-            # === MACD ===
-            exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = exp1 - exp2
-            df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-            df['MACD_Hist'] = df['MACD'] - df['MACD_Signal']
-            
-            # === BOLLINGER BANDS ===
-            bb_sma = df['Close'].rolling(window=20).mean()
-            bb_std = df['Close'].rolling(window=20).std()
-            df['BB_Upper'] = bb_sma + (bb_std * 2)
-            df['BB_Lower'] = bb_sma - (bb_std * 2)
-            df['BB_Middle'] = bb_sma
-            
-            # === ATR ===
-            high_low = df['High'] - df['Low']
-            high_close = abs(df['High'] - df['Close'].shift())
-            low_close = abs(df['Low'] - df['Close'].shift())
-            tr_list = [high_low, high_close, low_close]
-            tr = pd.concat(tr_list, axis=1).max(axis=1)
-            df['ATR'] = tr.rolling(window=14).mean()
-            
-            # === VOLATILITY ===
-            df['Daily_Return'] = df['Close'].pct_change() * 100
-            df['Volatility'] = df['Daily_Return'].rolling(window=20).std()
-            
-            # === INTRADAY RANGE ===
-            df['Intraday_Range'] = ((df['High'] - df['Low']) / df['Close']) * 100
-            
-            # Fill NaN
-            df = df.fillna(method='ffill').fillna(method='bfill')
-            df = df.dropna()
-            
-            if len(df) == 0:
-                print("[ERROR] All data became NaN")
+            # Reading the latest bar evaluates every requested column in one pass
+            latest = frame.latest(frame.requested)
+            if any(np.isnan(value) for value in latest.values()):
+                print("[ERROR] Model features are NaN on the latest bar")
                 return None
             
-            print(f"[OK] Calculated all indicators")
-            return df
+            print(f"[OK] Calculated {len(frame.requested)} model features")
+            return frame
             
         except Exception as e:
             print(f"[ERROR] Calculation failed: {e}")
@@ -142,7 +137,7 @@ class PredictionEngine:
     def analyze_signals(self, df):
         """Analyze 4 trading signals"""
         try:
-            latest = df.iloc[-1]
+            latest = df.latest(['RSI', 'MACD', 'MACD_Signal', 'SMA_20', 'SMA_50', 'Close'])
             
             rsi = float(latest['RSI'])
             macd = float(latest['MACD'])
@@ -200,26 +195,8 @@ class PredictionEngine:
     def get_indicators_dict(self, df):
         """Get all indicators"""
         try:
-            latest = df.iloc[-1]
-            
-            return {
-                'price': float(latest['Close']),
-                'sma_5': float(latest['SMA_5']),
-                'sma_10': float(latest['SMA_10']),
-                'sma_20': float(latest['SMA_20']),
-                'sma_50': float(latest['SMA_50']),
-                'rsi': float(latest['RSI']),
-                'macd': float(latest['MACD']),
-                'macd_signal': float(latest['MACD_Signal']),
-                'macd_hist': float(latest['MACD_Hist']),
-                'bb_upper': float(latest['BB_Upper']),
-                'bb_lower': float(latest['BB_Lower']),
-                'bb_middle': float(latest['BB_Middle']),
-                'atr': float(latest['ATR']),
-                'daily_return': float(latest['Daily_Return']),
-                'volatility': float(latest['Volatility']),
-                'intraday_range': float(latest['Intraday_Range'])
-            }
+            latest = df.latest(DISPLAY_COLUMNS.values())
+            return {key: latest[column] for key, column in DISPLAY_COLUMNS.items()}
             
         except Exception as e:
             print(f"[ERROR] Getting indicators failed: {e}")
@@ -234,7 +211,7 @@ class PredictionEngine:
         
         try:
             # Step 1: Get data
-            data = self.get_forex_data(symbol, days=90)
+            data = self.get_forex_data(symbol)
             if data is None:
                 print("[ERROR] ABORT: Failed to get data")
                 return None
@@ -267,6 +244,7 @@ class PredictionEngine:
                     'probability_down': (100 - signals['confidence']) if signals['direction'] == 'UP' else signals['confidence']
                 },
                 'indicators': indicators,
+                'features': indicators_data.latest(self.feature_columns),
                 'price': indicators['price'],
                 'timestamp': datetime.now().isoformat(),
                 'status': 'SUCCESS'
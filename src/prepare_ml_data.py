@@ -6,15 +6,31 @@ import joblib
 import logging
 import os
 
+from storage import get_storage
+from feature_graph import FEATURES, load_feature_columns
+from lazy_features import LazyFeatureFrame
+from parallel import run_pairs
+from precision import DTYPES, get_dtype
+from walk_forward import WalkForward
+from datasets import DatasetStore
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class MLDataPreparation:
-    """Prepares data for machine learning models"""
+    """Prepares data for machine learning models
+    
+    With copy=False the feature frame is used directly instead of being
+    copied up front, and X/y get no extra defensive copy. X itself is still
+    a new matrix (column selection and the dtype cast both copy). X and the
+    scaled matrices are kept in dtype (precision.py policy).
+    """
     
-    def __init__(self, features_data):
-        self.data = features_data.copy()
+    def __init__(self, features_data, copy=True, dtype=None):
+        self.copy = copy
+        self.dtype = get_dtype(dtype)
+        self.data = features_data.copy() if copy else features_data
         self.X_train = None
         self.X_test = None
         self.y_train = None
@@ -36,20 +52,32 @@ class MLDataPreparation:
         logger.info(f"[OK] Target created: UP={up_count}, DOWN={down_count}")
         return self
     
-    def select_features(self):
-        """Select features for model"""
+    def select_features(self, feature_columns=None):
+        """Select features for model
+        
+        feature_columns may be a list or a feature_columns.pkl path (default:
+        all training features). Requested columns the frame does not have yet
+        are computed through the feature graph, and their warm-up rows dropped.
+        """
         logger.info("[SELECTING] Features...")
         
-        self.feature_columns = [
-            'SMA_10', 'SMA_20', 'SMA_50', 'SMA_200',
-            'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist',
-            'BB_Upper', 'BB_Lower', 'BB_Middle', 'BB_Width',
-            'Daily_Return', 'Intraday_Range', 'Gap',
-            'Volatility', 'ATR', 'ROC_5', 'ROC_10'
-        ]
+        if isinstance(feature_columns, str):
+            feature_columns = load_feature_columns(feature_columns)
+        self.feature_columns = list(feature_columns or FEATURES)
+        
+        # Only the requested columns the frame lacks (and their inputs) are computed
+        lazy = LazyFeatureFrame(self.data, self.feature_columns)
+        if lazy.requested:
+            logger.info(f"[CREATING] {len(lazy.requested)} missing features (warm-up {lazy.lookback} bars)")
+            for name in lazy.requested:
+                self.data[name] = lazy.values(name)
+            self.data = self.data.iloc[lazy.lookback:]
         
-        self.X = self.data[self.feature_columns].copy()
-        self.y = self.data['Target'].copy()
+        self.X = self.data[self.feature_columns].astype(self.dtype)
+        self.y = self.data['Target']
+        if self.copy:
+            self.X = self.X.copy()
+            self.y = self.y.copy()
         
         logger.info(f"[OK] Selected {len(self.feature_columns)} features")
         return self
@@ -58,7 +86,7 @@ class MLDataPreparation:
         """Normalize features to 0-1 range"""
         logger.info("[SCALING] Features to 0-1 range...")
         
-        self.X_scaled = self.scaler.fit_transform(self.X)
+        self.X_scaled = self.scaler.fit_transform(self.X).astype(self.dtype, copy=False)
         self.X_scaled = pd.DataFrame(self.X_scaled, columns=self.feature_columns)
         
         logger.info("[OK] Features scaled")
@@ -78,17 +106,42 @@ class MLDataPreparation:
         logger.info(f"[OK] Train: {len(self.X_train)}, Test: {len(self.X_test)}")
         return self
     
-    def save_data(self):
+    def time_split(self, test_size=0.2):
+        """Chronological train/test split, scaler fitted on training rows only
+        
+        Replaces scale_features + split_data when the test rows must come
+        after every training row (no shuffling, no future min/max).
+        """
+        logger.info(f"[SPLITTING] Data chronologically (last {test_size:.0%} for test)...")
+        
+        train_rows = len(self.X) - int(np.ceil(len(self.X) * test_size))
+        self.scaler.fit(self.X.iloc[:train_rows])
+        self.X_scaled = pd.DataFrame(self.scaler.transform(self.X).astype(self.dtype, copy=False),
+                                     columns=self.feature_columns)
+        self.X_train, self.X_test = self.X_scaled.iloc[:train_rows], self.X_scaled.iloc[train_rows:]
+        self.y_train, self.y_test = self.y.iloc[:train_rows], self.y.iloc[train_rows:]
+        
+        logger.info(f"[OK] Train: {len(self.X_train)}, Test: {len(self.X_test)}")
+        return self
+    
+    def walk_forward(self, train_size, test_size, **options):
+        """Walk-forward folds over the unscaled features (scaled per fold)
+        
+        options go to WalkForward (step, gap, expanding, cache_dir, ...).
+        """
+        return WalkForward(self.X, self.y, train_size, test_size, **options)
+    
+    def save_data(self, storage=None):
         """Save train/test data and scaler"""
         logger.info("[SAVING] Data and scaler...")
         
-        os.makedirs('data/processed', exist_ok=True)
         os.makedirs('data/models', exist_ok=True)
         
-        self.X_train.to_csv('data/processed/X_train.csv', index=False)
-        self.X_test.to_csv('data/processed/X_test.csv', index=False)
-        self.y_train.to_csv('data/processed/y_train.csv', index=False)
-        self.y_test.to_csv('data/processed/y_test.csv', index=False)
+        storage = get_storage(storage)
+        storage.save(self.X_train, 'data/processed', 'X_train', index=False)
+        storage.save(self.X_test, 'data/processed', 'X_test', index=False)
+        storage.save(self.y_train, 'data/processed', 'y_train', index=False)
+        storage.save(self.y_test, 'data/processed', 'y_test', index=False)
         
         joblib.dump(self.scaler, 'data/models/scaler.pkl')
         joblib.dump(self.feature_columns, 'data/models/feature_columns.pkl')
@@ -108,34 +161,221 @@ class MLDataPreparation:
         }
 
 
+class StreamingMLDataPreparation:
+    """Prepares a chronological train/test dataset without loading it whole
+
+    chunks() must return a fresh iterator of feature frames (Close plus the
+    feature columns, in time order) each time it is called; it is read in
+    two passes (three without test_start):
+
+    1. partial_fit the scaler on the training rows of every chunk
+    2. transform every chunk and write it into memory-mapped .npy files in
+       a DatasetStore, which ModelTrainer maps back for training
+
+    Peak memory is one chunk (plus one carried row for the next-bar target)
+    whatever the dataset size. The split is chronological, as in
+    time_split: at test_start when given, otherwise the last test_size of
+    rows (counted in one more pass first). The scaler never sees test rows.
+    """
+
+    def __init__(self, chunks, feature_columns=None, dtype=None, test_size=0.2, test_start=None):
+        if isinstance(feature_columns, str):
+            feature_columns = load_feature_columns(feature_columns)
+        self.chunks = chunks
+        self.feature_columns = list(feature_columns or FEATURES)
+        self.dtype = get_dtype(dtype)
+        self.test_size = test_size
+        self.test_start = None if test_start is None else pd.Timestamp(test_start)
+        self.scaler = MinMaxScaler()
+        self.rows = 0
+        self.train_rows = 0
+        logger.info("[OK] StreamingMLDataPreparation initialized")
+
+    @classmethod
+    def from_storage(cls, pair, storage=None, chunksize=100_000, **options):
+        """Stream data/processed/{pair}_features (incrementally for CSV)"""
+        storage = get_storage(storage)
+        feature_columns = options.pop('feature_columns', None)
+        if isinstance(feature_columns, str):
+            feature_columns = load_feature_columns(feature_columns)
+        columns = ['Close'] + [name for name in feature_columns or FEATURES if name != 'Close']
+        return cls(lambda: storage.chunks('data/processed', f'{pair}_features', chunksize, columns),
+                   feature_columns, **options)
+
+    def _batches(self):
+        """Yield (index, X, y) per chunk, targets continued across chunk edges
+
+        A chunk's last row needs the next chunk's first Close, so it is
+        carried over; the final row of the stream has no target and is dropped.
+        """
+        carry = None
+        for chunk in self.chunks():
+            if carry is not None:
+                chunk = pd.concat([carry, chunk])
+            if len(chunk) < 2:
+                carry = chunk if len(chunk) else carry
+                continue
+            missing = [name for name in self.feature_columns if name not in chunk.columns]
+            if missing:
+                raise KeyError(f"Feature chunks are missing {missing}")
+
+            carry = chunk.iloc[-1:]
+            close = chunk['Close'].to_numpy()
+            body = chunk.iloc[:-1]
+            yield (body.index, body[self.feature_columns].to_numpy(dtype=np.float64),
+                   (close[1:] > close[:-1]).astype(np.int8))
+
+    def fit(self):
+        """Scaler bounds from the training rows only, and row counts
+
+        With test_start the training rows are known per chunk. With
+        test_size they are the first rows, so the chunks are counted in an
+        extra pass before fitting.
+        """
+        self.scaler = MinMaxScaler()
+        if self.test_start is None:
+            logger.info("[COUNTING] Rows chunk by chunk...")
+            self.rows = max(sum(len(chunk) for chunk in self.chunks()) - 1, 0)
+            self.train_rows = self.rows - int(np.ceil(self.rows * self.test_size))
+        if self.test_start is None and not self.train_rows:
+            raise ValueError("No training rows in the feature chunks")
+
+        logger.info("[SCALING] Learning scaler bounds chunk by chunk...")
+        start = train_rows = 0
+        for index, X, y in self._batches():
+            if self.test_start is None:
+                train = np.arange(start, start + len(X)) < self.train_rows
+            else:
+                train = np.asarray(index < self.test_start)
+            start += len(X)
+            train_rows += int(train.sum())
+            if train.any():
+                self.scaler.partial_fit(X[train])
+
+        if self.test_start is not None:
+            self.rows, self.train_rows = start, train_rows
+        elif start != self.rows:
+            raise ValueError(f"Feature chunks changed between passes ({self.rows} rows, then {start})")
+        if not self.train_rows:
+            raise ValueError("No training rows in the feature chunks")
+
+        logger.info(f"[OK] {self.rows} rows scanned, {self.train_rows} for training")
+        return self
+
+    def write(self, name, datasets=None, **meta):
+        """Last pass: transform chunks into the dataset's memory-mapped arrays"""
+        datasets = datasets or DatasetStore()
+        if not self.train_rows:
+            self.fit()
+        logger.info(f"[WRITING] Scaled chunks to {datasets.path(name)}...")
+
+        arrays = datasets.create(name, self.train_rows, self.rows - self.train_rows,
+                                 len(self.feature_columns), self.dtype)
+        try:
+            start = 0
+            for _, X, y in self._batches():
+                X = self.scaler.transform(X).astype(self.dtype, copy=False)
+                stop = start + len(X)
+                split = min(max(self.train_rows - start, 0), len(X))
+                arrays['X_train'][start:start + split] = X[:split]
+                arrays['y_train'][start:start + split] = y[:split]
+                arrays['X_test'][start + split - self.train_rows:stop - self.train_rows] = X[split:]
+                arrays['y_test'][start + split - self.train_rows:stop - self.train_rows] = y[split:]
+                start = stop
+            if start != self.rows:
+                raise ValueError(f"Feature chunks changed between passes ({self.rows} rows, then {start})")
+        except BaseException:
+            datasets.discard(arrays)
+            raise
+
+        return datasets.finish(name, arrays, self.feature_columns, self.scaler, train_rows=self.train_rows,
+                               test_rows=self.rows - self.train_rows, dtype=np.dtype(self.dtype).name,
+                               streamed=True, **meta)
+
+
+def prepare_pair(pair, storage=None, dtype=None, feature_columns=None, split='random'):
+    """Prepare one pair in memory (the unit of work for --jobs)
+    
+    Saving is left to the caller so shared output files are written in a
+    fixed pair order regardless of which worker finishes first.
+    """
+    print(f"[PREPARING] {pair}")
+    print("-" * 70)
+    
+    features = get_storage(storage).load('data/processed', f'{pair}_features')
+    
+    prep = (MLDataPreparation(features, dtype=dtype)
+            .create_target()
+            .select_features(feature_columns))
+    prep = prep.time_split() if split == 'time' else prep.scale_features().split_data()
+    
+    print(f"[OK] {pair} prepared\n")
+    return prep
+
+
+def stream_pair(pair, storage=None, chunksize=100_000, dtype=None, feature_columns=None, test_start=None, datasets=None):
+    """Prepare one pair out of core into its DatasetStore namespace (the unit of work for --chunksize)
+    
+    Each pair writes only its own directory, so workers never share files;
+    returns the written dataset's path.
+    """
+    print(f"[STREAMING] {pair}")
+    print("-" * 70)
+    
+    prep = StreamingMLDataPreparation.from_storage(pair, storage, chunksize, feature_columns=feature_columns,
+                                                   dtype=dtype, test_start=test_start).fit()
+    path = prep.write(pair, datasets, pair=pair)
+    
+    print(f"[OK] {pair} prepared ({prep.train_rows} train, {prep.rows - prep.train_rows} test rows)\n")
+    return path
+
+
 if __name__ == "__main__":
+    import argparse
+    from functools import partial
+    
+    parser = argparse.ArgumentParser(description="Prepare ML train/test data")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes (0 = all cores)")
+    parser.add_argument('--dtype', choices=list(DTYPES), default=None, help="Matrix dtype (default: FOREX_FEATURE_DTYPE or float64)")
+    parser.add_argument('--features', default=None, help="feature_columns.pkl to prepare exactly (default: all features)")
+    parser.add_argument('--split', choices=['random', 'time'], default='random', help="Shuffled split or chronological split with train-only scaling")
+    parser.add_argument('--chunksize', type=int, default=None, help="Stream features in chunks of this many rows into memory-mapped datasets (chronological split)")
+    parser.add_argument('--test-start', default=None, help="With --chunksize: first test timestamp (scaler fitted on earlier rows only)")
+    args = parser.parse_args()
     
     print("\n" + "="*70)
     print("PHASE 4: ML DATA PREPARATION")
     print("="*70 + "\n")
     
     pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']
+    storage = get_storage()
     
-    for pair in pairs:
-        print(f"[PREPARING] {pair}")
-        print("-" * 70)
+    datasets = DatasetStore()
+    if args.chunksize:
+        # Out of core: passes over each pair's feature file, one chunk in memory at a time
+        prepared = run_pairs(partial(stream_pair, storage=storage, chunksize=args.chunksize, dtype=args.dtype,
+                                     feature_columns=args.features, test_start=args.test_start, datasets=datasets),
+                             pairs, args.jobs, action='prepare')
+        if prepared:
+            datasets.write_pooled(prepared)
         
-        try:
-            features = pd.read_csv(f'data/processed/{pair}_features.csv', index_col=0, parse_dates=True)
-            
-            prep = MLDataPreparation(features)
-            ml_data = (prep
-                      .create_target()
-                      .select_features()
-                      .scale_features()
-                      .split_data()
-                      .save_data()
-                      .get_data())
-            
-            print(f"[OK] {pair} prepared\n")
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to prepare {pair}: {str(e)}\n")
+        # The shared scaler.pkl / feature_columns.pkl files keep serving the EURUSD models
+        if 'EURUSD' in prepared:
+            os.makedirs('data/models', exist_ok=True)
+            joblib.dump(datasets.scaler('EURUSD'), 'data/models/scaler.pkl')
+            joblib.dump(datasets.meta('EURUSD')['feature_columns'], 'data/models/feature_columns.pkl')
+    else:
+        prepared = run_pairs(partial(prepare_pair, storage=storage, dtype=args.dtype, feature_columns=args.features, split=args.split), pairs, args.jobs, action='prepare')
+        
+        # One namespaced dataset per pair, then all of them pooled with a pair_id column
+        for pair, prep in prepared.items():
+            datasets.write_pair(pair, prep)
+        if prepared:
+            datasets.write_pooled(prepared)
+        
+        # The shared CSV / scaler.pkl / feature_columns.pkl files keep serving the EURUSD models
+        if 'EURUSD' in prepared:
+            prepared['EURUSD'].save_data(storage)
     
     print("="*70)
     print("Phase 4 Complete! Data ready for ML model training.")
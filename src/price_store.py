@@ -0,0 +1,179 @@
+"""
+MEMORY-MAPPED PRICE STORE
+
+Per-pair OHLC history kept as fixed-width binary columns:
+
+    data/store/{pair}/timestamp.i8   int64 nanoseconds since epoch (sorted)
+    data/store/{pair}/open.f8        float64
+    data/store/{pair}/high.f8        ...
+    data/store/{pair}/low.f8
+    data/store/{pair}/close.f8
+
+Files are opened with np.memmap, so every process reading the same pair
+shares the OS page cache, and date-range queries are a binary search that
+returns views into the mapped arrays (no copy).
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def to_nanoseconds(timestamps):
+    """Convert a timestamp, string or DatetimeIndex to int64 nanoseconds"""
+    if isinstance(timestamps, (pd.DatetimeIndex, np.ndarray, pd.Series)):
+        return np.asarray(pd.DatetimeIndex(timestamps).as_unit('ns').asi8, dtype=np.int64)
+    return pd.Timestamp(timestamps).as_unit('ns').value
+
+
+class PairPrices:
+    """Read-only memory-mapped OHLC arrays for one pair"""
+
+    def __init__(self, pair, columns):
+        self.pair = pair
+        self.timestamps = columns['timestamp']
+        self.open = columns['open']
+        self.high = columns['high']
+        self.low = columns['low']
+        self.close = columns['close']
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def bounds(self, start=None, end=None):
+        """Row range [lo, hi) for start <= t <= end, by binary search"""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, to_nanoseconds(start), 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, to_nanoseconds(end), 'right'))
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """Zero-copy views of every column between start and end (inclusive)"""
+        lo, hi = self.bounds(start, end)
+        return {
+            'timestamp': self.timestamps[lo:hi],
+            'Open': self.open[lo:hi],
+            'High': self.high[lo:hi],
+            'Low': self.low[lo:hi],
+            'Close': self.close[lo:hi]
+        }
+
+    def to_frame(self, start=None, end=None):
+        """Materialize a window as a DataFrame in the pipeline's layout"""
+        window = self.slice(start, end)
+        index = pd.DatetimeIndex(np.asarray(window.pop('timestamp')).view('datetime64[ns]'), name='Date')
+        return pd.DataFrame(window, index=index, columns=PRICE_COLUMNS)
+
+
+class PriceStore:
+    """Directory of per-pair memory-mapped OHLC columns"""
+
+    files = {
+        'timestamp': ('timestamp.i8', np.int64),
+        'open': ('open.f8', np.float64),
+        'high': ('high.f8', np.float64),
+        'low': ('low.f8', np.float64),
+        'close': ('close.f8', np.float64)
+    }
+
+    def __init__(self, root='data/store'):
+        self.root = root
+
+    def pair_dir(self, pair):
+        return os.path.join(self.root, pair)
+
+    def pairs(self):
+        """List stored pairs"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(p for p in os.listdir(self.root)
+                      if os.path.exists(os.path.join(self.root, p, 'timestamp.i8')))
+
+    def _arrays(self, data):
+        """Split a DataFrame into sorted, de-duplicated fixed-width columns"""
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        arrays = {'timestamp': to_nanoseconds(data.index)}
+        for key in ['open', 'high', 'low', 'close']:
+            arrays[key] = data[key.capitalize()].to_numpy(dtype=np.float64)
+        return arrays
+
+    def write(self, pair, data):
+        """Replace a pair's history with the rows of a DataFrame"""
+        directory = self.pair_dir(pair)
+        os.makedirs(directory, exist_ok=True)
+
+        for key, values in self._arrays(data).items():
+            filename = os.path.join(directory, self.files[key][0])
+            # Write beside the live file, then swap, so readers never see half a column
+            values.tofile(filename + '.tmp')
+            os.replace(filename + '.tmp', filename)
+
+        logger.info(f"[STORED] {pair}: {len(data)} bars -> {directory}")
+        return self
+
+    def append(self, pair, data):
+        """Append bars newer than the stored history"""
+        last = self.last_timestamp(pair)
+        if last is None:
+            return self.write(pair, data)
+
+        arrays = self._arrays(data)
+        keep = arrays['timestamp'] > last
+        directory = self.pair_dir(pair)
+        for key, values in arrays.items():
+            with open(os.path.join(directory, self.files[key][0]), 'ab') as f:
+                values[keep].tofile(f)
+
+        logger.info(f"[APPENDED] {pair}: {int(keep.sum())} bars")
+        return self
+
+    def last_timestamp(self, pair):
+        """Last stored timestamp in nanoseconds, or None"""
+        filename = os.path.join(self.pair_dir(pair), 'timestamp.i8')
+        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+            return None
+        with open(filename, 'rb') as f:
+            f.seek(-8, os.SEEK_END)
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    def open(self, pair):
+        """Map a pair's columns read-only"""
+        columns = {}
+        for key, (filename, dtype) in self.files.items():
+            path = os.path.join(self.pair_dir(pair), filename)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No stored prices for {pair} ({path})")
+            if os.path.getsize(path) == 0:
+                columns[key] = np.empty(0, dtype=dtype)
+            else:
+                columns[key] = np.memmap(path, dtype=dtype, mode='r')
+        return PairPrices(pair, columns)
+
+    def load(self, pair, start=None, end=None):
+        """DataFrame of a pair's bars between start and end"""
+        return self.open(pair).to_frame(start, end)
+
+
+if __name__ == "__main__":
+    from storage import get_storage
+
+    print("\n" + "="*70)
+    print("BUILDING PRICE STORE")
+    print("="*70 + "\n")
+
+    storage = get_storage()
+    store = PriceStore()
+
+    for pair in ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']:
+        try:
+            store.write(pair, storage.load('data/processed', f'{pair}_processed'))
+            print(f"[OK] {pair}: {len(store.open(pair))} bars")
+        except Exception as e:
+            print(f"[ERROR] Failed to store {pair}: {str(e)}")
+
+    print("="*70)
@@ -0,0 +1,169 @@
+"""
+RECURSIVE KERNELS
+
+Exponentially weighted kernels (EMA / MACD, Wilder RSI, Wilder ATR) depend
+on the previous output, so NumPy cannot vectorize them along time. Two
+backends compute them, for one series or a [pairs, time] panel per call:
+
+1. numba - the pandas ewm recursion JIT-compiled, one pass over all pairs
+2. numpy - scipy.signal.lfilter over all pairs at once; pairs with gaps
+           after their first value use the plain-Python recursion
+
+The backend is picked automatically (numba when it is installed) or set
+per call / through FOREX_KERNEL_BACKEND. Both follow pandas
+ewm(adjust=False): seeded with the first valid value, leading NaNs stay
+NaN, and a gap carries the last value forward.
+"""
+
+import numpy as np
+import os
+from scipy.signal import lfilter
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ['numba', 'numpy']
+
+
+def available_backends():
+    return [name for name in BACKENDS if name != 'numba' or numba is not None]
+
+
+def get_backend(backend=None):
+    """Resolve a backend name ('auto' / None = numba when installed)"""
+    backend = backend or os.environ.get('FOREX_KERNEL_BACKEND', 'auto')
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{backend}', use one of {BACKENDS + ['auto']}")
+    if backend == 'numba' and numba is None:
+        raise ImportError("The numba backend needs the numba package")
+    return backend
+
+
+def _ewm_rows(x, alpha, out):
+    """pandas ewm(alpha, adjust=False) recursion, row by row (compiled by numba)"""
+    for row in range(x.shape[0]):
+        weighted = np.nan
+        old_weight = 1.0
+        for t in range(x.shape[1]):
+            value = x[row, t]
+            if weighted == weighted:
+                old_weight *= 1.0 - alpha
+                if value == value:
+                    if weighted != value:
+                        weighted = (old_weight * weighted + alpha * value) / (old_weight + alpha)
+                    old_weight = 1.0
+            elif value == value:
+                weighted = value
+            out[row, t] = weighted
+    return out
+
+
+_ewm_rows_jit = numba.njit(cache=True)(_ewm_rows) if numba is not None else None
+
+
+def _ewm_numpy(x, alpha, out):
+    """lfilter over every row at once, rows with interior gaps in Python"""
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+    # Every value from the first observation on is present
+    dense = valid.sum(axis=1) == x.shape[1] - first
+
+    if dense.all() and not first.any():
+        # Common case: complete series, filtered in one call without copies
+        out[:], _ = lfilter([alpha], [1.0, alpha - 1.0], x, axis=1, zi=((1.0 - alpha) * x[:, :1]))
+        return out
+
+    rows = np.flatnonzero(dense & (first < x.shape[1]))
+    if len(rows):
+        seeds = x[rows, first[rows]]
+        # Backfill the leading NaNs with the seed: an EMA of a constant is that constant
+        filled = np.where(valid[rows], x[rows], seeds[:, None])
+        smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], filled, axis=1,
+                              zi=((1.0 - alpha) * seeds)[:, None])
+        out[rows] = np.where(np.arange(x.shape[1]) >= first[rows][:, None], smoothed, np.nan)
+
+    gappy = np.flatnonzero(~dense)
+    if len(gappy):
+        out[gappy] = _ewm_rows(x[gappy], alpha, np.empty((len(gappy), x.shape[1])))
+    return out
+
+
+def ewm(x, alpha, backend=None):
+    """Exponentially weighted mean with smoothing factor alpha, per row
+
+    x is one series or a [pairs, time] array; the result has its shape.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    panel = np.atleast_2d(x)
+    out = np.full(panel.shape, np.nan)
+    if panel.size:
+        if get_backend(backend) == 'numba':
+            _ewm_rows_jit(np.ascontiguousarray(panel), alpha, out)
+        else:
+            _ewm_numpy(panel, alpha, out)
+    return out.reshape(x.shape)
+
+
+def ema(x, span, backend=None):
+    """ewm(span=span, adjust=False).mean()"""
+    return ewm(x, 2.0 / (span + 1.0), backend)
+
+
+def wilder(x, period, backend=None):
+    """Wilder smoothing: ewm(alpha=1/period, adjust=False).mean()"""
+    return ewm(x, 1.0 / period, backend)
+
+
+def wilder_rsi(close, period=14, backend=None):
+    """RSI with Wilder-smoothed gains and losses, per row
+
+    The first change is counted as zero, as in FeatureEngineer's RSI.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = wilder(gains, period, backend)
+    avg_loss = wilder(losses, period, backend)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def wilder_atr(high, low, close, period=14, backend=None):
+    """Average true range with Wilder smoothing, per row"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    previous = np.concatenate((np.full(close.shape[:-1] + (1,), np.nan), close[..., :-1]), axis=-1)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    return wilder(true_range, period, backend)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Time the recursive kernels per backend")
+    parser.add_argument('--pairs', type=int, default=28)
+    parser.add_argument('--bars', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    panel = 1.1 + np.cumsum(rng.normal(0, 0.0005, (args.pairs, args.bars)), axis=1)
+
+    print("\n" + "="*70)
+    print(f"RECURSIVE KERNELS - EMA(12) on {args.pairs} pairs x {args.bars} bars")
+    print("="*70)
+    start = time.perf_counter()
+    pd.DataFrame(panel.T).ewm(span=12, adjust=False).mean()
+    print(f"{'pandas':8} {(time.perf_counter() - start)*1000:9.1f} ms")
+    for backend in available_backends():
+        ema(panel[:, :100], 12, backend)  # compile / warm-up
+        start = time.perf_counter()
+        ema(panel, 12, backend)
+        print(f"{backend:8} {(time.perf_counter() - start)*1000:9.1f} ms")
+    print(f"Auto-selected backend: {get_backend()}")
+    print("="*70)
@@ -0,0 +1,374 @@
+"""
+PIPELINE STORAGE
+
+Pluggable on-disk formats for the DataFrames passed between stages:
+1. CSV     - plain text, kept as the export / interchange format
+2. NPZ     - NumPy arrays, one per column (no text parsing on load)
+3. Parquet - columnar, needs pyarrow or fastparquet
+
+The format is chosen per call or through FOREX_STORAGE_FORMAT (default: csv).
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+import os
+import time
+import zipfile
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FrameStorage:
+    """Base class: maps (directory, name) to a file and reads/writes frames"""
+
+    format_name = None
+    extension = None
+
+    def path(self, directory, name):
+        """File path for a dataset name (any extension on name is replaced)"""
+        return os.path.join(directory, os.path.splitext(name)[0] + self.extension)
+
+    def exists(self, directory, name):
+        """Check whether the dataset exists in this format or as a CSV export"""
+        return os.path.exists(self.path(directory, name)) or self._fallback(directory, name) is not None
+
+    def _fallback(self, directory, name):
+        """CSV backend to read instead when only the CSV export exists, else None"""
+        if self.format_name == 'csv' or os.path.exists(self.path(directory, name)):
+            return None
+        csv = CSVStorage()
+        return csv if csv.exists(directory, name) else None
+
+    def save(self, data, directory, name, index=True):
+        """Write a DataFrame or Series"""
+        os.makedirs(directory, exist_ok=True)
+        if isinstance(data, pd.Series):
+            data = data.to_frame()
+        filepath = self.path(directory, name)
+        self._write(data, filepath, index)
+        logger.info(f"[SAVED] {filepath}")
+        return filepath
+
+    def load(self, directory, name, index=True):
+        """Read a DataFrame, falling back to an existing CSV export"""
+        csv = self._fallback(directory, name)
+        if csv is not None:
+            logger.info(f"[FALLBACK] Reading {csv.path(directory, name)}")
+            return csv.load(directory, name, index)
+        return self._read(self.path(directory, name), index)
+
+    def append(self, data, directory, name):
+        """Append rows; binary formats rewrite the file"""
+        if not self.exists(directory, name):
+            return self.save(data, directory, name)
+        combined = pd.concat([self.load(directory, name), data])
+        return self.save(combined, directory, name)
+
+    def chunks(self, directory, name, chunksize=100_000, columns=None):
+        """Yield the frame in consecutive row chunks (only the listed columns when given)
+
+        Every format reads incrementally, so memory follows chunksize rather
+        than the file size.
+        """
+        csv = self._fallback(directory, name)
+        if csv is not None:
+            return csv.chunks(directory, name, chunksize, columns)
+        return self._chunks(self.path(directory, name), chunksize, columns)
+
+    def last_index(self, directory, name):
+        """Return the last index label, or None if there is no data"""
+        if not self.exists(directory, name):
+            return None
+        data = self.load(directory, name)
+        return data.index[-1] if len(data) > 0 else None
+
+    def _write(self, data, filepath, index):
+        raise NotImplementedError
+
+    def _read(self, filepath, index):
+        raise NotImplementedError
+
+    def _chunks(self, filepath, chunksize, columns):
+        raise NotImplementedError
+
+
+class CSVStorage(FrameStorage):
+    """CSV files (the original pipeline format)"""
+
+    format_name = 'csv'
+    extension = '.csv'
+
+    def _write(self, data, filepath, index):
+        data.to_csv(filepath, index=index)
+
+    def _read(self, filepath, index):
+        if not index:
+            return pd.read_csv(filepath)
+
+        data = pd.read_csv(filepath, index_col=0, parse_dates=True)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            # Older yfinance exports carry extra Ticker/Date header rows
+            parsed = pd.to_datetime(data.index, errors='coerce', format='ISO8601')
+            if parsed.notna().any():
+                data = data[parsed.notna()].apply(pd.to_numeric, errors='coerce')
+                data.index = parsed[parsed.notna()].rename(data.index.name)
+        return data
+
+    def append(self, data, directory, name):
+        """Append rows to the end of the file without rewriting it"""
+        if not self.exists(directory, name):
+            return self.save(data, directory, name)
+        filepath = self.path(directory, name)
+        data.to_csv(filepath, mode='a', header=False)
+        logger.info(f"[APPENDED] {len(data)} rows to {filepath}")
+        return filepath
+
+    def _chunks(self, filepath, chunksize, columns):
+        """pd.read_csv in chunks"""
+        usecols = None
+        if columns is not None:
+            usecols = [pd.read_csv(filepath, nrows=0).columns[0], *columns]
+        for chunk in pd.read_csv(filepath, index_col=0, chunksize=chunksize, usecols=usecols):
+            index = pd.to_datetime(chunk.index, errors='coerce', format='ISO8601')
+            valid = ~index.isna()
+            chunk = chunk[valid].apply(pd.to_numeric, errors='coerce')
+            chunk.index = index[valid].rename(chunk.index.name)
+            yield chunk if columns is None else chunk[list(columns)]
+
+    def last_index(self, directory, name):
+        """Read only the tail of the file to find the last timestamp"""
+        filepath = self.path(directory, name)
+        if not os.path.exists(filepath):
+            return None
+
+        with open(filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 4096, 0))
+            lines = f.read().decode('utf-8', errors='ignore').splitlines()
+
+        # Skips yfinance's extra Ticker/Date header rows in older files
+        for line in reversed(lines):
+            timestamp = pd.to_datetime(line.split(',')[0], errors='coerce')
+            if not pd.isna(timestamp):
+                return timestamp
+        return None
+
+
+class NpzStorage(FrameStorage):
+    """Uncompressed .npz archives with one array per column"""
+
+    format_name = 'npz'
+    extension = '.npz'
+
+    def _write(self, data, filepath, index):
+        arrays = {'__columns__': np.array([str(c) for c in data.columns])}
+        if index:
+            arrays['__index__'] = self._plain(data.index.to_numpy())
+            arrays['__index_name__'] = np.array(data.index.name or '')
+        for i, col in enumerate(data.columns):
+            arrays[f'c{i}'] = self._plain(data[col].to_numpy())
+        np.savez(filepath, **arrays)
+
+    @staticmethod
+    def _plain(values):
+        """Store text as fixed-width unicode so loading never needs pickle"""
+        return values.astype(str) if values.dtype == object else values
+
+    def _read(self, filepath, index):
+        with np.load(filepath, allow_pickle=False) as archive:
+            columns = list(archive['__columns__'])
+            data = {col: archive[f'c{i}'] for i, col in enumerate(columns)}
+            frame_index = None
+            if index and '__index__' in archive:
+                frame_index = pd.Index(archive['__index__'],
+                                       name=str(archive['__index_name__']) or None)
+        return pd.DataFrame(data, index=frame_index, columns=columns)
+
+    def _chunks(self, filepath, chunksize, columns):
+        """Slices of the column arrays, memory-mapped inside the archive"""
+        with zipfile.ZipFile(filepath) as archive:
+            with archive.open('__columns__.npy') as f:
+                stored = [str(col) for col in np.load(f, allow_pickle=False)]
+        columns = stored if columns is None else list(columns)
+        missing = [col for col in columns if col not in stored]
+        if missing:
+            raise KeyError(f"{filepath} has no columns {missing}")
+
+        arrays = {col: self._member(filepath, f'c{stored.index(col)}') for col in columns}
+        index, name = None, None
+        with np.load(filepath, allow_pickle=False) as archive:
+            if '__index__' in archive:
+                index, name = self._member(filepath, '__index__'), str(archive['__index_name__']) or None
+
+        rows = len(next(iter(arrays.values()))) if arrays else (len(index) if index is not None else 0)
+        for start in range(0, rows, chunksize):
+            stop = min(start + chunksize, rows)
+            chunk_index = None if index is None else pd.Index(np.array(index[start:stop]), name=name)
+            yield pd.DataFrame({col: np.array(values[start:stop]) for col, values in arrays.items()},
+                               index=chunk_index, columns=columns)
+
+    @staticmethod
+    def _member(filepath, key):
+        """One array of an uncompressed archive as a read-only memmap
+
+        np.savez stores members uncompressed, so each .npy lies contiguously
+        in the zip file; compressed members are read whole instead.
+        """
+        with zipfile.ZipFile(filepath) as archive:
+            info = archive.getinfo(f'{key}.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            with np.load(filepath, allow_pickle=False) as archive:
+                return archive[key]
+
+        with open(filepath, 'rb') as f:
+            f.seek(info.header_offset)
+            header = f.read(30)
+            f.seek(info.header_offset + 30 + int.from_bytes(header[26:28], 'little')
+                   + int.from_bytes(header[28:30], 'little'))
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            offset = f.tell()
+        if dtype.hasobject:
+            raise ValueError(f"{filepath} member {key} holds Python objects")
+        if not shape or not shape[0]:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(filepath, dtype=dtype, mode='r', offset=offset, shape=shape,
+                         order='F' if fortran_order else 'C')
+
+    def last_index(self, directory, name):
+        """Read only the index array (None for frames saved without one)"""
+        csv = self._fallback(directory, name)
+        if csv is not None:
+            return csv.last_index(directory, name)
+        filepath = self.path(directory, name)
+        if not os.path.exists(filepath):
+            return None
+        with np.load(filepath, allow_pickle=False) as archive:
+            if '__index__' not in archive:
+                return None
+            stored = archive['__index__']
+        return pd.Timestamp(stored[-1]) if len(stored) > 0 else None
+
+
+class ParquetStorage(FrameStorage):
+    """Parquet files (requires pyarrow or fastparquet)"""
+
+    format_name = 'parquet'
+    extension = '.parquet'
+
+    def _write(self, data, filepath, index):
+        data.to_parquet(filepath, index=index)
+
+    def _read(self, filepath, index):
+        data = pd.read_parquet(filepath)
+        return data if index else data.reset_index(drop=True)
+
+    def _chunks(self, filepath, chunksize, columns):
+        """Record batches through pyarrow, index columns restored from the pandas metadata"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(filepath)
+        metadata = parquet.schema_arrow.pandas_metadata or {}
+        index_columns = [col for col in metadata.get('index_columns', []) if isinstance(col, str)]
+        read = None if columns is None else index_columns + [col for col in columns if col not in index_columns]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=read):
+            chunk = pa.Table.from_batches([batch]).to_pandas()
+            yield chunk if columns is None else chunk[list(columns)]
+
+
+FORMATS = {
+    'csv': CSVStorage,
+    'npz': NpzStorage,
+    'parquet': ParquetStorage
+}
+
+
+def get_storage(storage=None):
+    """Return a storage backend from an instance, a format name or the env default"""
+    if isinstance(storage, FrameStorage):
+        return storage
+
+    format_name = storage or os.environ.get('FOREX_STORAGE_FORMAT', 'csv')
+    if format_name not in FORMATS:
+        raise ValueError(f"Unknown storage format '{format_name}', use one of {list(FORMATS)}")
+    return FORMATS[format_name]()
+
+
+def convert(directory, name, source, target, index=True):
+    """Convert one dataset between formats (e.g. export npz back to csv)"""
+    data = get_storage(source).load(directory, name, index)
+    return get_storage(target).save(data, directory, name, index)
+
+
+def benchmark_load(directory='data/processed', pattern='_features', formats=('csv', 'npz', 'parquet'), repeat=5):
+    """Time loading every matching dataset in each format
+
+    The converted copies are written to a temporary directory, so no stale
+    npz / parquet snapshots are left next to the CSVs.
+    """
+    import tempfile
+
+    names = sorted(os.path.splitext(f)[0] for f in os.listdir(directory)
+                   if f.endswith('.csv') and pattern in f)
+    csv = CSVStorage()
+    frames = {name: csv.load(directory, name) for name in names}
+    results = {}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for format_name in formats:
+            backend = get_storage(format_name)
+            try:
+                for name, data in frames.items():
+                    backend.save(data, scratch, name)
+            except ImportError as e:
+                logger.info(f"[SKIPPED] {format_name}: {e}")
+                continue
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for name in names:
+                    backend.load(scratch, name)
+            elapsed = (time.perf_counter() - start) / repeat
+            size = sum(os.path.getsize(backend.path(scratch, name)) for name in names)
+            results[format_name] = {'seconds': elapsed, 'bytes': size}
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pipeline storage tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    bench = sub.add_parser('benchmark', help="Compare load times across formats")
+    bench.add_argument('--directory', default='data/processed')
+    bench.add_argument('--pattern', default='_features')
+    bench.add_argument('--repeat', type=int, default=5)
+
+    conv = sub.add_parser('convert', help="Convert datasets between formats")
+    conv.add_argument('names', nargs='+')
+    conv.add_argument('--directory', default='data/processed')
+    conv.add_argument('--source', default='npz')
+    conv.add_argument('--target', default='csv')
+
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        print("\n" + "="*70)
+        print("STORAGE LOAD BENCHMARK")
+        print("="*70)
+        results = benchmark_load(args.directory, args.pattern, repeat=args.repeat)
+        baseline = results['csv']['seconds']
+        for format_name, stats in results.items():
+            print(f"{format_name:8} {stats['seconds']*1000:9.2f} ms  "
+                  f"{stats['bytes']/1024:9.1f} KB  x{baseline/stats['seconds']:.1f}")
+        print("="*70)
+    else:
+        for name in args.names:
+            convert(args.directory, name, args.source, args.target)
@@ -0,0 +1,291 @@
+"""
+STREAMING INDICATORS
+
+Stateful indicators that take one bar at a time and update in O(1) time
+and memory, for live use where recomputing the whole history per bar is
+wasted work. On the same history they reproduce FeatureEngineer's batch
+pandas columns (NaN during warm-up, identical windows and conventions).
+
+Every indicator keeps only numbers and lists, so state can be
+checkpointed with checkpoint() / restore() (JSON-serializable dicts).
+
+    engine = IndicatorEngine()
+    for bar in bars.itertuples():
+        features = engine.update(bar.Open, bar.High, bar.Low, bar.Close)
+"""
+
+import math
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """Base class: checkpointing for indicators made of plain attributes"""
+
+    def checkpoint(self):
+        """Return the full state as a JSON-serializable dict"""
+        state = {}
+        for key, value in self.__dict__.items():
+            if isinstance(value, StreamingIndicator):
+                state[key] = value.checkpoint()
+            elif isinstance(value, list):
+                state[key] = list(value)
+            else:
+                state[key] = value
+        return {'__indicator__': type(self).__name__, 'state': state}
+
+    @classmethod
+    def restore(cls, checkpoint):
+        """Rebuild an indicator from checkpoint()"""
+        indicator_cls = INDICATORS[checkpoint['__indicator__']]
+        indicator = indicator_cls.__new__(indicator_cls)
+        for key, value in checkpoint['state'].items():
+            if isinstance(value, dict) and '__indicator__' in value:
+                value = StreamingIndicator.restore(value)
+            elif isinstance(value, list):
+                value = list(value)
+            setattr(indicator, key, value)
+        return indicator
+
+
+class RollingWindow(StreamingIndicator):
+    """Fixed-size window with running mean and variance
+
+    Uses the sliding-window form of Welford's update, so adding one value
+    and dropping the oldest is O(1) and does not accumulate the
+    cancellation error of running sum / sum-of-squares. A window holding
+    any NaN reports NaN, like pandas rolling(window) with default min_periods.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = [NAN] * window
+        self.position = 0
+        self.count = 0
+        self.nan_count = 0
+        self.valid = 0
+        self.mean_value = 0.0
+        self.m2 = 0.0
+
+    def _add(self, x):
+        self.valid += 1
+        delta = x - self.mean_value
+        self.mean_value += delta / self.valid
+        self.m2 += delta * (x - self.mean_value)
+
+    def _remove(self, x):
+        if self.valid == 1:
+            self.valid, self.mean_value, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean_value
+        self.valid -= 1
+        self.mean_value -= delta / self.valid
+        self.m2 -= delta * (x - self.mean_value)
+
+    def push(self, x):
+        """Add a value, dropping the oldest once the window is full"""
+        if self.count == self.window:
+            old = self.values[self.position]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self._remove(old)
+        else:
+            self.count += 1
+
+        self.values[self.position] = x
+        self.position = (self.position + 1) % self.window
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self._add(x)
+        return self
+
+    def ready(self):
+        return self.count == self.window and self.nan_count == 0
+
+    def mean(self):
+        return self.mean_value if self.ready() else NAN
+
+    def std(self):
+        """Sample standard deviation (ddof=1), as pandas rolling().std()"""
+        if not self.ready() or self.window < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def oldest(self):
+        """Value that will drop out next (NaN until the window is full)"""
+        return self.values[self.position] if self.count == self.window else NAN
+
+
+class SMA(StreamingIndicator):
+    """Simple moving average over any window"""
+
+    def __init__(self, window):
+        self.rolling = RollingWindow(window)
+
+    def update(self, close):
+        return self.rolling.push(close).mean()
+
+
+class EMA(StreamingIndicator):
+    """Exponential moving average, as pandas ewm(span, adjust=False)"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        elif not math.isnan(x):
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class MACD(StreamingIndicator):
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        return macd, signal, macd - signal
+
+
+class RSI(StreamingIndicator):
+    """RSI from simple rolling means of gains and losses
+
+    Matches FeatureEngineer.rsi: the first bar counts as a zero gain and
+    zero loss, and a window with no losses gives 100.
+    """
+
+    def __init__(self, period=14):
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.previous = NAN
+
+    def update(self, close):
+        delta = close - self.previous
+        self.previous = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = self.gains.push(gain).mean()
+        avg_loss = self.losses.push(loss).mean()
+
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return NAN
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else NAN
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class BollingerBands(StreamingIndicator):
+    """Upper, lower, middle band and width (%)"""
+
+    def __init__(self, period=20, width=2.0):
+        self.rolling = RollingWindow(period)
+        self.width = width
+
+    def update(self, close):
+        self.rolling.push(close)
+        middle = self.rolling.mean()
+        std = self.rolling.std()
+        upper = middle + std * self.width
+        lower = middle - std * self.width
+        return upper, lower, middle, (upper - lower) / middle * 100
+
+
+class ATR(StreamingIndicator):
+    """Average true range (simple mean of true range)"""
+
+    def __init__(self, period=20):
+        self.rolling = RollingWindow(period)
+        self.previous_close = NAN
+
+    def update(self, high, low, close):
+        ranges = [high - low, abs(high - self.previous_close), abs(low - self.previous_close)]
+        true_range = max((r for r in ranges if not math.isnan(r)), default=NAN)
+        self.previous_close = close
+        return self.rolling.push(true_range).mean()
+
+
+class Volatility(StreamingIndicator):
+    """Rolling standard deviation of daily % returns"""
+
+    def __init__(self, period=20):
+        self.rolling = RollingWindow(period)
+        self.previous = NAN
+
+    def update(self, close):
+        daily_return = (close / self.previous - 1.0) * 100
+        self.previous = close
+        return self.rolling.push(daily_return).std()
+
+
+class ROC(StreamingIndicator):
+    """Rate of change over period bars (%)"""
+
+    def __init__(self, period):
+        self.history = RollingWindow(period + 1)
+
+    def update(self, close):
+        # With period + 1 slots, the oldest value is the close period bars back
+        past = self.history.push(close).oldest()
+        return (close - past) / past * 100
+
+
+class IndicatorEngine(StreamingIndicator):
+    """All FeatureEngineer columns, one bar at a time"""
+
+    def __init__(self):
+        self.sma_10 = SMA(10)
+        self.sma_20 = SMA(20)
+        self.sma_50 = SMA(50)
+        self.sma_200 = SMA(200)
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = BollingerBands(20)
+        self.atr = ATR(20)
+        self.volatility = Volatility(20)
+        self.roc_5 = ROC(5)
+        self.roc_10 = ROC(10)
+        self.previous_close = NAN
+
+    def update(self, open_, high, low, close):
+        """Feed one bar, return {feature: value} in FeatureEngineer naming"""
+        macd, signal, hist = self.macd.update(close)
+        upper, lower, middle, width = self.bollinger.update(close)
+        previous = self.previous_close
+        self.previous_close = close
+
+        return {
+            'SMA_10': self.sma_10.update(close),
+            'SMA_20': self.sma_20.update(close),
+            'SMA_50': self.sma_50.update(close),
+            'SMA_200': self.sma_200.update(close),
+            'RSI': self.rsi.update(close),
+            'MACD': macd,
+            'MACD_Signal': signal,
+            'MACD_Hist': hist,
+            'BB_Upper': upper,
+            'BB_Lower': lower,
+            'BB_Middle': middle,
+            'BB_Width': width,
+            'Daily_Return': (close / previous - 1.0) * 100,
+            'Intraday_Range': (high - low) / close * 100,
+            'Gap': (open_ - previous) / previous * 100,
+            'Volatility': self.volatility.update(close),
+            'ATR': self.atr.update(high, low, close),
+            'ROC_5': self.roc_5.update(close),
+            'ROC_10': self.roc_10.update(close)
+        }
+
+
+INDICATORS = {cls.__name__: cls for cls in [
+    RollingWindow, SMA, EMA, MACD, RSI, BollingerBands, ATR, Volatility, ROC, IndicatorEngine
+]}
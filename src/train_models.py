@@ -6,94 +6,173 @@ Trains multiple ML models:
 2. Gradient Boosting Classifier
 3. Logistic Regression
 4. Voting Ensemble (combines all models)
+
+The three base models are independent, so with jobs > 1 they are fitted
+at the same time in a process pool. The ensemble is assembled from the
+fitted base models rather than refitted (VotingClassifier.fit would clone
+and retrain all three), and every fit is timed: wall clock, CPU seconds
+and CPU use (CPU / wall, > 1 when a model runs on several cores).
+
+train_pairs() trains a full model set for every pair, several pairs at a
+time, each within its own core budget, and registers the results in the
+ModelRegistry (data/models/{pair}/ plus manifest.json).
 """
 
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
 from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix
 import joblib
 import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+
+from storage import get_storage
+from precision import get_dtype
+from datasets import DatasetStore
+from parallel import resolve_jobs, run_pairs
+from model_registry import ModelRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BASE_MODELS = {
+    'random_forest': 'Random Forest',
+    'gradient_boosting': 'Gradient Boosting',
+    'logistic_regression': 'Logistic Regression'
+}
+
+
+def make_model(name, n_jobs=-1):
+    """Unfitted base model by name (n_jobs only affects Random Forest)"""
+    if name == 'random_forest':
+        return RandomForestClassifier(
+            n_estimators=200,
+            max_depth=20,
+            min_samples_split=5,
+            random_state=42,
+            n_jobs=n_jobs,
+            verbose=0
+        )
+    if name == 'gradient_boosting':
+        return GradientBoostingClassifier(
+            n_estimators=200,
+            learning_rate=0.1,
+            max_depth=7,
+            random_state=42,
+            verbose=0
+        )
+    if name == 'logistic_regression':
+        return LogisticRegression(
+            max_iter=1000,
+            random_state=42
+        )
+    raise ValueError(f"Unknown model '{name}', use one of {list(BASE_MODELS)}")
+
+
+def fit_model(name, X_train, y_train, n_jobs=-1, dtype=None):
+    """Fit one base model and time it: (name, model, {wall_s, cpu_s, cpu_use})
+
+    X_train may be a .npy path, memory-mapped here, so pool workers read the
+    dataset from the page cache instead of receiving a pickled copy.
+    """
+    if isinstance(X_train, str):
+        X_train = np.load(X_train, mmap_mode='r').astype(get_dtype(dtype), copy=False)
+    if isinstance(y_train, str):
+        y_train = np.load(y_train, mmap_mode='r')
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    model = make_model(name, n_jobs).fit(X_train, y_train)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return name, model, {'wall_s': wall, 'cpu_s': cpu, 'cpu_use': cpu / wall if wall else 0.0}
+
 
 class ModelTrainer:
     """Trains and evaluates ML models for forex prediction"""
     
-    def __init__(self):
+    def __init__(self, storage=None, dtype=None, datasets=None):
         self.models = {}
         self.results = {}
+        self.storage = get_storage(storage)
+        self.dtype = get_dtype(dtype)
+        self.datasets = datasets or DatasetStore()
+        self.timings = {}
         logger.info("[OK] ModelTrainer initialized")
     
     def load_data(self, pair='EURUSD'):
-        """Load prepared data"""
+        """Load prepared data
+        
+        Reads the pair's dataset (or 'pooled') memory-mapped from the
+        DatasetStore; without one, falls back to the shared X_train/X_test
+        files in data/processed.
+        """
         logger.info(f"[LOADING] Data for {pair}...")
         
-        X_train = pd.read_csv('data/processed/X_train.csv')
-        X_test = pd.read_csv('data/processed/X_test.csv')
-        y_train = pd.read_csv('data/processed/y_train.csv').values.ravel()
-        y_test = pd.read_csv('data/processed/y_test.csv').values.ravel()
+        if self.datasets.exists(pair):
+            arrays = self.datasets.load(pair)
+            X_train = arrays['X_train'].astype(self.dtype, copy=False)
+            X_test = arrays['X_test'].astype(self.dtype, copy=False)
+            logger.info(f"[OK] Data mapped: Train={len(X_train)}, Test={len(X_test)}")
+            return X_train, X_test, arrays['y_train'], arrays['y_test']
+        
+        logger.warning(f"[FALLBACK] No {pair} dataset in {self.datasets.root}, using data/processed/X_train")
+        X_train = self.storage.load('data/processed', 'X_train', index=False).astype(self.dtype)
+        X_test = self.storage.load('data/processed', 'X_test', index=False).astype(self.dtype)
+        y_train = self.storage.load('data/processed', 'y_train', index=False).values.ravel()
+        y_test = self.storage.load('data/processed', 'y_test', index=False).values.ravel()
         
         logger.info(f"[OK] Data loaded: Train={len(X_train)}, Test={len(X_test)}")
         
         return X_train, X_test, y_train, y_test
     
-    def train_random_forest(self, X_train, y_train):
-        """Train Random Forest model"""
-        logger.info("[TRAINING] Random Forest...")
+    def train_base_models(self, X_train, y_train, jobs=None, pair=None):
+        """Fit every base model, concurrently when jobs > 1
         
-        model = RandomForestClassifier(
-            n_estimators=200,
-            max_depth=20,
-            min_samples_split=5,
-            random_state=42,
-            n_jobs=-1,
-            verbose=0
-        )
+        jobs is the core budget: None keeps the sequential run with Random
+        Forest on all cores; otherwise the three models share jobs cores, one
+        process each, with Random Forest's trees on the cores left over.
+        With a stored dataset for pair, workers memory-map it themselves.
+        Returns {name: model} and fills self.timings.
+        """
+        cores = None if jobs is None else resolve_jobs(jobs)
+        workers = 1 if cores is None else min(cores, len(BASE_MODELS))
+        n_jobs = {name: 1 for name in BASE_MODELS}
+        n_jobs['random_forest'] = -1 if cores is None else max(cores - (workers - 1), 1)
         
-        model.fit(X_train, y_train)
-        logger.info("[OK] Random Forest trained")
+        if workers > 1:
+            logger.info(f"[TRAINING] {len(BASE_MODELS)} base models in {workers} processes ({cores} cores)...")
+            if pair is not None and self.datasets.exists(pair):
+                X_train, y_train = self.datasets.path(pair, 'X_train.npy'), self.datasets.path(pair, 'y_train.npy')
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(fit_model, name, X_train, y_train, n_jobs[name], self.dtype)
+                           for name in BASE_MODELS]
+                outcomes = [future.result() for future in futures]
+        else:
+            outcomes = []
+            for name, title in BASE_MODELS.items():
+                logger.info(f"[TRAINING] {title}...")
+                outcomes.append(fit_model(name, X_train, y_train, n_jobs[name]))
         
-        return model
+        models = {}
+        for name, model, timing in outcomes:
+            models[name] = model
+            self.timings[BASE_MODELS[name]] = timing
+            logger.info(f"[OK] {BASE_MODELS[name]} trained in {timing['wall_s']:.2f}s "
+                        f"(CPU {timing['cpu_s']:.2f}s, {timing['cpu_use']:.1f}x)")
+        return models
     
-    def train_gradient_boosting(self, X_train, y_train):
-        """Train Gradient Boosting model"""
-        logger.info("[TRAINING] Gradient Boosting...")
+    def create_ensemble(self, rf_model, gb_model, lr_model, y_train=None):
+        """Create voting ensemble
         
-        model = GradientBoostingClassifier(
-            n_estimators=200,
-            learning_rate=0.1,
-            max_depth=7,
-            random_state=42,
-            verbose=0
-        )
-        
-        model.fit(X_train, y_train)
-        logger.info("[OK] Gradient Boosting trained")
-        
-        return model
-    
-    def train_logistic_regression(self, X_train, y_train):
-        """Train Logistic Regression model"""
-        logger.info("[TRAINING] Logistic Regression...")
-        
-        model = LogisticRegression(
-            max_iter=1000,
-            random_state=42
-        )
-        
-        model.fit(X_train, y_train)
-        logger.info("[OK] Logistic Regression trained")
-        
-        return model
-    
-    def create_ensemble(self, rf_model, gb_model, lr_model):
-        """Create voting ensemble"""
+        With y_train the ensemble is returned fitted, wrapping the given
+        (already fitted) models as they are, so it never retrains them.
+        """
         logger.info("[CREATING] Voting Ensemble...")
         
         ensemble = VotingClassifier(
@@ -105,6 +184,13 @@ class ModelTrainer:
             voting='soft'
         )
         
+        if y_train is not None:
+            # The fitted state VotingClassifier.fit would produce, minus the refits
+            ensemble.estimators_ = [rf_model, gb_model, lr_model]
+            ensemble.named_estimators_ = Bunch(rf=rf_model, gb=gb_model, lr=lr_model)
+            ensemble.le_ = LabelEncoder().fit(y_train)
+            ensemble.classes_ = ensemble.le_.classes_
+        
         logger.info("[OK] Ensemble created")
         return ensemble
     
@@ -150,69 +236,146 @@ class ModelTrainer:
             joblib.dump(model, filename)
             logger.info(f"[SAVED] {filename}")
     
-    def train_all(self, pair='EURUSD'):
-        """Train all models"""
+    def train_all(self, pair='EURUSD', jobs=None, save=True):
+        """Train all models
+        
+        jobs: core budget for the base models (see train_base_models).
+        The fitted models and per-model timings are in self.models and
+        self.timings afterwards; save=False skips the flat model files.
+        """
         
         # Load data
         X_train, X_test, y_train, y_test = self.load_data(pair)
         
         # Train individual models
-        rf_model = self.train_random_forest(X_train, y_train)
-        gb_model = self.train_gradient_boosting(X_train, y_train)
-        lr_model = self.train_logistic_regression(X_train, y_train)
+        self.timings = {}
+        start = time.perf_counter()
+        base = self.train_base_models(X_train, y_train, jobs, pair)
         
-        # Create ensemble
-        ensemble = self.create_ensemble(rf_model, gb_model, lr_model)
-        ensemble.fit(X_train, y_train)
+        # Create ensemble from the fitted models (no second fit)
+        ensemble = self.create_ensemble(base['random_forest'], base['gradient_boosting'],
+                                        base['logistic_regression'], y_train)
+        wall, cpu = time.perf_counter() - start, sum(t['cpu_s'] for t in self.timings.values())
+        self.timings['Total'] = {'wall_s': wall, 'cpu_s': cpu, 'cpu_use': cpu / wall if wall else 0.0}
         
         # Evaluate all models
-        models_to_eval = {
-            'Random Forest': rf_model,
-            'Gradient Boosting': gb_model,
-            'Logistic Regression': lr_model,
-            'Voting Ensemble': ensemble
-        }
+        models_to_eval = {BASE_MODELS[name]: model for name, model in base.items()}
+        models_to_eval['Voting Ensemble'] = ensemble
         
         results = {}
         for model_name, model in models_to_eval.items():
             results[model_name] = self.evaluate_model(model, X_test, y_test, model_name)
         
         # Save all models
-        models_to_save = {
-            'random_forest': rf_model,
-            'gradient_boosting': gb_model,
-            'logistic_regression': lr_model,
-            'ensemble': ensemble
-        }
-        self.save_models(models_to_save, pair)
+        self.models = dict(base, ensemble=ensemble)
+        if save:
+            self.save_models(self.models, pair)
         
         return results
+    
+    def timing_frame(self):
+        """Wall / CPU seconds and CPU use of the last train_all, one row per model"""
+        return pd.DataFrame(self.timings).T[['wall_s', 'cpu_s', 'cpu_use']]
 
 
-if __name__ == "__main__":
-    
-    print("\n" + "="*70)
-    print("PHASE 5: MACHINE LEARNING MODEL TRAINING")
-    print("="*70 + "\n")
+def train_pair(pair, cores=1, dtype=None, datasets=None, registry=None):
+    """Train and save one pair's model set (the unit of work for train_pairs)
     
-    trainer = ModelTrainer()
+    Returns the pair's manifest record; the manifest itself is written by
+    the caller once every pair is done.
+    """
+    datasets = datasets or DatasetStore()
+    registry = registry or ModelRegistry()
+    if not datasets.exists(pair):
+        raise FileNotFoundError(f"No {pair} dataset in {datasets.root}, run prepare_ml_data.py first")
     
-    # Train models for EURUSD (we'll use this for the web app)
-    print("[TRAINING MODELS FOR EURUSD]")
+    print(f"[TRAINING] {pair} ({cores} cores)")
     print("-" * 70)
     
-    results = trainer.train_all('EURUSD')
+    trainer = ModelTrainer(dtype=dtype, datasets=datasets)
+    results = trainer.train_all(pair, jobs=cores, save=False)
+    meta = datasets.meta(pair)
+    record = registry.save(pair, trainer.models, datasets.scaler(pair), meta['feature_columns'],
+                           dataset=datasets.path(pair), train_rows=meta['train_rows'], test_rows=meta['test_rows'],
+                           dtype=np.dtype(trainer.dtype).name, cores=cores, metrics=results, timings=trainer.timings)
     
-    # Display results summary
-    print("\n" + "="*70)
-    print("MODEL PERFORMANCE SUMMARY")
-    print("="*70)
+    print(f"[OK] {pair}: ensemble accuracy {results['Voting Ensemble']['Accuracy']:.4f}, "
+          f"{trainer.timings['Total']['wall_s']:.1f}s\n")
+    return record
+
+
+def train_pairs(pairs, jobs=0, cores_per_pair=None, dtype=None, datasets=None, registry=None):
+    """Train every pair's model set in parallel within a core budget
+    
+    jobs is the total budget (0 = all cores) and cores_per_pair each pair's
+    share (default: the budget split evenly, at least one core), so
+    jobs // cores_per_pair pairs train at once. Returns {pair: record} for
+    the pairs that succeeded, already registered in the manifest.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+    registry = registry or ModelRegistry()
+    total = max(resolve_jobs(jobs), 1)
+    cores_per_pair = cores_per_pair or max(total // len(pairs), 1)
+    workers = max(total // cores_per_pair, 1)
+    logger.info(f"[TRAINING] {len(pairs)} pairs, {min(workers, len(pairs))} at a time, {cores_per_pair} cores each")
     
-    for model_name, metrics in results.items():
-        print(f"\n{model_name}:")
-        for metric, value in metrics.items():
-            print(f"  {metric}: {value:.4f}")
+    worker = partial(train_pair, cores=cores_per_pair, dtype=dtype, datasets=datasets, registry=registry)
+    records = run_pairs(worker, pairs, workers, action='train')
+    if records:
+        registry.register(records)
+    return records
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train the models for one dataset")
+    parser.add_argument('--pair', default='EURUSD', help="Pair dataset to train on, or 'pooled' (default: EURUSD, used by the web app)")
+    parser.add_argument('--jobs', type=int, default=None, help="Cores for the base models, fitted concurrently when > 1 (0 = all cores; default: sequential). With --all-pairs: the total core budget (default: all cores)")
+    parser.add_argument('--all-pairs', action='store_true', help="Train every pair's model set into data/models/{pair}/ with a manifest")
+    parser.add_argument('--cores-per-pair', type=int, default=None, help="With --all-pairs: cores per pair (default: budget split evenly)")
+    args = parser.parse_args()
     
     print("\n" + "="*70)
-    print("Phase 5 Complete! Models trained and saved.")
-    print("="*70)
\ No newline at end of file
+    print("PHASE 5: MACHINE LEARNING MODEL TRAINING")
+    print("="*70 + "\n")
+    
+    if args.all_pairs:
+        pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']
+        train_pairs(pairs, 0 if args.jobs is None else args.jobs, args.cores_per_pair)
+        
+        print("="*70)
+        print("MODEL REGISTRY")
+        print("="*70)
+        print(ModelRegistry().summary().to_string(index=False))
+        print("="*70)
+        print("Phase 5 Complete! Models trained and registered.")
+        print("="*70)
+    else:
+        trainer = ModelTrainer()
+        
+        print(f"[TRAINING MODELS FOR {args.pair.upper()}]")
+        print("-" * 70)
+        
+        results = trainer.train_all(args.pair, args.jobs)
+        
+        # Display results summary
+        print("\n" + "="*70)
+        print("MODEL PERFORMANCE SUMMARY")
+        print("="*70)
+        
+        for model_name, metrics in results.items():
+            print(f"\n{model_name}:")
+            for metric, value in metrics.items():
+                print(f"  {metric}: {value:.4f}")
+        
+        print("\n" + "="*70)
+        print("TRAINING TIME")
+        print("="*70)
+        print(trainer.timing_frame().to_string(float_format=lambda v: f"{v:.2f}"))
+        
+        print("\n" + "="*70)
+        print("Phase 5 Complete! Models trained and saved.")
+        print("="*70)
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+WALK-FORWARD SPLITS
+
+Chronological train/test folds for rolling evaluation, in place of a
+shuffled train_test_split (which trains on the future) and a scaler fitted
+on all rows (which leaks test ranges into training):
+
+    rolling   - fixed-size training window sliding forward
+    expanding - training always starts at the first row and grows
+
+    |---- train ----|gap|-- test --|
+              |---- train ----|gap|-- test --|          (step = test_size)
+
+Folds are row ranges computed arithmetically, so thousands of folds cost
+nothing to generate, and train / test matrices are slices (zero-copy
+views) of the feature array. Each fold's scaler is fitted on its training
+rows only; the scaled rows are cached per fold (in memory, or as .npy
+files that are memory-mapped back) so repeated model runs skip rescaling.
+
+    folds = WalkForward(X, y, train_size=500, test_size=50)
+    for fold in folds:
+        X_train, X_test, y_train, y_test = folds.scaled(fold)
+"""
+
+import pandas as pd
+import numpy as np
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from sklearn.base import clone
+from sklearn.preprocessing import MinMaxScaler
+
+from feature_store import fingerprint
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Fold:
+    """One split: train and test are row slices"""
+
+    __slots__ = ('number', 'train', 'test')
+
+    def __init__(self, number, train, test):
+        self.number = number
+        self.train = train
+        self.test = test
+
+    def __repr__(self):
+        return (f"Fold({self.number}, train={self.train.start}:{self.train.stop}, "
+                f"test={self.test.start}:{self.test.stop})")
+
+
+def fold_bounds(n_rows, train_size, test_size, step=None, gap=0, expanding=False):
+    """[folds, 4] array of (train_start, train_stop, test_start, test_stop)"""
+    step = step or test_size
+    if min(train_size, test_size, step) < 1 or gap < 0:
+        raise ValueError("train_size, test_size and step must be positive and gap non-negative")
+    count = max((n_rows - train_size - gap - test_size) // step + 1, 0)
+
+    test_start = train_size + gap + step * np.arange(count)
+    train_stop = test_start - gap
+    train_start = np.zeros(count, dtype=np.int64) if expanding else train_stop - train_size
+    return np.column_stack((train_start, train_stop, test_start, test_start + test_size)).astype(np.int64)
+
+
+class WalkForward:
+    """Walk-forward folds over a feature matrix with per-fold scaling
+
+    X and y are taken as arrays once (DataFrames are converted); every fold
+    then slices them. cache_dir keeps scaled folds on disk across runs,
+    otherwise the cache_size most recently used folds are kept in memory.
+    """
+
+    def __init__(self, X, y, train_size, test_size, step=None, gap=0, expanding=False,
+                 scaler=None, cache_dir=None, cache_size=32):
+        self.columns = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        self.X = X.to_numpy() if isinstance(X, (pd.DataFrame, pd.Series)) else np.asarray(X)
+        self.y = y.to_numpy() if isinstance(y, (pd.DataFrame, pd.Series)) else np.asarray(y)
+        if len(self.X) != len(self.y):
+            raise ValueError(f"X has {len(self.X)} rows but y has {len(self.y)}")
+
+        self.bounds = fold_bounds(len(self.X), train_size, test_size, step, gap, expanding)
+        self.scaler = scaler if scaler is not None else MinMaxScaler()
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._key = None
+        logger.info(f"[OK] {len(self)} walk-forward folds "
+                    f"({'expanding' if expanding else 'rolling'}, train {train_size}, test {test_size})")
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def fold(self, number):
+        train_start, train_stop, test_start, test_stop = (int(v) for v in self.bounds[number])
+        return Fold(number, slice(train_start, train_stop), slice(test_start, test_stop))
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self.fold(number)
+
+    def split(self, fold):
+        """Unscaled (X_train, X_test, y_train, y_test), all views of the inputs"""
+        return self.X[fold.train], self.X[fold.test], self.y[fold.train], self.y[fold.test]
+
+    def scaler_for(self, fold):
+        """A fresh scaler fitted on the fold's training rows only"""
+        return clone(self.scaler).fit(self.X[fold.train])
+
+    def scaled(self, fold):
+        """Scaled (X_train, X_test, y_train, y_test) for a fold, from the cache when present"""
+        rows = self._scaled_rows(fold)
+        train_rows = fold.train.stop - fold.train.start
+        offset = fold.test.start - fold.train.start
+        return (rows[:train_rows], rows[offset:offset + fold.test.stop - fold.test.start],
+                self.y[fold.train], self.y[fold.test])
+
+    def _scaled_rows(self, fold):
+        """Rows train_start:test_stop transformed by the fold's scaler"""
+        bounds = (fold.train.start, fold.train.stop, fold.test.start, fold.test.stop)
+        if bounds in self._cache:
+            self._cache.move_to_end(bounds)
+            return self._cache[bounds]
+
+        path = self._path(bounds) if self.cache_dir else None
+        if path and os.path.exists(path):
+            rows = np.load(path, mmap_mode='r')
+        else:
+            scaler = self.scaler_for(fold)
+            rows = scaler.transform(self.X[fold.train.start:fold.test.stop]).astype(self.X.dtype, copy=False)
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    np.save(f, rows)
+                os.replace(tmp, path)
+
+        self._cache[bounds] = rows
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rows
+
+    def _path(self, bounds):
+        """Disk cache file: one directory per (data, scaler), one file per fold range"""
+        if self._key is None:
+            digest = hashlib.sha256(fingerprint(self.X).encode())
+            digest.update(f"{self.X.shape}{self.X.dtype}{self.scaler!r}".encode())
+            self._key = digest.hexdigest()[:16]
+        return os.path.join(self.cache_dir, self._key, '{}_{}_{}_{}.npy'.format(*bounds))
+
+    def evaluate(self, model, metric):
+        """Fit a clone of model on every fold and score its test rows
+
+        Returns a frame with one row per fold (ranges and metric value).
+        """
+        rows = []
+        for fold in self:
+            X_train, X_test, y_train, y_test = self.scaled(fold)
+            fitted = clone(model).fit(X_train, y_train)
+            rows.append({'fold': fold.number, 'train_start': fold.train.start, 'train_stop': fold.train.stop,
+                         'test_start': fold.test.start, 'test_stop': fold.test.stop,
+                         'score': metric(y_test, fitted.predict(X_test))})
+        return pd.DataFrame(rows).set_index('fold')
@@ -0,0 +1,24 @@
+"""
+Shared test helpers
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_bars(periods=320, seed=0, start='2022-01-03', random_wicks=False):
+    """Synthetic daily OHLC random walk
+
+    High / Low sit 0.002 outside the body, or a random 0-0.003 with
+    random_wicks (so ranges vary bar to bar).
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=periods, name='Date')
+    close = 1.1 + np.cumsum(rng.normal(0, 0.004, periods))
+    open_ = close + rng.normal(0, 0.001, periods)
+    high = rng.uniform(0, 0.003, periods) if random_wicks else 0.002
+    low = rng.uniform(0, 0.003, periods) if random_wicks else 0.002
+    return pd.DataFrame({'Open': open_,
+                         'High': np.maximum(open_, close) + high,
+                         'Low': np.minimum(open_, close) - low,
+                         'Close': close}, index=index)
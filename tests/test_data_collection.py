@@ -0,0 +1,115 @@
+"""
+Data collection tests against a local fake downloader
+"""
+
+import sys
+import os
+import threading
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_collection import ForexDataCollector
+
+
+class FakeDownloader:
+    """Stands in for yf.download and records peak concurrency"""
+
+    def __init__(self, fail=(), delay=0.05, empty=()):
+        self.fail = set(fail)
+        self.empty = set(empty)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, pair_code, start=None, end=None, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if pair_code in self.fail:
+                raise ConnectionError(f"no data for {pair_code}")
+            if pair_code in self.empty:
+                # yfinance reports most failures as an empty frame
+                return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'], index=pd.DatetimeIndex([]))
+            index = pd.date_range(start or '2024-01-01', periods=5, freq='B')
+            return pd.DataFrame({
+                'Open': 1.0, 'High': 1.1, 'Low': 0.9, 'Close': 1.05, 'Volume': 0
+            }, index=index)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_download_all_concurrent_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeDownloader()
+    collector = ForexDataCollector(downloader=fake)
+
+    results = collector.download_all(years=1, max_workers=2)
+
+    assert results == {pair: True for pair in collector.currency_pairs}
+    assert fake.peak == 2
+    for pair in collector.currency_pairs:
+        assert os.path.exists(f'data/historical/{pair}_historical.csv')
+
+
+def test_download_all_reports_failed_pairs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeDownloader(fail={'USDJPY=X'}, delay=0)
+    collector = ForexDataCollector(downloader=fake)
+
+    results = collector.download_all(years=1, max_workers=4)
+
+    assert results['USDJPY'] is False
+    assert sum(results.values()) == len(collector.currency_pairs) - 1
+    assert list(results) == list(collector.currency_pairs)
+    assert not os.path.exists('data/historical/USDJPY_historical.csv')
+
+
+def test_incremental_refresh_appends_only_new_bars(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeDownloader(delay=0)
+    collector = ForexDataCollector(downloader=fake)
+
+    stored = fake('EURUSD=X', start='2024-01-01')
+    collector.save_data(stored, 'EURUSD')
+    last = collector.last_timestamp('EURUSD')
+    assert last == stored.index[-1]
+
+    data = collector.download_data('EURUSD', 'EURUSD=X', incremental=True)
+    assert data.index[0] == last
+    collector.save_data(data, 'EURUSD', incremental=True)
+
+    saved = pd.read_csv('data/historical/EURUSD_historical.csv', index_col=0, parse_dates=True)
+    assert len(saved) == len(stored) + len(data) - 1
+    assert saved.index.is_unique and saved.index.is_monotonic_increasing
+
+
+def test_incremental_empty_download_without_history_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    collector = ForexDataCollector(downloader=FakeDownloader(delay=0, empty={'GBPUSD=X', 'USDJPY=X'}))
+    collector.save_data(FakeDownloader(delay=0)('GBPUSD=X'), 'GBPUSD')
+
+    results = collector.download_all(years=1, incremental=True)
+
+    # GBPUSD has stored history, so no new bars is fine; USDJPY has none
+    assert results['GBPUSD'] is True
+    assert results['USDJPY'] is False
+    assert not os.path.exists('data/historical/USDJPY_historical.csv')
+
+
+def test_last_timestamp_reads_legacy_yfinance_header(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    collector = ForexDataCollector(downloader=FakeDownloader(delay=0))
+    with open('data/historical/GBPUSD_historical.csv', 'w') as f:
+        f.write("Price,Open,High,Low,Close\n"
+                "Ticker,GBPUSD=X,GBPUSD=X,GBPUSD=X,GBPUSD=X\n"
+                "Date,,,,\n"
+                "2024-03-01,1.26,1.27,1.25,1.265\n")
+
+    assert collector.last_timestamp('GBPUSD') == pd.Timestamp('2024-03-01')
+    assert collector.last_timestamp('USDCAD') is None
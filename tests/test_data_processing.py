@@ -0,0 +1,150 @@
+"""
+Data processing tests: panel mode must match the per-pair path
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from data_processing import DataProcessor, PanelDataProcessor, StreamingDataProcessor, stream_pair
+from feature_engineering import FeatureEngineer
+from memory_profile import MemoryTracker
+
+
+def make_raw(seed, periods=60):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=periods, freq='B', name='Date')
+    close = 1.0 + np.cumsum(rng.normal(0, 0.01, periods))
+    data = pd.DataFrame({'Open': close, 'High': close + 0.01,
+                         'Low': close - 0.01, 'Close': close}, index=index)
+    data.iloc[[0, 7, 8], 1] = np.nan
+    data.iloc[20] = data.iloc[19].to_numpy()
+    # Shuffle a block so sort_by_date has work to do
+    return pd.concat([data.iloc[30:], data.iloc[:30]])
+
+
+def clean(processor):
+    return (processor
+            .remove_missing_values()
+            .remove_duplicates()
+            .ensure_data_types()
+            .sort_by_date())
+
+
+def test_panel_matches_per_pair_path():
+    frames = {pair: make_raw(seed) for seed, pair in enumerate(['EURUSD', 'USDJPY', 'AUDUSD'])}
+    # Same values in two pairs must not count as duplicates
+    frames['GBPUSD'] = frames['EURUSD'].copy()
+
+    panel = clean(PanelDataProcessor.from_frames(frames))
+    split = panel.split()
+
+    assert list(split) == list(frames)
+    for pair, raw in frames.items():
+        expected = clean(DataProcessor(raw)).get_data()
+        pd.testing.assert_frame_equal(split[pair], expected)
+    assert panel.duplicates.to_dict() == {pair: 1 for pair in frames}
+
+
+def test_panel_from_array():
+    timestamps = pd.date_range('2024-01-01', periods=5, freq='D')
+    values = np.arange(2 * 5 * 4, dtype=float).reshape(2, 5, 4)
+    values[1, 2, 3] = np.nan
+
+    panel = clean(PanelDataProcessor.from_array(values, ['EURUSD', 'GBPUSD'], timestamps))
+
+    gbpusd = panel.split()['GBPUSD']
+    assert gbpusd['Close'].iloc[2] == values[1, 1, 3]
+    assert panel.get_data().shape == (10, 4)
+
+
+def test_copy_free_mode_matches_and_owns_frame():
+    raw = make_raw(3).sort_index()
+    expected = clean(DataProcessor(raw)).get_data()
+
+    owned = raw.copy()
+    processor = clean(DataProcessor(owned, copy=False))
+
+    pd.testing.assert_frame_equal(processor.get_data(), expected)
+    assert processor.raw_data is owned
+    assert not owned.isnull().any().any()
+
+
+def test_memory_tracker_records_each_chained_call():
+    tracker = MemoryTracker()
+    features = (tracker.track(FeatureEngineer(make_raw(5).sort_index(), copy=False))
+                .moving_averages()
+                .rsi()
+                .get_data())
+    records = tracker.report()
+
+    assert 'RSI' in features.columns
+    assert [r['stage'] for r in records] == [
+        'FeatureEngineer.moving_averages', 'FeatureEngineer.rsi', 'FeatureEngineer.get_data'
+    ]
+    assert records[0]['peak_bytes'] >= records[0]['retained_bytes'] > 0
+
+
+def test_streaming_processor_matches_in_memory_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = make_raw(11, periods=250).sort_index()
+    raw = raw.drop(raw.index[20])     # a same-valued bar on another date (see the next test)
+    raw.iloc[:3, 2] = np.nan          # leading gap -> needs bfill
+    raw.iloc[49:53, 0] = np.nan       # gap across a chunk boundary
+    raw = pd.concat([raw.iloc[:100], raw.iloc[99:100], raw.iloc[100:]])  # repeated bar
+    raw.to_csv('raw.csv')
+
+    streaming = StreamingDataProcessor(chunksize=50, key_window=20).process('raw.csv', 'EURUSD_processed')
+    expected = clean(DataProcessor(raw)).get_data()
+
+    result = pd.read_csv('data/processed/EURUSD_processed.csv', index_col=0, parse_dates=True)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+    assert (result.index == expected.index).all()
+
+    report = streaming.get_report()
+    close = expected['Close']
+    assert report['Records'] == len(expected)
+    assert report['Duplicates'] == 1
+    assert report['Out of order'] == 0
+    assert report['Missing (raw)'] == int(raw.isnull().sum().sum())
+    np.testing.assert_allclose([report['Close mean'], report['Close std'], report['Close min'], report['Close max']],
+                               [close.mean(), close.std(), close.min(), close.max()])
+
+
+def test_streaming_duplicates_are_repeated_timestamps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = make_raw(11, periods=60).sort_index()    # bar 20 repeats bar 19's values
+    raw.to_csv('raw.csv')
+
+    streaming = StreamingDataProcessor(chunksize=25).process('raw.csv', 'EURUSD_processed')
+
+    # DataProcessor drops the same-valued bar; the stream keeps it (its timestamp is new)
+    assert len(clean(DataProcessor(raw)).get_data()) == 59
+    assert streaming.get_report()['Records'] == 60
+    assert streaming.get_report()['Duplicates'] == 0
+
+
+def test_streaming_holds_at_most_a_chunk_for_back_fill(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = make_raw(3, periods=200).sort_index()
+    raw['High'] = np.nan                       # a column that never gets a value
+    raw.to_csv('raw.csv')
+
+    processor = StreamingDataProcessor(chunksize=30)
+    sizes = []
+    original = processor._emit
+    processor._emit = lambda chunk, *rest: sizes.append(len(chunk)) or original(chunk, *rest)
+    processor.process('raw.csv', 'EURUSD_processed')
+
+    assert max(sizes) <= 2 * 30
+    assert processor.get_report()['Records'] == 200
+
+
+def test_stream_pair_refuses_binary_storage():
+    with pytest.raises(ValueError):
+        stream_pair('EURUSD', storage='npz')
@@ -0,0 +1,78 @@
+"""
+OHLC validation tests
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_validation import DataValidator, forex_calendar
+from data_processing import DataProcessor
+
+
+def make_bars(start='2024-01-01', periods=40, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=periods, name='Date')
+    close = 1.1 + np.cumsum(rng.normal(0, 0.002, periods))
+    return pd.DataFrame({'Open': close - 0.001, 'High': close + 0.003,
+                         'Low': close - 0.003, 'Close': close}, index=index)
+
+
+def test_rules_flag_broken_bars():
+    bars = make_bars()
+    bars.iloc[5, bars.columns.get_loc('High')] = bars['Close'].iloc[5] - 0.01
+    bars.iloc[9, bars.columns.get_loc('Low')] = -1.0
+    bars.iloc[20, bars.columns.get_loc('Close')] *= 1.5
+
+    violations = DataValidator(bars, pair='EURUSD').check()
+    found = set(zip(violations['Date'], violations['Rule']))
+
+    assert (bars.index[5], 'high_below_open_close') in found
+    assert (bars.index[5], 'high_below_low') in found
+    assert (bars.index[9], 'non_positive') in found
+    assert (bars.index[20], 'spike') in found
+    assert set(violations['Pair']) == {'EURUSD'}
+
+
+def test_panel_gaps_and_fill():
+    eurusd = make_bars()
+    usdjpy = make_bars(seed=1) * 100
+    eurusd = eurusd.drop(eurusd.index[[3, 4]])
+    usdjpy = pd.concat([usdjpy, usdjpy.iloc[[7]]])
+    usdjpy.loc[pd.Timestamp('2024-01-06')] = usdjpy.iloc[0]  # a Saturday bar
+    panel = pd.concat({'EURUSD': eurusd, 'USDJPY': usdjpy.sort_index()}, names=['Pair'])
+
+    validator = DataValidator(panel)
+    summary = validator.summary()
+    gaps = validator.gaps()
+
+    assert summary.loc['USDJPY', 'duplicate_timestamp'] == 1
+    assert summary.loc['USDJPY', 'off_calendar'] == 1
+    assert gaps['Pair'].tolist() == ['EURUSD', 'EURUSD']
+    assert gaps['Date'].tolist() == list(make_bars().index[[3, 4]])
+
+    filled = validator.fill_gaps().xs('EURUSD', level=0)
+    assert len(filled) == 40
+    assert (filled.loc[gaps['Date'], 'Open'] == eurusd['Close'].iloc[2]).all()
+
+
+def test_calendar_holidays():
+    sessions = forex_calendar('2024-12-23', '2025-01-03', holidays=[(12, 25), (1, 1)])
+    assert pd.Timestamp('2024-12-25') not in sessions
+    assert pd.Timestamp('2024-12-28') not in sessions
+    assert len(sessions) == 8
+
+
+def test_processor_validate_step_fills_gaps():
+    bars = make_bars().drop(make_bars().index[10])
+    processor = (DataProcessor(bars)
+                 .remove_missing_values()
+                 .sort_by_date()
+                 .validate(fill_gaps=True))
+
+    assert len(processor.gaps) == 1
+    assert len(processor.get_data()) == 40
+    assert processor.get_data().index.is_monotonic_increasing
@@ -0,0 +1,91 @@
+"""
+Dataset store tests: per-pair namespaces, pooled set and memory-mapped loading
+"""
+
+import sys
+import os
+import weakref
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from datasets import DatasetStore
+from feature_engineering import FeatureEngineer
+from prepare_ml_data import MLDataPreparation
+from train_models import ModelTrainer
+
+
+def prepare(seed, columns=None):
+    features = FeatureEngineer(make_bars(seed=seed)).build().remove_nan().get_data()
+    return MLDataPreparation(features).create_target().select_features(columns).time_split()
+
+
+def test_pairs_do_not_overwrite_each_other(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    preps = {'EURUSD': prepare(1), 'GBPUSD': prepare(2)}
+    for pair, prep in preps.items():
+        store.write_pair(pair, prep)
+
+    assert store.names() == ['EURUSD', 'GBPUSD']
+    for pair, prep in preps.items():
+        arrays = store.load(pair)
+        assert isinstance(arrays['X_train'], np.memmap)
+        np.testing.assert_array_equal(arrays['X_train'], prep.X_train.to_numpy())
+        np.testing.assert_array_equal(arrays['y_test'], prep.y_test.to_numpy())
+        assert store.scaler(pair).data_max_.tolist() == prep.scaler.data_max_.tolist()
+
+    trainer = ModelTrainer(datasets=store)
+    X_train, X_test, y_train, y_test = trainer.load_data('GBPUSD')
+    assert isinstance(X_train, np.memmap)
+    np.testing.assert_array_equal(X_test, preps['GBPUSD'].X_test.to_numpy())
+
+
+def test_pooled_dataset_has_pair_id(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    preps = {'EURUSD': prepare(1), 'GBPUSD': prepare(2)}
+    for pair, prep in preps.items():
+        store.write_pair(pair, prep)
+    store.write_pooled(preps)
+
+    meta = store.meta('pooled')
+    assert meta['pairs'] == ['EURUSD', 'GBPUSD']
+    assert meta['feature_columns'][-1] == 'pair_id'
+
+    pooled = store.load('pooled')
+    rows = len(preps['EURUSD'].X_train)
+    assert len(pooled['X_train']) == rows + len(preps['GBPUSD'].X_train)
+    np.testing.assert_array_equal(pooled['X_train'][:rows, :-1], preps['EURUSD'].X_train.to_numpy())
+    assert (pooled['X_train'][:rows, -1] == 0).all() and (pooled['X_train'][rows:, -1] == 1).all()
+    np.testing.assert_array_equal(pooled['y_test'],
+                                  np.concatenate([p.y_test.to_numpy() for p in preps.values()]))
+
+
+def test_pooled_needs_matching_columns(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    store.write_pair('EURUSD', prepare(1))
+    store.write_pair('USDJPY', prepare(3, ['RSI', 'MACD']))
+    with pytest.raises(ValueError):
+        store.write_pooled(['EURUSD', 'USDJPY'])
+
+
+def test_finish_closes_maps_before_renaming(tmp_path, monkeypatch):
+    # Windows cannot rename a mapped file: every map must be gone first
+    store = DatasetStore(str(tmp_path))
+    arrays = store.create('EURUSD', 3, 2, 4)
+    arrays['X_train'][:] = 1.0
+    maps = [weakref.ref(values) for values in arrays.values()]
+    replace = os.replace
+
+    def checked_replace(src, dst):
+        if src.endswith(f'.npy.{os.getpid()}.tmp'):
+            assert all(ref() is None for ref in maps)
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', checked_replace)
+    store.finish('EURUSD', arrays, ['a', 'b', 'c', 'd'], train_rows=3, test_rows=2, dtype='float64')
+
+    assert (store.load('EURUSD')['X_train'] == 1.0).all()
+    assert sorted(os.listdir(store.path('EURUSD'))) == ['X_test.npy', 'X_train.npy', 'feature_columns.pkl',
+                                                        'meta.json', 'y_test.npy', 'y_train.npy']
@@ -0,0 +1,62 @@
+"""
+Feature graph tests: sharing, warm-up lookback and planned subsets
+"""
+
+import sys
+import os
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES, FeaturePlan, Indicators, PREVIOUS_CLOSE
+from feature_engineering import FeatureEngineer
+from prepare_ml_data import MLDataPreparation
+
+
+def operations(plan):
+    return [node for node in plan.nodes if node.op != 'column']
+
+
+def test_identical_intermediates_are_shared():
+    assert len(operations(FeaturePlan(['SMA_20', 'BB_Middle']))) == 1
+
+    plan = FeaturePlan(['Gap', 'ATR', 'RSI', 'Daily_Return'])
+    assert sum(node == PREVIOUS_CLOSE for node in plan.nodes) == 1
+
+    stats = FeaturePlan().describe()
+    assert stats['nodes'] < stats['unshared_nodes']
+
+
+def test_lookback_matches_leading_nans():
+    features = FeaturePlan().evaluate(make_bars())
+
+    for name, values in features.items():
+        assert FeaturePlan([name]).lookback == np.flatnonzero(~np.isnan(values))[0], name
+    assert FeaturePlan().lookback == 199
+
+
+def test_plan_computes_only_requested_features():
+    indicators = Indicators.from_frame(make_bars())
+    FeaturePlan(['RSI', 'SMA_10']).evaluate(None, indicators)
+
+    ops = {key[0] for key in indicators._cache}
+    assert 'rolling_std' not in ops and 'ema' not in ops
+
+
+def test_feature_columns_file_drives_engineer_and_preparation(tmp_path):
+    bars = make_bars()
+    columns = ['RSI', 'BB_Width', 'ATR', 'SMA_50']
+    path = str(tmp_path / 'feature_columns.pkl')
+    joblib.dump(columns, path)
+
+    planned = FeatureEngineer(bars).build(path).get_data()
+    chained = FeatureEngineer(bars).moving_averages().rsi().bollinger_bands().volatility().get_data()
+    pd.testing.assert_frame_equal(planned[columns], chained[columns])
+    assert 'MACD' not in planned.columns
+
+    from_prices = MLDataPreparation(bars).create_target().select_features(path)
+    from_features = MLDataPreparation(planned.dropna()).create_target().select_features(path)
+    pd.testing.assert_frame_equal(from_prices.X, from_features.X)
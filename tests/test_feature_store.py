@@ -0,0 +1,102 @@
+"""
+Feature store tests: hits, partial recompute on changed inputs and eviction
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES, FeaturePlan
+from feature_store import FeatureStore
+from feature_engineering import engineer_pair
+from storage import get_storage
+
+
+def test_hit_returns_cached_values(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    bars = make_bars()
+
+    first = store.get(bars, FEATURES, 'EURUSD')
+    # Identical definitions (SMA_20 / BB_Middle) share one entry
+    assert len(store.entries()) == len(set(store.keys(bars).values())) == len(FEATURES) - 1
+
+    cached = store.get(bars, FEATURES, 'EURUSD')
+    expected = FeaturePlan().evaluate(bars)
+    for name in FEATURES:
+        np.testing.assert_array_equal(cached[name], first[name])
+        np.testing.assert_array_equal(cached[name], expected[name])
+
+
+def test_only_affected_columns_miss(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    bars = make_bars()
+    before = store.keys(bars)
+
+    changed = bars.copy()
+    changed.iloc[-1, changed.columns.get_loc('Open')] += 0.01
+    after = store.keys(changed)
+
+    # Gap reads Open; close-only indicators keep their keys
+    assert after['Gap'] != before['Gap']
+    assert after['SMA_20'] == before['SMA_20'] and after['RSI'] == before['RSI']
+    assert store.keys(bars, ['SMA_10'])['SMA_10'] != before['SMA_20']
+
+    store.get(bars)
+    store.get(changed)
+    assert len(store.entries()) == len(set(before.values()) | set(after.values()))
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    old, new = make_bars(seed=1), make_bars(seed=2)
+    store.get(old, ['SMA_10'])
+    key = store.keys(old, ['SMA_10'])['SMA_10']
+    stale = os.path.join(str(tmp_path), key[:2], key + '.npy')
+    os.utime(stale, (0, 0))
+    store.get(new, ['SMA_10'])
+
+    removed = store.evict(store.entries()['bytes'].max())
+    assert removed == 1
+    assert list(store.entries()['key']) == [store.keys(new, ['SMA_10'])['SMA_10']]
+
+
+def test_engineer_pair_skips_unchanged_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = get_storage('npz')
+    storage.save(make_bars(), 'data/processed', 'EURUSD_processed')
+    store = FeatureStore('data/features')
+
+    shape = engineer_pair('EURUSD', storage, store)
+    written = os.path.getmtime(storage.path('data/processed', 'EURUSD_features'))
+    assert engineer_pair('EURUSD', storage, store) == shape
+    assert os.path.getmtime(storage.path('data/processed', 'EURUSD_features')) == written
+
+    uncached = storage.load('data/processed', 'EURUSD_features')
+    engineer_pair('EURUSD', storage)
+    pd.testing.assert_frame_equal(storage.load('data/processed', 'EURUSD_features'), uncached)
+
+
+def test_entries_evicted_by_another_worker_are_skipped(tmp_path, monkeypatch):
+    store = FeatureStore(str(tmp_path))
+    bars = make_bars()
+    keys = store.keys(bars)
+    store.get(bars, FEATURES, 'EURUSD')
+    gone = keys['RSI']
+
+    # Another worker's evict() deletes an entry between listdir and stat / load
+    listdir = os.listdir
+    store.remove(gone)
+    monkeypatch.setattr(os, 'listdir', lambda path: listdir(path) + (
+        [gone + '.npy'] if os.path.basename(path) == gone[:2] else []))
+    assert gone not in set(store.entries()['key'])
+    assert store.load(gone) is None
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', evicted)
+    assert store.load(keys['ATR']) is not None
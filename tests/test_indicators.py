@@ -0,0 +1,99 @@
+"""
+Shared indicator kernel tests: training and live paths must agree
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES, Indicators, compute_features
+from indicators import rolling_stats
+from feature_engineering import FeatureEngineer
+from prediction_engine import PredictionEngine
+
+
+def pandas_reference(data):
+    close = data['Close']
+    ref = pd.DataFrame(index=data.index)
+    for window in [10, 20, 50, 200]:
+        ref[f'SMA_{window}'] = close.rolling(window).mean()
+    delta = close.diff()
+    ref['RSI'] = 100 - 100 / (1 + delta.where(delta > 0, 0).rolling(14).mean() /
+                              (-delta.where(delta < 0, 0)).rolling(14).mean())
+    ref['MACD'] = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    ref['MACD_Signal'] = ref['MACD'].ewm(span=9, adjust=False).mean()
+    ref['MACD_Hist'] = ref['MACD'] - ref['MACD_Signal']
+    middle, std = close.rolling(20).mean(), close.rolling(20).std()
+    ref['BB_Upper'], ref['BB_Lower'], ref['BB_Middle'] = middle + 2 * std, middle - 2 * std, middle
+    ref['BB_Width'] = (ref['BB_Upper'] - ref['BB_Lower']) / middle * 100
+    ref['Daily_Return'] = close.pct_change() * 100
+    ref['Intraday_Range'] = (data['High'] - data['Low']) / close * 100
+    ref['Gap'] = (data['Open'] - close.shift(1)) / close.shift(1) * 100
+    ref['Volatility'] = ref['Daily_Return'].rolling(20).std()
+    true_range = pd.concat([data['High'] - data['Low'], (data['High'] - close.shift()).abs(),
+                            (data['Low'] - close.shift()).abs()], axis=1).max(axis=1)
+    ref['ATR'] = true_range.rolling(20).mean()
+    ref['ROC_5'] = (close - close.shift(5)) / close.shift(5) * 100
+    ref['ROC_10'] = (close - close.shift(10)) / close.shift(10) * 100
+    return ref
+
+
+def test_kernels_match_pandas():
+    data = make_bars(periods=300, random_wicks=True)
+    data.iloc[100:116, data.columns.get_loc('Close')] = data['Close'].iloc[100]  # flat run: zero-loss RSI
+    expected = pandas_reference(data)
+    features = pd.DataFrame(compute_features(data), index=data.index)
+
+    pd.testing.assert_frame_equal(features, expected[FEATURES], rtol=1e-9, atol=1e-12)
+
+
+def test_shared_intermediates_computed_once():
+    kernels = Indicators.from_frame(make_bars(periods=300, random_wicks=True))
+    assert kernels.feature('BB_Middle') is kernels.feature('SMA_20')
+    assert kernels.feature('MACD') is kernels.macd()[0]
+
+
+def test_live_path_matches_training_features():
+    data = make_bars(periods=300, random_wicks=True)
+    training = (FeatureEngineer(data)
+                .moving_averages().rsi().macd().bollinger_bands()
+                .price_features().volatility().momentum()
+                .get_data())
+    live = PredictionEngine(FEATURES).calculate_indicators(data)
+
+    warm = training[FEATURES].dropna().index
+    pd.testing.assert_frame_equal(live[FEATURES].loc[warm], training.loc[warm, FEATURES])
+    # Dashboard-only indicators are computed on first read
+    assert 'SMA_5' not in live.computed
+    assert not np.isnan(live['SMA_5'].iloc[-1])
+
+
+def test_rolling_stats_many_windows_across_blocks():
+    rng = np.random.default_rng(1)
+    x = 150 + np.cumsum(rng.normal(0, 0.5, 5000))
+    x[[10, 2500]] = np.nan
+    x[3000:3060] = x[2999]  # flat stretch: exact zero std
+    windows = [2, 5, 20, 50, 200]
+
+    means, stds = rolling_stats(x, windows, block=512)
+
+    assert means.shape == stds.shape == (len(windows), len(x))
+    series = pd.Series(x)
+    for i, window in enumerate(windows):
+        np.testing.assert_allclose(means[i], series.rolling(window).mean(), rtol=1e-12, equal_nan=True)
+        # Two-pass reference: pandas' own online std drifts more than this on tiny variances
+        exact = series.rolling(window).apply(lambda w: w.std(ddof=1), raw=True)
+        np.testing.assert_allclose(stds[i], exact, rtol=1e-7, atol=1e-12, equal_nan=True)
+    assert (stds[2, 3019:3060] == 0).all()
+
+
+def test_rolling_stats_empty_input():
+    means, stds = rolling_stats(np.array([]), [5, 20])
+    assert means.shape == stds.shape == (2, 0)
+
+    means, stds = rolling_stats(np.empty((3, 0)), [5], std=False)
+    assert means.shape == (1, 3, 0) and stds is None
@@ -0,0 +1,56 @@
+"""
+Intraday ingestion tests on a generated minute-bar file
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from intraday_collection import IntradayCollector, store_key
+from price_store import PriceStore
+
+
+def write_minute_bars(path, periods=3 * 24 * 60 + 17):
+    rng = np.random.default_rng(7)
+    index = pd.date_range('2024-01-01 00:03', periods=periods, freq='1min', name='Date')
+    close = 1.10 + np.cumsum(rng.normal(0, 1e-4, periods))
+    bars = pd.DataFrame({
+        'Open': close + rng.normal(0, 5e-5, periods),
+        'High': close + 2e-4,
+        'Low': close - 2e-4,
+        'Close': close
+    }, index=index)
+    bars.to_csv(path)
+    return bars
+
+
+@pytest.mark.parametrize('timeframe,rule', [('5m', '5min'), ('1h', '1h'), ('4h', '4h'), ('1d', '1D')])
+def test_streaming_resample_matches_pandas(tmp_path, timeframe, rule):
+    bars = write_minute_bars(tmp_path / 'EURUSD_1m.csv')
+    store = PriceStore(str(tmp_path / 'store'))
+
+    # Chunk size deliberately not aligned to any bucket
+    IntradayCollector(store, chunksize=997).ingest(str(tmp_path / 'EURUSD_1m.csv'), 'EURUSD', [timeframe])
+
+    expected = bars.resample(rule).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}).dropna()
+    loaded = store.load(store_key('EURUSD', timeframe))
+
+    assert len(loaded) == len(expected)
+    np.testing.assert_allclose(loaded.to_numpy(), expected.to_numpy())
+    assert (loaded.index == expected.index).all()
+
+
+def test_duplicate_rows_are_dropped(tmp_path):
+    bars = write_minute_bars(tmp_path / 'raw.csv', periods=120)
+    pd.concat([bars.iloc[:70], bars.iloc[60:]]).to_csv(tmp_path / 'dup.csv')
+    store = PriceStore(str(tmp_path / 'store'))
+
+    counts = IntradayCollector(store, chunksize=50).ingest(str(tmp_path / 'dup.csv'), 'GBPUSD', ['5m'])
+
+    expected = bars.resample('5min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+    assert counts['5m'] == len(expected)
+    np.testing.assert_allclose(store.load('GBPUSD_5m')['Close'], expected['Close'])
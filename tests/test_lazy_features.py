@@ -0,0 +1,67 @@
+"""
+Lazy feature frame tests: only requested columns (and their inputs) are built
+"""
+
+import sys
+import os
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES, compute_features
+from lazy_features import LazyFeatureFrame
+from prediction_engine import DISPLAY_COLUMNS, PredictionEngine
+from prepare_ml_data import MLDataPreparation
+
+
+def ops(frame):
+    return {key[0] for key in frame.indicators._cache}
+
+
+def test_nothing_is_computed_until_read():
+    bars = make_bars()
+    frame = LazyFeatureFrame(bars, ['RSI', 'SMA_10'])
+    assert frame.computed == {} and frame._indicators is None
+    assert frame.lookback == 13
+
+    rsi = frame['RSI']
+    # The first read evaluates every pending request, and nothing else
+    assert set(frame.computed) == {'RSI', 'SMA_10'}
+    assert 'ema' not in ops(frame) and 'rolling_std' not in ops(frame)
+    np.testing.assert_array_equal(rsi.to_numpy(), compute_features(bars, ['RSI'])['RSI'])
+    assert rsi.index.equals(bars.index)
+
+    frame['MACD']
+    assert 'ema' in ops(frame)
+    assert frame.requested == ['RSI', 'SMA_10', 'MACD']
+    assert list(frame.to_frame().columns) == ['Open', 'High', 'Low', 'Close', 'RSI', 'SMA_10', 'MACD']
+
+
+def test_latest_is_last_valid_value():
+    bars = make_bars()
+    bars.iloc[-1, bars.columns.get_loc('Close')] = np.nan
+    latest = LazyFeatureFrame(bars).latest(['Close', 'SMA_10'])
+    assert latest['Close'] == bars['Close'].iloc[-2]
+    assert latest['SMA_10'] == compute_features(bars, ['SMA_10'])['SMA_10'][-2]
+
+
+def test_preparation_and_live_use_saved_columns(tmp_path):
+    path = str(tmp_path / 'feature_columns.pkl')
+    joblib.dump(['RSI', 'ROC_5', 'Gap'], path)
+    bars = make_bars()
+
+    prep = MLDataPreparation(bars).create_target().select_features(path)
+    assert list(prep.X.columns) == ['RSI', 'ROC_5', 'Gap']
+    assert not prep.X.isna().any().any()
+
+    engine = PredictionEngine(joblib.load(path))
+    frame = engine.calculate_indicators(bars)
+    assert set(frame.computed) == {'RSI', 'ROC_5', 'Gap'}
+    assert 'rolling_std' not in ops(frame) and 'ema' not in ops(frame)
+
+    indicators = engine.get_indicators_dict(frame)
+    assert set(indicators) == set(DISPLAY_COLUMNS)
+    expected = compute_features(bars, FEATURES)
+    assert indicators['bb_width'] == expected['BB_Width'][-1]
@@ -0,0 +1,80 @@
+"""
+Panel feature tests: per-pair parity and calendar alignment
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES, compute_features
+from indicators import rolling_stats
+from panel_features import Panel
+from price_store import PriceStore
+
+
+def test_panel_matches_per_pair_features():
+    frames = {pair: make_bars(seed=i) for i, pair in enumerate(['EURUSD', 'GBPUSD', 'USDJPY'])}
+    panel = Panel.from_frames(frames)
+    tensor = panel.features()
+
+    assert tensor.shape == (3, 320, len(FEATURES))
+    for row, (pair, bars) in enumerate(frames.items()):
+        for i, values in enumerate(compute_features(bars).values()):
+            np.testing.assert_allclose(tensor[row, :, i], values, rtol=1e-12, atol=1e-12)
+
+    frame = panel.to_frame(dropna=True)
+    assert list(frame.columns) == FEATURES
+    assert frame.index.names == ['Pair', 'Date']
+    np.testing.assert_allclose(frame.loc['GBPUSD'].to_numpy(), tensor[1][~np.isnan(tensor[1]).any(axis=1)])
+
+
+def test_rolling_stats_panel_rows_match_series():
+    panel = 1.1 + np.cumsum(np.random.default_rng(3).normal(0, 0.004, (4, 900)), axis=1)
+    panel[1, 100:105] = np.nan
+    panel[2, :] = 1.25
+    means, stds = rolling_stats(panel, [5, 20, 200], block=256)
+
+    for row in range(4):
+        row_means, row_stds = rolling_stats(panel[row], [5, 20, 200], block=256)
+        np.testing.assert_array_equal(means[:, row], row_means)
+        np.testing.assert_allclose(stds[:, row], row_stds, rtol=1e-9, atol=1e-12)
+    assert np.all(stds[:, 2][~np.isnan(stds[:, 2])] == 0)
+
+
+def test_misaligned_calendars():
+    bars = make_bars(60)
+    holiday = bars.index[30]
+    frames = {'EURUSD': bars, 'USDJPY': bars.drop(holiday), 'AUDUSD': bars.iloc[10:]}
+
+    outer = Panel.from_frames(frames)
+    assert len(outer.index) == 60
+    assert not outer.observed[1, 30] and np.isnan(outer.prices['Close'][1, 30])
+    assert np.isnan(outer.prices['Close'][2, :10]).all()
+    # The gap blanks every SMA_10 window that covers it
+    sma = outer.features(['SMA_10'])[1, :, 0]
+    assert np.isnan(sma[30:40]).all() and not np.isnan(sma[40])
+
+    filled = Panel.from_frames(frames, fill_limit=1)
+    for col in ['Open', 'High', 'Low', 'Close']:
+        assert filled.prices[col][1, 30] == bars['Close'].iloc[29]
+    assert not filled.observed[1, 30]
+    # Leading bars before a pair starts are never filled
+    assert np.isnan(filled.prices['Close'][2, :10]).all()
+
+    inner = Panel.from_frames(frames, how='inner')
+    assert len(inner.index) == 49 and holiday not in inner.index
+
+
+def test_from_price_store(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.write('EURUSD', make_bars(seed=1))
+    store.write('GBPUSD', make_bars(seed=2).iloc[5:])
+
+    panel = Panel.from_price_store(store=store, start='2022-02-01')
+    assert panel.pairs == ['EURUSD', 'GBPUSD']
+    pd.testing.assert_frame_equal(panel.frame('EURUSD'), store.load('EURUSD', '2022-02-01'),
+                                  check_freq=False, check_index_type=False)
@@ -0,0 +1,46 @@
+"""
+Parallel pair runner tests
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from parallel import run_pairs, resolve_jobs
+
+
+def square_pair(pair):
+    print(f"[PROCESSING] {pair}")
+    if pair == 'USDJPY':
+        raise ValueError("bad data")
+    return len(pair) ** 2
+
+
+def test_run_pairs_reports_failures_in_pair_order(capsys):
+    pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCAD', 'AUDUSD']
+
+    results = run_pairs(square_pair, pairs, jobs=3)
+
+    assert list(results) == ['EURUSD', 'GBPUSD', 'USDCAD', 'AUDUSD']
+    assert set(results.values()) == {36}
+    output = capsys.readouterr().out
+    assert "[ERROR] Failed to process USDJPY: bad data" in output
+    assert [line for line in output.splitlines() if line.startswith('[PROCESSING]')] == \
+        [f"[PROCESSING] {pair}" for pair in pairs]
+
+
+def test_parallel_matches_sequential():
+    pairs = ['EURUSD', 'GBPUSD', 'AUDUSD']
+    assert run_pairs(square_pair, pairs, jobs=1) == run_pairs(square_pair, pairs, jobs=2)
+
+
+def test_resolve_jobs():
+    assert resolve_jobs(1) == 1
+    assert resolve_jobs(4) == 4
+    assert resolve_jobs(0) == (os.cpu_count() or 1)
+
+
+def test_run_pairs_without_pairs():
+    assert run_pairs(square_pair, [], jobs=4) == {}
+    assert run_pairs(square_pair, [], jobs=1) == {}
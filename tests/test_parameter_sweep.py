@@ -0,0 +1,63 @@
+"""
+Parameter sweep tests: per-setting parity, sharing and result layout
+"""
+
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import Indicators
+from feature_engineering import FeatureEngineer
+from parameter_sweep import ParameterSweep, combinations
+
+
+def test_sweep_matches_single_settings():
+    bars = make_bars(periods=400)
+    sweeper = ParameterSweep.from_frame(bars)
+    rsi = sweeper.sweep('rsi', period=range(5, 31, 5))
+    macd = sweeper.sweep('macd', fast=[8, 12], slow=[12, 26], signal=[5, 9])
+    bands = sweeper.sweep('bollinger_bands', period=[10, 20], width=[1.5, 2.0])
+
+    assert rsi.values.shape == (6, 1, len(bars))
+    # fast must be below slow: (12, 12) settings are skipped
+    assert macd.params == [(8, 12, 5), (8, 12, 9), (8, 26, 5), (8, 26, 9), (12, 26, 5), (12, 26, 9)]
+    assert bands.values.shape == (4, 4, len(bars))
+
+    single = Indicators.from_frame(bars)
+    np.testing.assert_allclose(rsi.get(period=20), single.rsi(20), rtol=1e-12)
+    for output, expected in zip(macd.outputs, single.macd(8, 26, 5)):
+        np.testing.assert_allclose(macd.get(output, fast=8, slow=26, signal=5), expected, rtol=1e-12)
+    np.testing.assert_allclose(bands.get('BB_Width', period=10, width=1.5),
+                               single.bollinger_bands(10, 1.5)[3], rtol=1e-12)
+
+
+def test_shared_intermediates_are_computed_once():
+    sweeper = ParameterSweep.from_frame(make_bars(periods=400))
+    sweeper.sweep('macd', fast=[8, 12], slow=[12, 26], signal=[9])
+    sweeper.sweep('rsi', period=range(5, 51))
+
+    ops = [key[0] for key in sweeper.indicators._cache]
+    # Close EMAs for spans 8, 12, 26 plus one signal EMA per MACD line
+    assert ops.count('ema') == 3 + 3
+    assert ops.count('sub') == 1 + 3 + 3
+    assert ops.count('shift') == 1
+
+
+def test_frames_and_defaults():
+    bars = make_bars(periods=400)
+    frame = ParameterSweep.from_frame(bars).to_frame({'rsi': {'period': [7, 14]},
+                                                       'macd': {'fast': [10]}})
+    assert list(frame.columns) == ['RSI_7', 'RSI_14', 'MACD_10_26_9', 'MACD_Signal_10_26_9', 'MACD_Hist_10_26_9']
+    assert frame.index.equals(bars.index)
+
+    engineer = FeatureEngineer(bars).rsi()
+    result = engineer.sweep({'rsi': {'period': [14]}})['rsi']
+    np.testing.assert_array_equal(result.get(period=14), engineer.get_data()['RSI'].to_numpy())
+    assert result.param_frame().to_dict('list') == {'period': [14]}
+
+    with pytest.raises(KeyError):
+        combinations('rsi', {'window': [5]})
@@ -0,0 +1,51 @@
+"""
+Dtype policy tests: float32 outputs over float64 kernels
+"""
+
+import sys
+import os
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from feature_graph import FEATURES
+from feature_engineering import FeatureEngineer
+from prepare_ml_data import MLDataPreparation
+from precision import get_dtype
+
+
+def test_get_dtype(monkeypatch):
+    monkeypatch.delenv('FOREX_FEATURE_DTYPE', raising=False)
+    assert get_dtype() is np.float64
+    monkeypatch.setenv('FOREX_FEATURE_DTYPE', 'float32')
+    assert get_dtype() is np.float32
+    assert get_dtype(np.float64) is np.float64
+    with pytest.raises(ValueError):
+        get_dtype('float16')
+
+
+def test_float32_features_are_rounded_float64():
+    bars = make_bars()
+    full = FeatureEngineer(bars).build().remove_nan().get_data()
+    half = FeatureEngineer(bars, dtype='float32').build().remove_nan().get_data()
+
+    assert (half[FEATURES].dtypes == np.float32).all()
+    assert (half[['Open', 'High', 'Low', 'Close']].dtypes == np.float64).all()
+    # Computed in float64 and rounded once
+    np.testing.assert_array_equal(half[FEATURES].to_numpy(), full[FEATURES].to_numpy().astype(np.float32))
+
+    method_chain = FeatureEngineer(bars, dtype='float32').moving_averages().rsi().get_data()
+    assert method_chain['SMA_200'].dtype == np.float32 and method_chain['RSI'].dtype == np.float32
+
+
+def test_float32_training_matrices():
+    features = FeatureEngineer(make_bars()).build().remove_nan().get_data()
+    prep = (MLDataPreparation(features, dtype='float32')
+            .create_target().select_features().scale_features().split_data())
+
+    assert (prep.X.dtypes == np.float32).all()
+    assert (prep.X_train.dtypes == np.float32).all()
+    reference = MLDataPreparation(features).create_target().select_features().scale_features()
+    np.testing.assert_allclose(prep.X_scaled.to_numpy(), reference.X_scaled.to_numpy(), atol=1e-5)
@@ -0,0 +1,63 @@
+"""
+Memory-mapped price store tests
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from price_store import PriceStore
+from data_processing import DataProcessor
+from feature_engineering import FeatureEngineer
+
+
+def make_bars(start='2023-01-02', periods=300):
+    index = pd.date_range(start, periods=periods, freq='B', name='Date')
+    close = 1.1 + np.cumsum(np.sin(np.arange(periods) / 7.0)) * 0.001
+    return pd.DataFrame({'Open': close - 0.0005, 'High': close + 0.002,
+                         'Low': close - 0.002, 'Close': close}, index=index)
+
+
+def test_range_query_returns_memmap_views(tmp_path):
+    store = PriceStore(str(tmp_path))
+    bars = make_bars()
+    store.write('EURUSD', bars)
+
+    prices = store.open('EURUSD')
+    window = prices.slice('2023-03-01', '2023-03-31')
+
+    expected = bars.loc['2023-03-01':'2023-03-31']
+    assert len(window['Close']) == len(expected)
+    np.testing.assert_array_equal(window['Close'], expected['Close'].to_numpy())
+    assert np.shares_memory(window['Close'], prices.close)
+    assert prices.slice('2030-01-01')['Close'].size == 0
+
+
+def test_append_skips_overlap(tmp_path):
+    store = PriceStore(str(tmp_path))
+    bars = make_bars()
+    store.write('GBPUSD', bars.iloc[:200])
+    store.append('GBPUSD', bars.iloc[150:])
+
+    loaded = store.load('GBPUSD')
+    pd.testing.assert_frame_equal(loaded, bars, check_freq=False, check_index_type=False)
+
+
+def test_processor_populates_store_for_feature_engineer(tmp_path):
+    store = PriceStore(str(tmp_path))
+    bars = make_bars()
+    (DataProcessor(bars)
+        .remove_missing_values()
+        .remove_duplicates()
+        .ensure_data_types()
+        .sort_by_date()
+        .to_store('USDJPY', store))
+
+    features = FeatureEngineer.from_store('USDJPY', store=store).moving_averages().get_data()
+    expected = FeatureEngineer(bars).moving_averages().get_data()
+
+    np.testing.assert_allclose(features['SMA_200'], expected['SMA_200'])
+    assert store.pairs() == ['USDJPY']
@@ -0,0 +1,122 @@
+"""
+Storage backend tests
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from storage import CSVStorage, NpzStorage, benchmark_load, get_storage
+
+
+def make_frame(start='2024-01-01', periods=10):
+    index = pd.date_range(start, periods=periods, freq='B', name='Date')
+    values = np.linspace(1.0, 1.2, periods)
+    return pd.DataFrame({'Open': values, 'High': values + 0.01,
+                         'Low': values - 0.01, 'Close': values}, index=index)
+
+
+@pytest.mark.parametrize('format_name', ['csv', 'npz'])
+def test_round_trip(tmp_path, format_name):
+    storage = get_storage(format_name)
+    data = make_frame()
+
+    storage.save(data, str(tmp_path), 'EURUSD_processed.csv')
+    loaded = storage.load(str(tmp_path), 'EURUSD_processed')
+
+    assert os.path.exists(tmp_path / f'EURUSD_processed.{format_name}')
+    pd.testing.assert_frame_equal(loaded, data, check_freq=False, check_index_type=False)
+
+
+def test_npz_without_index_and_series(tmp_path):
+    storage = NpzStorage()
+    target = pd.Series([1, 0, 1], name='Target')
+
+    storage.save(target, str(tmp_path), 'y_train', index=False)
+    loaded = storage.load(str(tmp_path), 'y_train', index=False)
+
+    assert list(loaded.columns) == ['Target']
+    assert loaded['Target'].tolist() == [1, 0, 1]
+
+
+def test_npz_falls_back_to_csv_export(tmp_path):
+    data = make_frame()
+    CSVStorage().save(data, str(tmp_path), 'GBPUSD_features')
+
+    loaded = NpzStorage().load(str(tmp_path), 'GBPUSD_features')
+
+    np.testing.assert_allclose(loaded['Close'], data['Close'])
+
+
+def test_npz_exists_and_last_index_fall_back_to_csv_export(tmp_path):
+    data = make_frame()
+    CSVStorage().save(data, str(tmp_path), 'EURUSD_historical')
+    storage = NpzStorage()
+
+    assert storage.exists(str(tmp_path), 'EURUSD_historical')
+    assert storage.last_index(str(tmp_path), 'EURUSD_historical') == data.index[-1]
+
+    # Appending continues the CSV history into the npz file
+    storage.append(make_frame('2024-01-15', periods=3), str(tmp_path), 'EURUSD_historical')
+    assert len(storage.load(str(tmp_path), 'EURUSD_historical')) == 13
+
+
+def test_npz_last_index_without_index(tmp_path):
+    NpzStorage().save(pd.Series([1, 0, 1], name='Target'), str(tmp_path), 'y_train', index=False)
+    assert NpzStorage().last_index(str(tmp_path), 'y_train') is None
+
+
+@pytest.mark.parametrize('format_name', ['csv', 'npz'])
+def test_append_and_last_index(tmp_path, format_name):
+    storage = get_storage(format_name)
+    first, second = make_frame(periods=5), make_frame('2024-01-08', periods=5)
+
+    storage.append(first, str(tmp_path), 'USDJPY_historical')
+    storage.append(second, str(tmp_path), 'USDJPY_historical')
+
+    assert storage.last_index(str(tmp_path), 'USDJPY_historical') == second.index[-1]
+    assert len(storage.load(str(tmp_path), 'USDJPY_historical')) == 10
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        get_storage('hdf5')
+
+
+def test_benchmark_leaves_no_converted_copies(tmp_path):
+    CSVStorage().save(make_frame(), str(tmp_path), 'EURUSD_features')
+    results = benchmark_load(str(tmp_path), formats=('csv', 'npz'), repeat=1)
+
+    assert set(results) == {'csv', 'npz'}
+    assert sorted(os.listdir(tmp_path)) == ['EURUSD_features.csv']
+
+
+@pytest.mark.parametrize('format_name', ['csv', 'npz'])
+def test_chunks_match_load(tmp_path, format_name):
+    storage = get_storage(format_name)
+    data = make_frame(periods=23)
+    storage.save(data, str(tmp_path), 'EURUSD_features')
+
+    chunks = list(storage.chunks(str(tmp_path), 'EURUSD_features', chunksize=5, columns=['Close', 'Open']))
+
+    assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 3]
+    pd.testing.assert_frame_equal(pd.concat(chunks), data[['Close', 'Open']],
+                                  check_freq=False, check_index_type=False)
+
+
+def test_npz_chunks_are_memory_mapped(tmp_path):
+    NpzStorage().save(make_frame(periods=50), str(tmp_path), 'EURUSD_features')
+    column = NpzStorage._member(str(tmp_path / 'EURUSD_features.npz'), 'c3')
+
+    assert isinstance(column, np.memmap)
+    np.testing.assert_allclose(column, make_frame(periods=50)['Close'])
+
+
+def test_npz_chunks_fall_back_to_csv_export(tmp_path):
+    CSVStorage().save(make_frame(periods=12), str(tmp_path), 'EURUSD_features')
+    chunks = list(NpzStorage().chunks(str(tmp_path), 'EURUSD_features', chunksize=5))
+    assert sum(len(chunk) for chunk in chunks) == 12
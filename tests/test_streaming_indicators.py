@@ -0,0 +1,57 @@
+"""
+Streaming indicator tests
+"""
+
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from streaming_indicators import IndicatorEngine, StreamingIndicator, SMA
+from feature_engineering import FeatureEngineer
+
+
+def batch_features(bars):
+    return (FeatureEngineer(bars)
+            .moving_averages().rsi().macd().bollinger_bands()
+            .price_features().volatility().momentum()
+            .get_data())
+
+
+def stream(engine, bars):
+    return pd.DataFrame([engine.update(*row) for row in bars[['Open', 'High', 'Low', 'Close']].to_numpy()],
+                        index=bars.index)
+
+
+def test_matches_batch_features():
+    bars = make_bars(periods=400, random_wicks=True)
+    expected = batch_features(bars)
+    streamed = stream(IndicatorEngine(), bars)
+
+    for col in streamed.columns:
+        pd.testing.assert_series_equal(streamed[col], expected[col], check_names=False, rtol=1e-9, atol=1e-12)
+
+
+def test_checkpoint_resumes_identically():
+    bars = make_bars(periods=300, seed=3, random_wicks=True)
+    whole = stream(IndicatorEngine(), bars)
+
+    engine = IndicatorEngine()
+    stream(engine, bars.iloc[:250])
+    resumed = StreamingIndicator.restore(json.loads(json.dumps(engine.checkpoint())))
+    tail = stream(resumed, bars.iloc[250:])
+
+    pd.testing.assert_frame_equal(tail, whole.iloc[250:])
+
+
+def test_sma_any_window_and_warmup():
+    values = np.arange(1.0, 8.0)
+    sma = SMA(3)
+    out = [sma.update(v) for v in values]
+
+    assert np.isnan(out[:2]).all()
+    np.testing.assert_allclose(out[2:], pd.Series(values).rolling(3).mean().to_numpy()[2:])
@@ -0,0 +1,163 @@
+"""
+Streaming preparation tests: chunked scaling into memory-mapped datasets
+"""
+
+import sys
+import os
+import tracemalloc
+from functools import partial
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from datasets import DatasetStore
+from feature_engineering import FeatureEngineer
+from parallel import run_pairs
+from prepare_ml_data import MLDataPreparation, StreamingMLDataPreparation, stream_pair
+from storage import get_storage
+from train_models import ModelTrainer
+
+
+@pytest.fixture
+def features():
+    return FeatureEngineer(make_bars(periods=600)).build().remove_nan().get_data()
+
+
+def frame_chunks(data, size):
+    return lambda: (data.iloc[start:start + size] for start in range(0, len(data), size))
+
+
+@pytest.mark.parametrize('chunksize', [1, 7, 100, 10_000])
+def test_matches_in_memory_preparation(features, tmp_path, chunksize):
+    store = DatasetStore(str(tmp_path))
+    prep = StreamingMLDataPreparation(frame_chunks(features, chunksize))
+    prep.write('EURUSD', store)
+
+    # The scaler sees the training rows only, like time_split
+    memory = MLDataPreparation(features).create_target().select_features().time_split()
+    arrays = store.load('EURUSD')
+
+    assert prep.rows == len(memory.X)
+    assert prep.train_rows == len(memory.X_train)
+    np.testing.assert_allclose(arrays['X_train'], memory.X_train.to_numpy(), atol=1e-12)
+    np.testing.assert_allclose(arrays['X_test'], memory.X_test.to_numpy(), atol=1e-12)
+    np.testing.assert_array_equal(arrays['y_train'], memory.y_train.to_numpy())
+    np.testing.assert_array_equal(arrays['y_test'], memory.y_test.to_numpy())
+    np.testing.assert_allclose(store.scaler('EURUSD').data_max_, memory.scaler.data_max_)
+    np.testing.assert_allclose(store.scaler('EURUSD').data_min_, memory.scaler.data_min_)
+
+
+def test_default_split_never_scales_on_test_rows(features, tmp_path):
+    # The last rows hold the extremes: they must not move the scaler bounds
+    features = features.copy()
+    features.iloc[-20:, features.columns.get_loc('RSI')] = 1000.0
+    prep = StreamingMLDataPreparation(frame_chunks(features, 64)).fit()
+
+    rsi = prep.feature_columns.index('RSI')
+    assert prep.scaler.data_max_[rsi] == features['RSI'].iloc[:prep.train_rows].max()
+
+
+def test_test_start_fits_scaler_on_earlier_rows(features, tmp_path):
+    store = DatasetStore(str(tmp_path))
+    test_start = features.index[400]
+    prep = StreamingMLDataPreparation(frame_chunks(features, 64), test_start=test_start, dtype='float32')
+    prep.write('EURUSD', store)
+
+    memory = MLDataPreparation(features).create_target().select_features()
+    train = memory.X.index < test_start
+    arrays = store.load('EURUSD')
+
+    assert prep.train_rows == 400
+    assert arrays['X_train'].dtype == np.float32
+    np.testing.assert_allclose(store.scaler('EURUSD').data_max_, memory.X[train].max().to_numpy())
+    assert arrays['X_train'].max() <= 1 + 1e-6
+    assert len(arrays['X_test']) == len(memory.X) - 400
+
+
+def test_csv_chunks_stream_into_trainable_dataset(features, tmp_path):
+    storage = get_storage('csv')
+    processed = tmp_path / 'data' / 'processed'
+    storage.save(features, str(processed), 'EURUSD_features')
+    store = DatasetStore(str(tmp_path / 'datasets'))
+
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        prep = StreamingMLDataPreparation.from_storage('EURUSD', storage, chunksize=50,
+                                                       feature_columns=['RSI', 'MACD', 'ATR'])
+        prep.write('EURUSD', store)
+    finally:
+        os.chdir(cwd)
+
+    X_train, X_test, y_train, y_test = ModelTrainer(datasets=store).load_data('EURUSD')
+    assert isinstance(X_train, np.memmap)
+    assert X_train.shape[1] == 3
+    assert len(X_train) + len(X_test) == len(features) - 1
+
+
+def test_peak_memory_follows_chunk_size(tmp_path):
+    rows, columns = 200_000, 8
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame(rng.normal(size=(rows, columns)), columns=['Close'] + [f'f{i}' for i in range(1, columns)],
+                        index=pd.date_range('2020-01-01', periods=rows, freq='min'))
+    full_bytes = rows * columns * 8
+
+    tracemalloc.start()
+    prep = StreamingMLDataPreparation(frame_chunks(data, 2_000), feature_columns=list(data.columns))
+    prep.write('big', DatasetStore(str(tmp_path)))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert prep.rows == rows - 1
+    assert peak < full_bytes / 10
+
+
+@pytest.mark.parametrize('format_name', ['csv', 'npz'])
+def test_from_storage_streams_each_format(features, tmp_path, monkeypatch, format_name):
+    monkeypatch.chdir(tmp_path)
+    storage = get_storage(format_name)
+    storage.save(features, 'data/processed', 'EURUSD_features')
+    store = DatasetStore('datasets')
+
+    StreamingMLDataPreparation.from_storage('EURUSD', storage, chunksize=50).write('EURUSD', store)
+
+    memory = MLDataPreparation(features).create_target().select_features().time_split()
+    np.testing.assert_allclose(store.load('EURUSD')['X_test'], memory.X_test.to_numpy(), atol=1e-12)
+
+
+def test_failed_write_leaves_no_temporary_files(features, tmp_path):
+    store = DatasetStore(str(tmp_path))
+    calls = []
+
+    def chunks():
+        calls.append(1)
+        if len(calls) == 3:
+            raise IOError("disk went away")
+        return frame_chunks(features, 100)()
+
+    prep = StreamingMLDataPreparation(chunks).fit()
+    with pytest.raises(IOError):
+        prep.write('EURUSD', store)
+    assert os.listdir(store.path('EURUSD')) == []
+
+
+def test_stream_pair_failures_are_isolated(features, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    get_storage('csv').save(features, 'data/processed', 'EURUSD_features')
+    store = DatasetStore('datasets')
+
+    prepared = run_pairs(partial(stream_pair, storage='csv', chunksize=100, datasets=store),
+                         ['GBPUSD', 'EURUSD'], action='prepare')
+
+    assert list(prepared) == ['EURUSD']
+    store.write_pooled(prepared)
+    assert store.meta('pooled')['pairs'] == ['EURUSD']
+
+
+def test_missing_feature_columns_raise(features, tmp_path):
+    prep = StreamingMLDataPreparation(frame_chunks(features[['Close', 'RSI']], 50), feature_columns=['RSI', 'ATR'])
+    with pytest.raises(KeyError):
+        prep.fit()
@@ -0,0 +1,125 @@
+"""
+Model training tests: concurrent base models, prefit ensemble, timings and
+the multi-pair model registry
+"""
+
+import sys
+import os
+import joblib
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from conftest import make_bars
+from datasets import DatasetStore
+from feature_engineering import FeatureEngineer
+from model_registry import ModelRegistry
+from prepare_ml_data import MLDataPreparation
+from train_models import BASE_MODELS, ModelTrainer, fit_model, train_pairs
+
+
+@pytest.fixture
+def trainer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = DatasetStore(str(tmp_path / 'datasets'))
+    features = FeatureEngineer(make_bars(periods=360)).build().remove_nan().get_data()
+    store.write_pair('EURUSD', MLDataPreparation(features).create_target().select_features().time_split())
+    return ModelTrainer(datasets=store)
+
+
+def test_ensemble_wraps_fitted_models_without_refit(trainer):
+    X_train, X_test, y_train, y_test = trainer.load_data('EURUSD')
+    base = trainer.train_base_models(X_train, y_train)
+    ensemble = trainer.create_ensemble(base['random_forest'], base['gradient_boosting'],
+                                       base['logistic_regression'], y_train)
+
+    assert ensemble.estimators_[0] is base['random_forest']
+    mean = np.mean([model.predict_proba(X_test) for model in base.values()], axis=0)
+    np.testing.assert_allclose(ensemble.predict_proba(X_test), mean)
+    np.testing.assert_array_equal(ensemble.predict(X_test), mean.argmax(axis=1))
+
+    # Same predictions as the old fit-everything-twice ensemble
+    refit = trainer.create_ensemble(base['random_forest'], base['gradient_boosting'],
+                                    base['logistic_regression']).fit(X_train, y_train)
+    np.testing.assert_allclose(ensemble.predict_proba(X_test), refit.predict_proba(X_test))
+
+
+def test_concurrent_training_matches_sequential(trainer):
+    X_train, X_test, y_train, y_test = trainer.load_data('EURUSD')
+    sequential = trainer.train_base_models(X_train, y_train)
+    concurrent = trainer.train_base_models(X_train, y_train, jobs=3, pair='EURUSD')
+
+    assert set(concurrent) == set(BASE_MODELS)
+    for name in BASE_MODELS:
+        np.testing.assert_allclose(concurrent[name].predict_proba(X_test), sequential[name].predict_proba(X_test))
+
+
+def test_train_all_reports_timings_and_saves_models(trainer):
+    results = trainer.train_all('EURUSD', jobs=2)
+    timings = trainer.timing_frame()
+
+    assert set(results) == {'Random Forest', 'Gradient Boosting', 'Logistic Regression', 'Voting Ensemble'}
+    assert list(timings.index) == list(BASE_MODELS.values()) + ['Total']
+    assert (timings[['wall_s', 'cpu_s']] > 0).all().all()
+    assert os.path.exists('data/models/EURUSD_ensemble.pkl')
+
+
+def test_fit_model_maps_dataset_paths(trainer):
+    path = trainer.datasets.path('EURUSD', 'X_train.npy')
+    name, model, timing = fit_model('logistic_regression', path, trainer.datasets.path('EURUSD', 'y_train.npy'))
+    assert name == 'logistic_regression'
+    assert model.n_features_in_ == np.load(path, mmap_mode='r').shape[1]
+    assert set(timing) == {'wall_s', 'cpu_s', 'cpu_use'}
+
+
+def test_train_pairs_writes_per_pair_model_sets_and_manifest(tmp_path):
+    store = DatasetStore(str(tmp_path / 'datasets'))
+    for seed, pair in enumerate(['EURUSD', 'GBPUSD']):
+        features = FeatureEngineer(make_bars(periods=360, seed=seed)).build().remove_nan().get_data()
+        columns = ['RSI', 'MACD', 'ATR'] if pair == 'GBPUSD' else None
+        store.write_pair(pair, MLDataPreparation(features).create_target().select_features(columns).time_split())
+    registry = ModelRegistry(str(tmp_path / 'models'))
+
+    records = train_pairs(['EURUSD', 'GBPUSD', 'USDJPY'], jobs=2, cores_per_pair=1,
+                          datasets=store, registry=registry)
+
+    # USDJPY has no dataset: reported and skipped, the others registered
+    assert set(records) == {'EURUSD', 'GBPUSD'}
+    assert registry.pairs() == ['EURUSD', 'GBPUSD']
+    assert registry.manifest()['GBPUSD']['cores'] == 1
+
+    models, meta = registry.load('GBPUSD')
+    assert set(models) == {'random_forest', 'gradient_boosting', 'logistic_regression', 'ensemble'}
+    assert meta['feature_columns'] == ['RSI', 'MACD', 'ATR']
+    X_test = store.load('GBPUSD')['X_test']
+    assert models['ensemble'].predict(X_test).shape == (len(X_test),)
+    assert registry.load('EURUSD')[1]['scaler'].n_features_in_ == len(store.meta('EURUSD')['feature_columns'])
+
+
+def test_registry_falls_back_to_flat_model_files(trainer, tmp_path):
+    # train_models.py --pair writes flat data/models/EURUSD_*.pkl files
+    trainer.train_all('EURUSD')
+    joblib.dump(['RSI'], 'data/models/feature_columns.pkl')
+
+    models, meta = ModelRegistry('data/models').load('EURUSD')
+    assert 'ensemble' in models
+    assert meta['feature_columns'] == ['RSI']
+    assert ModelRegistry('data/models').load('GBPUSD') == ({}, {})
+
+
+def test_train_pairs_without_pairs(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    assert train_pairs([], jobs=4, registry=registry) == {}
+    assert registry.manifest() == {}
+
+
+def test_manifest_takes_precedence_over_flat_files(trainer, caplog):
+    registry = ModelRegistry('data/models')
+    trainer.train_all('EURUSD')
+    registry.register({'EURUSD': registry.save('EURUSD', trainer.models, trainer.datasets.scaler('EURUSD'),
+                                               ['RSI', 'MACD'])})
+
+    models, meta = registry.load('EURUSD')
+    assert meta['feature_columns'] == ['RSI', 'MACD']
+    assert 'EURUSD_ensemble.pkl' in caplog.text and '[IGNORED]' in caplog.text
@@ -0,0 +1,85 @@
+"""
+Walk-forward split tests: fold ranges, views, train-only scaling and caching
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from walk_forward import WalkForward, fold_bounds
+from prepare_ml_data import MLDataPreparation
+
+
+def make_matrix(rows=400, columns=3, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(np.cumsum(rng.normal(0, 1, (rows, columns)), axis=0), columns=[f'f{i}' for i in range(columns)])
+    y = pd.Series((rng.random(rows) > 0.5).astype(int))
+    return X, y
+
+
+def test_fold_bounds():
+    rolling = fold_bounds(100, train_size=50, test_size=10, gap=2)
+    assert rolling.tolist()[:2] == [[0, 50, 52, 62], [10, 60, 62, 72]]
+    assert rolling[-1, 3] <= 100 and len(rolling) == 4
+
+    expanding = fold_bounds(100, train_size=50, test_size=10, step=20, expanding=True)
+    assert (expanding[:, 0] == 0).all() and expanding[:, 1].tolist() == [50, 70, 90]
+    assert len(fold_bounds(40, 50, 10)) == 0
+
+    # Thousands of intraday folds, computed arithmetically
+    many = fold_bounds(2_000_000, train_size=10_000, test_size=500, step=250)
+    assert len(many) == (2_000_000 - 10_000 - 500) // 250 + 1
+    assert many[0].tolist() == [0, 10_000, 10_000, 10_500]
+    assert many[-1].tolist() == [1_989_500, 1_999_500, 1_999_500, 2_000_000]
+    assert (np.diff(many, axis=0) == 250).all()
+
+
+def test_views_and_train_only_scaling():
+    X, y = make_matrix()
+    folds = WalkForward(X, y, train_size=100, test_size=20, gap=1)
+    fold = folds.fold(3)
+
+    X_train, X_test, y_train, y_test = folds.split(fold)
+    assert np.shares_memory(X_train, folds.X) and np.shares_memory(X_test, folds.X)
+
+    S_train, S_test, _, _ = folds.scaled(fold)
+    np.testing.assert_allclose(S_train.min(axis=0), 0)
+    np.testing.assert_allclose(S_train.max(axis=0), 1)
+    scaler = folds.scaler_for(fold)
+    np.testing.assert_allclose(S_test, scaler.transform(X.iloc[fold.test].to_numpy()))
+    np.testing.assert_array_equal(y_test, y.iloc[fold.test].to_numpy())
+
+
+def test_scaled_folds_are_cached(tmp_path):
+    X, y = make_matrix()
+    folds = WalkForward(X, y, train_size=100, test_size=50, cache_dir=str(tmp_path))
+    fold = folds.fold(0)
+    first = folds.scaled(fold)[0]
+    assert folds.scaled(fold)[0].base is first.base
+
+    files = list(tmp_path.rglob('*.npy'))
+    assert len(files) == 1
+    # A new run over the same data loads the fold from disk (memory-mapped)
+    reloaded = WalkForward(X, y, train_size=100, test_size=50, cache_dir=str(tmp_path)).scaled(fold)[0]
+    assert isinstance(reloaded.base, np.memmap) or isinstance(reloaded, np.memmap)
+    np.testing.assert_array_equal(reloaded, first)
+
+    scores = folds.evaluate(LogisticRegression(), accuracy_score)
+    assert len(scores) == len(folds) and scores['score'].between(0, 1).all()
+
+
+def test_time_split_has_no_lookahead():
+    X, y = make_matrix()
+    data = X.assign(Close=np.arange(len(X), dtype=float), Target=y)
+    prep = MLDataPreparation(data).select_features(list(X.columns)).time_split(test_size=0.25)
+
+    assert len(prep.X_train) == 300 and len(prep.X_test) == 100
+    assert prep.X_train.index.max() < prep.X_test.index.min()
+    np.testing.assert_allclose(prep.X_train.min(), 0)
+    np.testing.assert_allclose(prep.X_train.max(), 1)
+    np.testing.assert_allclose(prep.scaler.data_max_, X.iloc[:300].max())